@@ -1,10 +1,24 @@
 import tkinter as tk
+import tkinter.font as tkfont
+from bisect import bisect_right
+from itertools import accumulate
 from tkinter import messagebox, ttk
-from collections import defaultdict
+
+from acdlab.background import Job
+from acdlab.cache import default_cache
+from acdlab.conflicts import format_conflict, ll1_conflicts
+from acdlab.grammar import Grammar
+from acdlab.ll1 import ll1_parsing_table
+from acdlab.loader import GrammarError, read_grammar
+from acdlab.transform import compute_cfg, join_rules, split_rules
 
 # Global variable to store input fields
 grammar_entries = []
 
+# The analysis running in the background, if any
+job = None
+POLL_MS = 50
+
 # Function to generate input fields
 def generate_input_fields():
     global grammar_entries  
@@ -29,117 +43,271 @@ def generate_input_fields():
         entry.grid(row=i, column=1, padx=5, pady=2)
         grammar_entries.append(entry)  
 
-# Process CFG
-def process_cfg():
-    grammar = [entry.get().strip() for entry in grammar_entries if entry.get().strip()]
-    if not grammar:
-        output_text.set("No grammar entered")
-        return
-    
-    transformed_grammar = compute_cfg(grammar)
-    output_text.set("Final Transformed CFG:\n" + "\n".join(transformed_grammar))
-
-# Compute CFG
-def compute_cfg(grammar):
-    grammar = eliminate_left_recursion(grammar)
-    grammar = left_factor(grammar)
-    return grammar
-
-# Eliminate Left Recursion
-def eliminate_left_recursion(grammar):
-    new_grammar = []
-    for rule in grammar:
-        lhs, rhs = rule.split("->")
-        lhs = lhs.strip()
-        rhs = [alt.strip() for alt in rhs.split("|")]
-        recursive = [alt[1:].strip() for alt in rhs if alt.startswith(lhs)]
-        non_recursive = [alt for alt in rhs if not alt.startswith(lhs)]
-        if recursive:
-            new_nt = lhs + "'"
-            new_grammar.append(f"{lhs} -> " + " | ".join(f"{alt} {new_nt}" for alt in non_recursive))
-            new_grammar.append(f"{new_nt} -> " + " | ".join(f"{alt} {new_nt}" for alt in recursive) + " | ε")
+# Read all productions once: rules for the same non-terminal are merged and a
+# malformed entry is reported by its number
+def read_entries():
+    lines = [entry.get() for entry in grammar_entries]
+    if not any(line.strip() for line in lines):
+        return []
+    try:
+        loaded = read_grammar(lines, "Production")
+    except GrammarError as e:
+        messagebox.showerror("Invalid Grammar", f"Production {e.line}: {e.message}")
+        return None
+    return join_rules(loaded.rules())
+
+# Replace the text of the output box
+def show_output(text):
+    output_box.config(state="normal")
+    output_box.delete("1.0", "end")
+    output_box.insert("1.0", text)
+    output_box.config(state="disabled")
+
+# A table drawn on a Canvas a screenful at a time: only the cells in view
+# exist as canvas items, so thousands of rows and columns scroll as fast as
+# ten.  cell(row, column) gives the text of a cell; column 0 and the header
+# row stay in place while the rest scrolls.
+class TableView(tk.Frame):
+    def __init__(self, master, headers, row_count, cell, command=None, height=250):
+        super().__init__(master)
+        self.headers = headers
+        self.row_count = row_count
+        self.cell = cell
+        self.command = command
+        self.x = self.y = 0
+        self.pending = None
+
+        font = tkfont.nametofont("TkDefaultFont")
+        self.row_height = font.metrics("linespace") + 6
+        self.char_width = font.measure("0")
+        # Column widths from the header and the first rows only
+        sample = range(min(row_count, 50))
+        self.widths = []
+        for c, header in enumerate(headers):
+            longest = max([len(header)] + [len(cell(r, c)) for r in sample])
+            self.widths.append(max(40, min(longest * self.char_width + 12, 300)))
+        self.offsets = [0] + list(accumulate(self.widths))
+
+        self.canvas = tk.Canvas(self, height=height, bg="white", highlightthickness=0)
+        self.vbar = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.hbar = ttk.Scrollbar(self, orient="horizontal", command=self.xview)
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        self.vbar.grid(row=0, column=1, sticky="ns")
+        self.hbar.grid(row=1, column=0, sticky="ew")
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+
+        canvas = self.canvas
+        canvas.bind("<Configure>", lambda e: self.redraw())
+        canvas.bind("<Enter>", lambda e: canvas.focus_set())
+        canvas.bind("<MouseWheel>", lambda e: self.yview("scroll", self.wheel_units(e), "units"))
+        canvas.bind("<Shift-MouseWheel>", lambda e: self.xview("scroll", self.wheel_units(e), "units"))
+        canvas.bind("<Button-4>", lambda e: self.yview("scroll", -3, "units"))
+        canvas.bind("<Button-5>", lambda e: self.yview("scroll", 3, "units"))
+        canvas.bind("<Shift-Button-4>", lambda e: self.xview("scroll", -3, "units"))
+        canvas.bind("<Shift-Button-5>", lambda e: self.xview("scroll", 3, "units"))
+        canvas.bind("<Up>", lambda e: self.yview("scroll", -1, "units"))
+        canvas.bind("<Down>", lambda e: self.yview("scroll", 1, "units"))
+        canvas.bind("<Prior>", lambda e: self.yview("scroll", -1, "pages"))
+        canvas.bind("<Next>", lambda e: self.yview("scroll", 1, "pages"))
+        canvas.bind("<Home>", lambda e: self.yview("moveto", 0))
+        canvas.bind("<End>", lambda e: self.yview("moveto", 1))
+        canvas.bind("<Left>", lambda e: self.xview("scroll", -1, "units"))
+        canvas.bind("<Right>", lambda e: self.xview("scroll", 1, "units"))
+        canvas.bind("<Button-1>", self.click)
+
+    @staticmethod
+    def wheel_units(event):
+        # Windows sends multiples of 120, macOS small steps
+        return -event.delta // 120 * 3 if abs(event.delta) >= 120 else -event.delta
+
+    # Sizes of the scrolling part: (visible, total) in pixels
+    def body_height(self):
+        return self.canvas.winfo_height() - self.row_height, self.row_count * self.row_height
+
+    def body_width(self):
+        return self.canvas.winfo_width() - self.widths[0], self.offsets[-1] - self.offsets[1]
+
+    # Scrollbar commands: ("moveto", fraction) or ("scroll", n, "units" or "pages")
+    @staticmethod
+    def scrolled(args, at, view, total, unit):
+        if args[0] == "moveto":
+            at = float(args[1]) * total
         else:
-            new_grammar.append(rule)
-    return new_grammar
-
-# Left Factoring
-def left_factor(grammar):
-    new_grammar = []
-    for rule in grammar:
-        lhs, rhs = rule.split("->")
-        lhs = lhs.strip()
-        rhs = [alt.strip() for alt in rhs.split("|")]
-        common_prefix = None
-        for i in range(len(rhs) - 1):
-            prefix = rhs[i].split()[0]
-            if all(alt.startswith(prefix) for alt in rhs):
-                common_prefix = prefix
+            at += int(args[1]) * (max(view - unit, unit) if args[2] == "pages" else unit)
+        return int(max(0, min(at, total - view)))
+
+    def yview(self, *args):
+        self.y = self.scrolled(args, self.y, *self.body_height(), self.row_height)
+        self.redraw()
+
+    def xview(self, *args):
+        self.x = self.scrolled(args, self.x, *self.body_width(), 4 * self.char_width)
+        self.redraw()
+
+    def redraw(self):
+        if self.pending is None:
+            self.pending = self.after_idle(self.draw)
+
+    def destroy(self):
+        if self.pending is not None:
+            self.after_cancel(self.pending)
+        super().destroy()
+
+    def fit(self, text, width):
+        room = max(1, (width - 8) // self.char_width)
+        return text if len(text) <= room else text[:max(1, room - 3)] + "..."
+
+    def draw(self):
+        self.pending = None
+        canvas = self.canvas
+        canvas.delete("all")
+        height, rows = self.body_height()
+        width, columns = self.body_width()
+        self.y = max(0, min(self.y, rows - height))
+        self.x = max(0, min(self.x, columns - width))
+        rh, fixed = self.row_height, self.widths[0]
+        self.vbar.set(*((self.y / rows, (self.y + height) / rows) if rows > height else (0, 1)))
+        self.hbar.set(*((self.x / columns, (self.x + width) / columns) if columns > width else (0, 1)))
+
+        first_row = self.y // rh
+        last_row = min(self.row_count, (self.y + height) // rh + 1)
+        first_col = max(1, bisect_right(self.offsets, self.offsets[1] + self.x) - 1)
+        visible = []                     # (column, left edge on screen)
+        for c in range(first_col, len(self.headers)):
+            left = fixed + self.offsets[c] - self.offsets[1] - self.x
+            if left >= fixed + width:
                 break
-        if common_prefix:
-            new_nt = lhs + "'"
-            new_grammar.append(f"{lhs} -> {common_prefix} {new_nt}")
-            new_grammar.append(f"{new_nt} -> " + " | ".join(alt[len(common_prefix):].strip() or "ε" for alt in rhs))
+            visible.append((c, left))
+
+        right = fixed + min(width, columns - self.x)
+        bottom = rh + last_row * rh - self.y
+        for r in range(first_row, last_row):
+            top = rh + r * rh - self.y
+            for c, left in visible:
+                text = self.fit(self.cell(r, c), self.widths[c])
+                canvas.create_text(left + self.widths[c] // 2, top + rh // 2, text=text)
+            canvas.create_line(0, top + rh, right, top + rh, fill="#ddd")
+        for c, left in visible:
+            canvas.create_line(left + self.widths[c], 0, left + self.widths[c], bottom, fill="#ddd")
+
+        # The fixed column and header drawn over the scrolled cells
+        canvas.create_rectangle(0, rh, fixed, bottom, fill="#f4f4f4", outline="")
+        for r in range(first_row, last_row):
+            top = rh + r * rh - self.y
+            canvas.create_text(fixed // 2, top + rh // 2, text=self.fit(self.cell(r, 0), fixed))
+        canvas.create_rectangle(0, 0, right, rh, fill="#e4e4e4", outline="")
+        for c, left in visible:
+            text = self.fit(self.headers[c], self.widths[c])
+            canvas.create_text(left + self.widths[c] // 2, rh // 2, text=text, font="TkHeadingFont")
+        canvas.create_rectangle(0, 0, fixed, rh, fill="#e4e4e4", outline="")
+        canvas.create_text(fixed // 2, rh // 2, text=self.fit(self.headers[0], fixed), font="TkHeadingFont")
+        canvas.create_line(fixed, 0, fixed, bottom, fill="#999")
+        canvas.create_line(0, rh, right, rh, fill="#999")
+
+    # The cell under the pointer, as (row, column), or None
+    def cell_at(self, x, y):
+        if y < self.row_height:
+            return None
+        r = (y - self.row_height + self.y) // self.row_height
+        c = 0 if x < self.widths[0] else bisect_right(self.offsets, x - self.widths[0] + self.offsets[1] + self.x) - 1
+        if r >= self.row_count or c >= len(self.headers):
+            return None
+        return r, c
+
+    def click(self, event):
+        where = self.cell_at(event.x, event.y)
+        if where is not None and self.command is not None:
+            self.command(*where)
+
+# The work of every button, run in a background Job: each stage is reported
+# before it starts and the result goes back to the window
+def analyze(report, task, grammar):
+    if task == "cfg":
+        report("Transforming the grammar", 0, 1)
+        return compute_cfg(grammar)
+    stages = 4 if task == "table" else 3
+    report("Transforming the grammar", 0, stages)
+    grammar = default_cache().transformed(grammar)
+    report("Computing FIRST and FOLLOW", 1, stages)
+    first_sets = compute_first_sets(grammar)
+    follow_sets = compute_follow_sets(grammar, first_sets)
+    table = None
+    if task == "table":
+        report("Filling the parsing table", 2, stages)
+        table = compute_parsing_table_logic(grammar, first_sets, follow_sets)
+    report("Looking for conflicts", stages - 1, stages)
+    conflicts = [format_conflict(c) for c in ll1_conflicts(Grammar(split_rules(grammar)))]
+    return grammar, table, conflicts
+
+# Start a background analysis, stopping the one before
+def start_analysis(task):
+    global job
+    grammar = read_entries()
+    if grammar is None:
+        return
+    if not grammar:
+        show_output("No grammar entered")
+        return
+    if job is not None:
+        job.cancel()
+    job = Job(analyze, task, grammar)
+    progress.config(value=0, maximum=1)
+    status_text.set("Starting...")
+    cancel_button.config(state="normal")
+    root.after(POLL_MS, poll_analysis, job, task)
+
+def poll_analysis(polled, task):
+    if polled is not job:                # cancelled or replaced
+        return
+    for event in polled.poll():
+        if event[0] == "progress":
+            _, stage, done, total = event
+            progress.config(value=done, maximum=total)
+            status_text.set(stage + "...")
         else:
-            new_grammar.append(rule)
-    return new_grammar
+            finish_analysis()
+            if event[0] == "error":
+                status_text.set("Failed")
+                messagebox.showerror("Error", event[1])
+            else:
+                status_text.set("Done")
+                SHOW[task](event[1])
+            return
+    root.after(POLL_MS, poll_analysis, polled, task)
+
+def finish_analysis():
+    global job
+    job = None
+    progress.config(value=progress.cget("maximum"))
+    cancel_button.config(state="disabled")
+
+def cancel_analysis():
+    if job is not None:
+        job.cancel()
+        finish_analysis()
+        progress.config(value=0)
+        status_text.set("Cancelled")
+
+# Process CFG
+def process_cfg():
+    start_analysis("cfg")
+
+def show_cfg(transformed_grammar):
+    show_output("Final Transformed CFG:\n" + "\n".join(transformed_grammar))
 
 # Compute FIRST sets
 def compute_first_sets(grammar):
-    first = defaultdict(set)
-    rules = {rule.split("->")[0].strip(): rule.split("->")[1].strip().split("|") for rule in grammar}
-    
-    def first_of(symbol):
-        if symbol in first:
-            return first[symbol]
-        if not symbol.isupper():
-            return {symbol}
-        for production in rules.get(symbol, []):
-            for char in production.split():
-                first[symbol] |= first_of(char)
-                if 'ε' not in first_of(char):
-                    break
-        return first[symbol]
-    
-    for non_terminal in rules:
-        first_of(non_terminal)
-    
+    first, _, _ = default_cache().first_follow(split_rules(grammar))
     return first
 
 # Compute FOLLOW sets
 def compute_follow_sets(grammar, first_sets):
-    follow = defaultdict(set)
-    rules = {rule.split("->")[0].strip(): rule.split("->")[1].strip().split("|") for rule in grammar}
-
-    start_symbol = next(iter(rules))  
-    follow[start_symbol].add("$")
-
-    changed = True
-    while changed:
-        changed = False
-        for non_terminal, productions in rules.items():
-            for production in productions:
-                trailer = follow[non_terminal].copy()
-                
-                for i in reversed(range(len(production.split()))):
-                    symbol = production.split()[i]
-
-                    if symbol in rules:  
-                        original_size = len(follow[symbol])
-                        follow[symbol] |= trailer  
-
-                        if 'ε' in first_sets[symbol]:
-                            trailer |= (first_sets[symbol] - {'ε'})
-                        else:
-                            trailer = first_sets[symbol]
-
-                        if len(follow[symbol]) > original_size:
-                            changed = True
-                    else:
-                        trailer = first_sets[symbol] if symbol in first_sets else {symbol}  
+    _, follow, _ = default_cache().first_follow(split_rules(grammar))
     return follow
 
 # Display Parsing Table
-def display_parsing_table(table):
+def display_parsing_table(table, terminals):
     for widget in table_frame.winfo_children():
         widget.destroy()
 
@@ -147,130 +315,93 @@ def display_parsing_table(table):
         messagebox.showerror("Error", "Parsing table is empty or could not be generated")
         return
 
-    terminals = sorted(set(term for rules in table.values() for term in rules))
-    terminals.append("$")  # Add end-of-input symbol
-
-    columns = ["Non-Terminal"] + terminals  # Ensure order
-    tree = ttk.Treeview(table_frame, columns=columns, show="headings")
+    non_terminals = list(table)
+    columns = ["Non-Terminal"] + terminals
 
-    for col in columns:
-        tree.heading(col, text=col)
-        tree.column(col, width=100, anchor="center")
+    def cell(r, c):
+        return non_terminals[r] if c == 0 else table[non_terminals[r]].get(terminals[c - 1], "-")
 
-    for non_terminal, rules in table.items():
-        row = [non_terminal] + [rules.get(col, "-") for col in terminals]
-        tree.insert("", "end", values=row)
+    def show_cell(r, c):
+        if c:
+            show_output(f"M[{non_terminals[r]}, {terminals[c - 1]}] = {cell(r, c)}")
 
-    tree.pack(expand=True, fill="both")
+    view = TableView(table_frame, columns, len(non_terminals), cell, show_cell)
+    view.pack(expand=True, fill="both")
 
 # Compute Parsing Table
 def compute_parsing_table():
-    global grammar_entries
+    start_analysis("table")
 
-    grammar = [entry.get() for entry in grammar_entries if entry.get()]
-    if not grammar:
-        output_text.set("No grammar entered")
-        return
-
-    grammar = eliminate_left_recursion(grammar)
-    grammar = left_factor(grammar)
-    
-    first_sets = compute_first_sets(grammar)
-    follow_sets = compute_follow_sets(grammar, first_sets)
+def show_parsing_table(result):
+    _, (table, terminals), conflicts = result
+    display_parsing_table(table, terminals)
 
-    table, terminals = compute_parsing_table_logic(grammar, first_sets, follow_sets)
-
-    display_parsing_table(table)
+    # A cell wanted by several alternatives keeps the last one; say which
+    if conflicts:
+        lines = conflicts[:20]
+        if len(conflicts) > 20:
+            lines.append(f"... and {len(conflicts) - 20} more")
+        messagebox.showwarning("Conflicts", "\n".join(lines))
 
 # Compute LL(1) Parsing Table Logic
 def compute_parsing_table_logic(grammar, first, follow):
-    parsing_table = {}
-    rules = {rule.split("->")[0].strip(): rule.split("->")[1].strip().split("|") for rule in grammar}
-    terminals = set()
-
-    for productions in rules.values():
-        for prod in productions:
-            for symbol in prod.split():
-                if symbol not in rules and symbol != "ε":
-                    terminals.add(symbol)
-
-    terminals = sorted(terminals)
-    terminals.append("$")  # End of input marker
-
-    for non_terminal in rules:
-        parsing_table[non_terminal] = {t: "-" for t in terminals}  # Default empty
-
-    for A in rules:
-        for prod in rules[A]:
-            first_set = set()
-            prod_symbols = prod.split()
-
-            # Compute FIRST for the production
-            for symbol in prod_symbols:
-                first_set |= (first[symbol] - {"ε"}) if symbol in first else {symbol}
-                if "ε" not in first.get(symbol, {}):
-                    break
-            else:
-                first_set.add("ε")
-
-            # Fill table based on FIRST
-            for terminal in first_set - {"ε"}:
-                parsing_table[A][terminal] = prod
-
-            # If epsilon is in FIRST, use FOLLOW(A)
-            if "ε" in first_set:
-                for terminal in follow[A]:
-                    parsing_table[A][terminal] = "ε"
-
-    return parsing_table, terminals
-
-def check_ll1(grammar, first_sets, follow_sets):
-    rules = {rule.split("->")[0].strip(): rule.split("->")[1].strip().split("|") for rule in grammar}
-    ll1_grammar = []
-    for non_terminal, productions in rules.items():
-        first_seen = set()
-        for production in productions:
-            first_of_prod = set()
-            for char in production.split():
-                first_of_prod |= first_sets[char]
-                if 'ε' not in first_sets[char]:
-                    break
-            if first_seen & first_of_prod:
-                output_text.set("Grammar is NOT LL(1)")
-                return
-            first_seen |= first_of_prod
-        ll1_grammar.append(f"{non_terminal} -> " + " | ".join(productions))
-    output_text.set("LL(1) Grammar:\n" + "\n".join(ll1_grammar))
-
-def compute_ll1():
-    grammar = [entry.get() for entry in grammar_entries if entry.get()]
-    grammar = eliminate_left_recursion(grammar)
-    grammar = left_factor(grammar)
-    first_sets = compute_first_sets(grammar)
-    follow_sets = compute_follow_sets(grammar, first_sets)
-    check_ll1(grammar, first_sets, follow_sets)
-
-# GUI Setup
-root = tk.Tk()
-root.title("LL(1) Parser Generator")
-root.geometry("800x600")
-
-tk.Label(root, text="Enter number of productions:").pack()
-num_productions_entry = tk.Entry(root)
-num_productions_entry.pack()
-tk.Button(root, text="Generate Fields", command=generate_input_fields).pack()
-
-grammar_frame = tk.Frame(root)
-grammar_frame.pack()
+    return ll1_parsing_table(grammar, first, follow)
 
-table_frame = tk.Frame(root)
-table_frame.pack()
-
-tk.Button(root, text="Compute LL(1)", command=compute_ll1).pack()
-tk.Button(root, text="Compute CFG", command=process_cfg).pack()
-tk.Button(root, text="Compute Parsing Table", command=compute_parsing_table).pack()
-
-output_text = tk.StringVar()
-tk.Label(root, textvariable=output_text, fg="blue").pack()
+def check_ll1(result):
+    grammar, _, conflicts = result
+    if conflicts:
+        show_output("Grammar is NOT LL(1)\n" + "\n".join(conflicts))
+        return
+    show_output("LL(1) Grammar:\n" + "\n".join(grammar))
 
-root.mainloop()
+def compute_ll1():
+    start_analysis("ll1")
+
+SHOW = {"cfg": show_cfg, "ll1": check_ll1, "table": show_parsing_table}
+
+def main():
+    global root, num_productions_entry, grammar_frame, table_frame, output_box
+    global progress, status_text, cancel_button
+
+    # GUI Setup
+    root = tk.Tk()
+    root.title("LL(1) Parser Generator")
+    root.geometry("800x600")
+
+    tk.Label(root, text="Enter number of productions:").pack()
+    num_productions_entry = tk.Entry(root)
+    num_productions_entry.pack()
+    tk.Button(root, text="Generate Fields", command=generate_input_fields).pack()
+
+    grammar_frame = tk.Frame(root)
+    grammar_frame.pack()
+
+    tk.Button(root, text="Compute LL(1)", command=compute_ll1).pack()
+    tk.Button(root, text="Compute CFG", command=process_cfg).pack()
+    tk.Button(root, text="Compute Parsing Table", command=compute_parsing_table).pack()
+
+    status_frame = tk.Frame(root)
+    status_frame.pack()
+    progress = ttk.Progressbar(status_frame, length=200)
+    progress.pack(side="left", padx=5)
+    status_text = tk.StringVar()
+    tk.Label(status_frame, textvariable=status_text, width=30, anchor="w").pack(side="left")
+    cancel_button = tk.Button(status_frame, text="Cancel", command=cancel_analysis, state="disabled")
+    cancel_button.pack(side="left")
+
+    # Long sets and conflict lists scroll instead of growing the window
+    output_frame = tk.Frame(root)
+    output_frame.pack(side="bottom", fill="x")
+    output_box = tk.Text(output_frame, height=8, fg="blue", wrap="word", state="disabled")
+    output_bar = ttk.Scrollbar(output_frame, command=output_box.yview)
+    output_box.config(yscrollcommand=output_bar.set)
+    output_bar.pack(side="right", fill="y")
+    output_box.pack(side="left", fill="both", expand=True)
+
+    table_frame = tk.Frame(root)
+    table_frame.pack(expand=True, fill="both")
+
+    root.mainloop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Grammar analysis core shared by the lab scripts in ``codes/``.
+
+``python -m acdlab`` runs it over grammar files without any GUI.
+"""
+
+from .automata import DFA, NFA, determinize, minimize
+from .backend import (BasicBlock, allocate_registers, build_block, code_stats, compile_block,
+                      format_quad, optimize)
+from .cache import GrammarCache
+from .conflicts import (Precedence, conflict_report, format_conflict, ll1_conflicts,
+                        lr_conflicts)
+from .firstfollow import (analyze, compute_nullable, first_follow, first_of_sequence,
+                          sequence_first)
+from .frontend import ExpressionError, parse_statement, translate, translate_lines
+from .grammar import Grammar, iter_bits
+from .incremental import AnalysisSession
+from .jff import JffError, load_automaton, read_jff, write_jff
+from .lalr import lalr_lookaheads
+from .lexgen import LexError, Lexer, load_lexer, read_spec
+from .ll1 import LL1ParseError, LL1Parser, is_ll1, ll1_parsing_table
+from .loader import GrammarError, load_grammar, open_grammar, parse_rules, read_grammar
+from .lr0 import LR0Automaton
+from .lrparse import LRParser, ParseError
+from .lrtable import LRTable, build_table, compare_methods, slr_lookaheads
+from .matcher import Matcher, compile_matcher
+from .packed import PackedTable
+from .profiling import Profile, profiling
+from .regex import LazyDFA, RegexError, compile_regex, parse_regex, thompson
+from .tac import generate_tac, target_code
+from .transform import (compute_cfg, eliminate_left_recursion, factor_prefixes, left_factor,
+                        remove_left_recursion, split_rules, transform_rules)
+from .vm import MachineError, Program, run_code
+
+__all__ = [
+    "AnalysisSession",
+    "BasicBlock",
+    "DFA",
+    "ExpressionError",
+    "Grammar",
+    "GrammarCache",
+    "GrammarError",
+    "JffError",
+    "LL1ParseError",
+    "LL1Parser",
+    "LR0Automaton",
+    "LRParser",
+    "LRTable",
+    "LazyDFA",
+    "LexError",
+    "Lexer",
+    "MachineError",
+    "Matcher",
+    "NFA",
+    "PackedTable",
+    "ParseError",
+    "Precedence",
+    "Profile",
+    "Program",
+    "RegexError",
+    "allocate_registers",
+    "analyze",
+    "build_block",
+    "build_table",
+    "code_stats",
+    "compare_methods",
+    "compile_block",
+    "compile_matcher",
+    "compile_regex",
+    "compute_cfg",
+    "compute_nullable",
+    "conflict_report",
+    "determinize",
+    "eliminate_left_recursion",
+    "factor_prefixes",
+    "first_follow",
+    "first_of_sequence",
+    "format_conflict",
+    "format_quad",
+    "generate_tac",
+    "is_ll1",
+    "iter_bits",
+    "lalr_lookaheads",
+    "left_factor",
+    "ll1_conflicts",
+    "ll1_parsing_table",
+    "load_automaton",
+    "load_grammar",
+    "load_lexer",
+    "lr_conflicts",
+    "minimize",
+    "open_grammar",
+    "optimize",
+    "parse_rules",
+    "parse_regex",
+    "parse_statement",
+    "profiling",
+    "read_grammar",
+    "read_jff",
+    "read_spec",
+    "remove_left_recursion",
+    "run_code",
+    "sequence_first",
+    "slr_lookaheads",
+    "split_rules",
+    "target_code",
+    "thompson",
+    "transform_rules",
+    "translate",
+    "translate_lines",
+    "write_jff",
+]
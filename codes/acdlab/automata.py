@@ -0,0 +1,334 @@
+# Finite automata for the JFLAP exercises of "All exps".
+#
+# States are numbered 0..n-1 and a set of states is an int with bit s set for
+# state s, the same trick grammar.py uses for terminal sets: union is |,
+# emptiness is "not S", and a set can be a dict key as is.  Symbols are
+# numbered in the order of ``alphabet``.
+#
+# NFA.closures() is the epsilon closure of every state at once: the closure
+# of s is s plus the closures of its epsilon successors, which is FIRST-style
+# propagation over the strongly connected components of the epsilon graph
+# (firstfollow.propagate), linear in the number of epsilon edges.
+#
+# determinize() is the subset construction.  For every NFA state and symbol
+# the closed successor set is computed once, so the successor of a DFA state
+# on a symbol is the OR of one precomputed int per NFA state in it; DFA
+# states are found again through a dict keyed by their bitset.  Only subsets
+# reachable from the start are built, and the empty set becomes "no
+# transition" (-1) rather than a dead state.
+#
+# minimize() is Hopcroft's partition refinement, O(k n log n) for k symbols
+# and n states; its result is numbered canonically, so equal languages give
+# equal tables.
+
+from array import array
+
+from .firstfollow import propagate
+from .grammar import iter_bits
+
+
+class NFA:
+    """Nondeterministic automaton with epsilon moves.
+
+    ``moves[s]`` maps a symbol id to the set of successors of s, ``epsilon[s]``
+    is the set reached from s by one epsilon move, ``accepting`` the set of
+    final states.
+    """
+
+    def __init__(self, alphabet=()):
+        self.alphabet = list(alphabet)
+        self.symbol_ids = {a: i for i, a in enumerate(self.alphabet)}
+        self.names = []
+        self.moves = []
+        self.epsilon = []
+        self.start = 0
+        self.accepting = 0
+
+    def __len__(self):
+        return len(self.names)
+
+    def symbol(self, a):
+        """Id of symbol ``a``, added to the alphabet if new."""
+        i = self.symbol_ids.get(a)
+        if i is None:
+            i = self.symbol_ids[a] = len(self.alphabet)
+            self.alphabet.append(a)
+        return i
+
+    def add_state(self, name=None, accepting=False):
+        s = len(self.names)
+        self.names.append(f"q{s}" if name is None else name)
+        self.moves.append({})
+        self.epsilon.append(0)
+        if accepting:
+            self.accepting |= 1 << s
+        return s
+
+    def add_transition(self, p, a, q):
+        """p --a--> q; ``a`` is a symbol, or "" or None for an epsilon move."""
+        if not a:
+            self.epsilon[p] |= 1 << q
+            return
+        i = self.symbol(a)
+        self.moves[p][i] = self.moves[p].get(i, 0) | 1 << q
+
+    def closures(self):
+        """Epsilon closure of every state, as bitsets."""
+        n = len(self.names)
+        succ = [list(iter_bits(e)) for e in self.epsilon]
+        return propagate(range(n), succ, [1 << s for s in range(n)])
+
+    def is_deterministic(self):
+        return not any(self.epsilon) and all(
+            targets & (targets - 1) == 0 for moves in self.moves for targets in moves.values())
+
+    def accepts(self, word):
+        """Simulate the NFA on a sequence of symbols."""
+        closures = self.closures()
+        current = closures[self.start]
+        for a in word:
+            i = self.symbol_ids.get(a)
+            if i is None:
+                return False
+            following = 0
+            for s in iter_bits(current):
+                for t in iter_bits(self.moves[s].get(i, 0)):
+                    following |= closures[t]
+            current = following
+            if not current:
+                return False
+        return bool(current & self.accepting)
+
+    def state_names(self, states):
+        """"{q0,q2}" for the bitset of q0 and q2, as JFLAP labels subsets."""
+        return "{" + ",".join(self.names[s] for s in iter_bits(states)) + "}"
+
+
+class DFA:
+    """Deterministic automaton with a flat transition table.
+
+    ``table[s * len(alphabet) + a]`` is the successor of state s on symbol id a,
+    or -1.  ``accepting`` has a 1 for every final state; ``subsets``, when the
+    DFA comes from determinize(), holds the NFA states of each DFA state.
+    """
+
+    def __init__(self, alphabet, table, accepting, start=0, names=None, subsets=None):
+        self.alphabet = list(alphabet)
+        self.symbol_ids = {a: i for i, a in enumerate(self.alphabet)}
+        self.table = table
+        self.accepting = accepting
+        self.start = start
+        self.names = names if names is not None else [f"q{s}" for s in range(len(accepting))]
+        self.subsets = subsets
+
+    def __len__(self):
+        return len(self.accepting)
+
+    def step(self, s, a):
+        """Successor of state s on symbol ``a`` (not an id), or -1."""
+        i = self.symbol_ids.get(a)
+        return -1 if i is None else self.table[s * len(self.alphabet) + i]
+
+    def accepts(self, word):
+        s = self.start
+        for a in word:
+            s = self.step(s, a)
+            if s < 0:
+                return False
+        return bool(self.accepting[s])
+
+    def transitions(self):
+        """(state, symbol, successor) for every transition."""
+        k = len(self.alphabet)
+        for i, t in enumerate(self.table):
+            if t >= 0:
+                yield i // k, self.alphabet[i % k], t
+
+
+def closed_steps(nfa, closures=None):
+    """step[a][s]: the closed set of successors of NFA state s on symbol id a."""
+    closures = closures or nfa.closures()
+    step = [[0] * len(nfa) for _ in nfa.alphabet]
+    for s, moves in enumerate(nfa.moves):
+        for a, targets in moves.items():
+            closed = 0
+            for t in iter_bits(targets):
+                closed |= closures[t]
+            step[a][s] = closed
+    return step
+
+
+def determinize(nfa):
+    """Subset construction: the DFA of the subsets reachable from the start."""
+    closures = nfa.closures()
+    step = closed_steps(nfa, closures)
+    start = closures[nfa.start]
+    index = {start: 0}
+    subsets = [start]
+    table = array("i")
+    for S in subsets:                # grows while it is walked
+        members = list(iter_bits(S))
+        for row in step:
+            T = 0
+            for s in members:
+                T |= row[s]
+            if not T:
+                table.append(-1)
+                continue
+            j = index.get(T)
+            if j is None:
+                j = index[T] = len(subsets)
+                subsets.append(T)
+            table.append(j)
+    accepting = bytearray(1 if S & nfa.accepting else 0 for S in subsets)
+    return DFA(nfa.alphabet, table, accepting, names=[f"q{i}" for i in range(len(subsets))],
+               subsets=subsets)
+
+
+def minimize(dfa):
+    """Minimal DFA of the same language (Hopcroft's algorithm).
+
+    Unreachable states are dropped first and missing transitions go to an
+    added dead state.  The partition starts as {final, non-final} (one
+    block per accepting value) and is refined by splitters (block, symbol):
+    every block with some but not all states moving into the splitter on
+    that symbol is split, and the smaller half becomes a new splitter for
+    every symbol, which bounds the work by O(k n log n).  Blocks are
+    contiguous runs of one array and a split only moves the marked states
+    (Valmari and Lehtinen's refinable partition).
+
+    ``accepting`` may hold other values than 0 and 1, such as the number of
+    the rule a lexer state accepts: states with different values are never
+    merged, and the result keeps them (in an array of the same type, or a
+    bytearray).  The states that cannot reach a final state end up in one
+    block, which is dropped again, so the result has -1 for "no transition"
+    like determinize().  States are numbered breadth first from the start,
+    so two automata for the same language over the same alphabet come out
+    identical.
+    """
+    k = len(dfa.alphabet)
+    table = dfa.table
+    # Reachable states in BFS order, then the dead state if one is needed
+    number = {dfa.start: 0}
+    order = [dfa.start]
+    for s in order:
+        for t in table[s * k:(s + 1) * k]:
+            if t >= 0 and t not in number:
+                number[t] = len(order)
+                order.append(t)
+    n = len(order)
+    delta = []
+    for s in order:
+        delta.extend(number[t] if t >= 0 else n for t in table[s * k:(s + 1) * k])
+    if n in delta:
+        delta.extend([n] * k)
+        n += 1
+    final = [dfa.accepting[order[s]] if s < len(order) else 0 for s in range(n)]
+
+    # Predecessors per symbol, in compressed rows: pred[a][offset[a][t]:offset[a][t + 1]]
+    pred, offset = [], []
+    for a in range(k):
+        count = [0] * (n + 1)
+        for s in range(n):
+            count[delta[s * k + a] + 1] += 1
+        for t in range(n):
+            count[t + 1] += count[t]
+        fill = count[:-1]
+        row = [0] * n
+        for s in range(n):
+            t = delta[s * k + a]
+            row[fill[t]] = s
+            fill[t] += 1
+        pred.append(row)
+        offset.append(count)
+
+    # Refinable partition: block b is elements[first[b]:end[b]], marked ones
+    # first; it starts with one block per accepting value
+    elements = sorted(range(n), key=lambda s: final[s])
+    location = [0] * n
+    block = [0] * n
+    first, end = [], []
+    for i, s in enumerate(elements):
+        location[s] = i
+        if i == 0 or final[s] != final[elements[i - 1]]:
+            first.append(i)
+            end.append(i)
+        end[-1] = i + 1
+        block[s] = len(first) - 1
+    mid = list(first)
+
+    # Every initial block but the largest is a splitter
+    largest = max(range(len(first)), key=lambda b: end[b] - first[b])
+    pending = [(b, a) for b in range(len(first)) if b != largest for a in range(k)]
+    while pending:
+        splitter, a = pending.pop()
+        touched = []
+        row, starts = pred[a], offset[a]
+        for t in elements[first[splitter]:end[splitter]]:
+            for s in row[starts[t]:starts[t + 1]]:
+                b = block[s]
+                i, j = location[s], mid[b]
+                if i < j:
+                    continue         # already marked
+                if j == first[b]:
+                    touched.append(b)
+                elements[i], elements[j] = elements[j], s
+                location[elements[i]] = i
+                location[s] = j
+                mid[b] = j + 1
+        for b in touched:
+            if mid[b] == end[b]:
+                mid[b] = first[b]
+                continue
+            # The smaller of the marked and unmarked parts becomes block c
+            c = len(first)
+            if mid[b] - first[b] <= end[b] - mid[b]:
+                first.append(first[b])
+                end.append(mid[b])
+                first[b] = mid[b]
+            else:
+                first.append(mid[b])
+                end.append(end[b])
+                end[b] = mid[b]
+            mid[b] = first[b]
+            mid.append(first[c])
+            for s in elements[first[c]:end[c]]:
+                block[s] = c
+            pending.extend((c, symbol) for symbol in range(k))
+
+    # Blocks in BFS order from the start; the dead block (not final, no way out) is dropped
+    blocks = len(first)
+    representative = [elements[first[b]] for b in range(blocks)]
+    dead = [not final[representative[b]] and
+            all(block[delta[representative[b] * k + a]] == b for a in range(k))
+            for b in range(blocks)]
+    renumber = {block[0]: 0}
+    queue = [block[0]]
+    new_table = array("i")
+    for b in queue:
+        s = representative[b]
+        for a in range(k):
+            c = block[delta[s * k + a]]
+            if dead[c]:
+                new_table.append(-1)
+                continue
+            if c not in renumber:
+                renumber[c] = len(queue)
+                queue.append(c)
+            new_table.append(renumber[c])
+    if dead[block[0]]:
+        # Empty language: a single non-final state without transitions
+        return DFA(dfa.alphabet, array("i", [-1] * k), _accepting_like(dfa, [0]), names=["q0"])
+    accepting = _accepting_like(dfa, [final[representative[b]] for b in queue])
+    names = []
+    for b in queue:
+        members = sorted(order[s] for s in elements[first[b]:end[b]] if s < len(order))
+        names.append(dfa.names[members[0]] if len(members) == 1
+                     else "{" + ",".join(dfa.names[s] for s in members) + "}")
+    return DFA(dfa.alphabet, new_table, accepting, names=names)
+
+
+def _accepting_like(dfa, values):
+    if isinstance(dfa.accepting, array):
+        return array(dfa.accepting.typecode, values)
+    return bytearray(values)
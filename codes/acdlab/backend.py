@@ -0,0 +1,405 @@
+# Optimizing backend for the statements of tac.py.
+#
+# generate_tac() turns every operation into LOAD R1 / op / STORE, so every
+# value makes a round trip through memory.  Here the statements, flattened by
+# frontend.py, become a basic block of quadruples (op, dst, a, b), with op
+# one of + - * / or "=" for a copy (b is then None) and operands that are
+# variable names or numbers, and go through three passes:
+#
+#   value_numbering      local value numbering: common subexpressions, constant
+#                        folding, x+0 / x*1 / x-x style identities and copy
+#                        propagation, in one forward walk
+#   eliminate_dead_code  one backward walk with the set of live variables;
+#                        assignments nobody reads before the end are dropped
+#   allocate_registers   linear scan over the live intervals of the values
+#                        left, spilling the interval that ends last when the
+#                        registers run out (Poletto and Sarkar 1999)
+#
+# The statements have no labels or jumps, so a program is a single basic
+# block.  The variables it leaves in memory (live_out) are every variable it
+# assigns unless told otherwise; build_block() leaves out the temporaries of
+# the front end, so they never reach memory.
+#
+# The target code keeps the instruction set of generate_tac(): LOAD R, x and
+# STORE x, R move between a register and memory, ADD/SUB/MUL/DIV R, x compute
+# R = R op x.  An operand is a register (R1..Rn), a number or a variable;
+# LOAD R1, R2 copies a register and LOAD R1, 5 loads a constant.  Spilled
+# values go to memory cells named _s0, _s1, ...
+
+import re
+
+from .frontend import is_temporary, translate_lines
+
+OPCODES = {"+": "ADD", "-": "SUB", "*": "MUL", "/": "DIV"}
+COMMUTATIVE = {"+", "*"}
+REGISTER = re.compile(r"R\d+$")
+
+
+def number(token):
+    """The int or float a token spells, or None for anything else."""
+    try:
+        return int(token)
+    except ValueError:
+        pass
+    try:
+        return float(token)
+    except ValueError:
+        return None
+
+
+def _is_name(operand):
+    return isinstance(operand, str)
+
+
+class BasicBlock:
+    """Straight-line quadruples and the variables that must be in memory at the end."""
+
+    def __init__(self, quads, live_out=None):
+        self.quads = list(quads)
+        if live_out is None:
+            live_out = {dst for _, dst, _, _ in self.quads}
+        self.live_out = set(live_out)
+
+    def __len__(self):
+        return len(self.quads)
+
+    def __iter__(self):
+        return iter(self.quads)
+
+    def statements(self):
+        """The quadruples as "x = y op z" strings."""
+        return [format_quad(quad) for quad in self.quads]
+
+
+def format_quad(quad):
+    """A quadruple as an "x = y op z" or "x = y" statement."""
+    op, dst, a, b = quad
+    return f"{dst} = {a}" if op == "=" else f"{dst} = {a} {op} {b}"
+
+
+def build_block(statements, errors=None):
+    """BasicBlock of "var = expression" statements, flattened by frontend.py.
+
+    The variables assigned are live at the end, the temporaries of the
+    front end are not.  A statement that does not parse produces no code and
+    a message that goes to ``errors`` if it is a list, otherwise it is
+    printed, as in generate_tac().
+    """
+    quads = list(translate_lines(statements, errors))
+    return BasicBlock(quads, {dst for _, dst, _, _ in quads if not is_temporary(dst)})
+
+
+def fold(op, a, b):
+    """a op b for two numbers, or None when it is not safe to fold."""
+    if op == "+":
+        return a + b
+    if op == "-":
+        return a - b
+    if op == "*":
+        return a * b
+    if b == 0:
+        return None
+    if isinstance(a, int) and isinstance(b, int) and a % b == 0:
+        return a // b
+    return a / b
+
+
+def value_numbering(block):
+    """Local value numbering of a block; returns the rewritten BasicBlock.
+
+    Every value gets a number; a name holds one value number at a time and
+    every value number remembers the names holding it, so a recomputed
+    expression becomes a copy of a name that still holds it, a copy makes
+    later uses read the original name, and an assignment of the value a name
+    already holds disappears.
+    """
+    names = {}                       # name -> value number
+    holders = {}                     # value number -> {name: None}, oldest first
+    constants = {}                   # constant -> value number
+    constant_of = {}                 # value number -> constant
+    expressions = {}                 # (op, vn, vn) -> value number
+
+    def fresh():
+        vn = len(holders)
+        holders[vn] = {}
+        return vn
+
+    def lookup(operand):
+        if _is_name(operand):
+            vn = names.get(operand)
+            if vn is None:
+                vn = names[operand] = fresh()
+                holders[vn][operand] = None
+            return vn
+        vn = constants.get(operand)
+        if vn is None:
+            vn = constants[operand] = fresh()
+            constant_of[vn] = operand
+        return vn
+
+    def spell(vn):
+        if vn in constant_of:
+            return constant_of[vn]
+        return next(iter(holders[vn]))
+
+    def identity(op, va, vb):
+        ca, cb = constant_of.get(va), constant_of.get(vb)
+        if op == "+":
+            if ca == 0:
+                return vb
+            if cb == 0:
+                return va
+        elif op == "-":
+            if cb == 0:
+                return va
+            if va == vb:
+                return lookup(0)
+        elif op == "*":
+            if ca == 1:
+                return vb
+            if cb == 1:
+                return va
+            if ca == 0 or cb == 0:
+                return lookup(0)
+        elif cb == 1:
+            return va
+        return None
+
+    quads = []
+    for op, dst, a, b in block:
+        if op == "=":
+            vn = lookup(a)
+            quad = None
+        else:
+            va, vb = lookup(a), lookup(b)
+            if op in COMMUTATIVE and vb < va:
+                va, vb = vb, va
+            vn = None
+            if va in constant_of and vb in constant_of:
+                value = fold(op, constant_of[va], constant_of[vb])
+                if value is not None:
+                    vn = lookup(value)
+            if vn is None:
+                vn = identity(op, va, vb)
+            if vn is None:
+                vn = expressions.get((op, va, vb))
+            if vn is None:
+                vn = expressions[op, va, vb] = fresh()
+            quad = (op, dst, spell(va), spell(vb))
+        old = names.get(dst)
+        if old == vn:
+            continue
+        if vn in constant_of or holders[vn]:
+            quad = ("=", dst, spell(vn), None)
+        quads.append(quad)
+        if old is not None:
+            del holders[old][dst]
+        names[dst] = vn
+        holders[vn][dst] = None
+    return BasicBlock(quads, block.live_out)
+
+
+def eliminate_dead_code(block):
+    """The block without assignments that are overwritten or never read."""
+    live = set(block.live_out)
+    quads = []
+    for quad in reversed(block.quads):
+        op, dst, a, b = quad
+        if dst not in live:
+            continue
+        live.discard(dst)
+        for operand in (a, b):
+            if _is_name(operand):
+                live.add(operand)
+        quads.append(quad)
+    quads.reverse()
+    return BasicBlock(quads, block.live_out)
+
+
+def optimize(block):
+    """value_numbering() then eliminate_dead_code()."""
+    return eliminate_dead_code(value_numbering(block))
+
+
+def allocate_registers(block, registers=4):
+    """Target code for a block using ``registers`` registers (at least 2).
+
+    The block is first turned into values: the value a variable has on entry,
+    each computed result and each constant.  A value's live interval runs
+    from where it is computed (or first read) to its last use, and the last
+    value of a variable in live_out is used once more by the STORE that puts
+    it in memory.  That STORE waits until the entry value of the variable,
+    which may be read from memory, has had its last read as an operand.
+
+    The intervals are then scanned in order of their start.  A result always
+    gets a register; a variable read from memory is loaded into one only
+    when it is read again later.  When no register is free, the active value
+    whose interval ends last is spilled (unless it is the one asking, when
+    the operand is simply read from memory): a value still in memory costs
+    nothing, any other is stored to a spill cell first.
+    """
+    if registers < 2:
+        raise ValueError("at least 2 registers are needed")
+
+    # Values: ("in", name) on entry, ("const", c), and quad indexes for results
+    current = {}
+    entry = {}
+    computed = []                    # per quad: (op, [a, b] values) or None
+    uses = {}
+
+    def value(operand):
+        if not _is_name(operand):
+            return ("const", operand)
+        v = current.get(operand)
+        if v is None:
+            v = current[operand] = entry[operand] = ("in", operand)
+        return v
+
+    for i, (op, dst, a, b) in enumerate(block):
+        if op == "=":
+            current[dst] = value(a)
+            computed.append(None)
+            continue
+        args = [value(a), value(b)]
+        for v in args:
+            if not _constant(v):
+                uses.setdefault(v, []).append(i)
+        computed.append((op, args))
+        current[dst] = i
+
+    stores = {}                      # position -> [(name, value)], done after that quad
+    for name in sorted(block.live_out):
+        v = current.get(name)
+        if v is None or v == entry.get(name):
+            continue
+        position = max(uses.get(entry.get(name), [-1])[-1], v if isinstance(v, int) else -1)
+        stores.setdefault(position, []).append((name, v))
+        if not _constant(v):
+            uses.setdefault(v, []).append(position)
+    remaining = {v: len(positions) for v, positions in uses.items()}
+    end = {v: max(positions) for v, positions in uses.items()}
+
+    code = []
+    free = [f"R{k}" for k in range(registers, 0, -1)]
+    register = {}                    # value -> register holding it
+    active = {}                      # register -> value
+    home = {v: v[1] for v in entry.values()}   # value -> memory cell holding it
+    cells = []
+
+    def spell(v):
+        if _constant(v):
+            return str(v[1])
+        return register[v] if v in register else home[v]
+
+    def take(v, force, pinned=()):
+        if free:
+            r = free.pop()
+        else:
+            w = max((w for w in active.values() if w not in pinned), key=lambda w: end.get(w, -1))
+            if not force and end[w] <= end[v]:
+                return None
+            r = register.pop(w)
+            if w not in home:
+                home[w] = f"_s{len(cells)}"
+                cells.append(w)
+                code.append(f"STORE {home[w]}, {r}")
+        register[v] = r
+        active[r] = v
+        return r
+
+    def drop(v):
+        r = register.pop(v)
+        del active[r]
+        free.append(r)
+
+    def release(v, count=1):
+        if _constant(v):
+            return
+        remaining[v] -= count
+        if not remaining[v] and v in register:
+            drop(v)
+
+    def store(name, v):
+        old = entry.get(name)
+        if old is not None and home.get(old) == name:
+            # x is about to be overwritten: keep its entry value if still wanted
+            if remaining.get(old) and old not in register:
+                code.append(f"LOAD {take(old, True, (v,))}, {name}")
+            del home[old]
+        if v not in register:
+            r = take(v, True)
+            code.append(f"LOAD {r}, {spell_memory(v)}")
+        code.append(f"STORE {name}, {register[v]}")
+        if _constant(v):
+            drop(v)
+        else:
+            home.setdefault(v, name)
+            release(v)
+
+    def spell_memory(v):
+        return str(v[1]) if _constant(v) else home[v]
+
+    for position in range(-1, len(computed)):
+        if position >= 0 and computed[position] is not None:
+            op, (va, vb) = computed[position]
+            here = {va: 0, vb: 0}
+            here[va] += 1
+            here[vb] += 1
+            for v in here:
+                # Keep a value read from memory in a register if it is read again
+                if not _constant(v) and v not in register and remaining[v] > here[v]:
+                    r = take(v, False, tuple(here))
+                    if r is not None:
+                        code.append(f"LOAD {r}, {home[v]}")
+
+            def dies(v):
+                return not _constant(v) and v in register and remaining[v] == here[v]
+
+            if op in COMMUTATIVE and not dies(va) and dies(vb):
+                va, vb = vb, va
+            if dies(va):
+                r = register.pop(va)
+                register[position] = r
+                active[r] = position
+                operand = r if vb == va else spell(vb)
+            else:
+                source = spell(va)
+                r = take(position, True, (va,))
+                code.append(f"LOAD {r}, {source}")
+                operand = spell(vb)
+            code.append(f"{OPCODES[op]} {r}, {operand}")
+            for v, count in here.items():
+                release(v, count)
+            if not remaining.get(position):
+                drop(position)
+        for name, v in stores.get(position, ()):
+            store(name, v)
+    return code
+
+
+def _constant(v):
+    return isinstance(v, tuple) and v[0] == "const"
+
+
+def compile_block(block, registers=4):
+    """optimize() then allocate_registers()."""
+    return allocate_registers(optimize(block), registers)
+
+
+def memory_operand(operand):
+    """True if an instruction operand names a memory cell."""
+    return not REGISTER.match(operand) and number(operand) is None
+
+
+def code_stats(code):
+    """{"instructions", "memory"}: instruction count and memory accesses of target code.
+
+    LOAD R, x and ADD R, x read memory when x is a variable, STORE writes it.
+    """
+    memory = 0
+    for instruction in code:
+        opcode, operands = instruction.split(None, 1)
+        first, second = operands.split(",")
+        if opcode == "STORE" or memory_operand(second.strip()):
+            memory += 1
+    return {"instructions": len(code), "memory": memory}
@@ -0,0 +1,68 @@
+# Running an analysis away from a GUI's event loop.
+#
+# Job(fn, *args) calls fn(report, *args) in a child process, so a long
+# analysis neither freezes the window nor competes with it for the GIL, and
+# cancel() can stop it in the middle of a stage by terminating the process.
+# fn calls report(stage, done, total) as it goes; the GUI collects those
+# events with poll() from a timer (Tk's after()), and the last one carries
+# the result or the error.  fn, its arguments and its result must pickle:
+# the process is spawned, so fn must be a top-level function of an
+# importable module, and the child imports acdlab afresh.
+
+import multiprocessing
+import queue
+
+
+def _run(events, fn, args):
+    def report(stage, done=0, total=0):
+        events.put(("progress", stage, done, total))
+
+    try:
+        result = fn(report, *args)
+    except Exception as e:
+        events.put(("error", f"{type(e).__name__}: {e}"))
+    else:
+        events.put(("done", result))
+
+
+class Job:
+    """fn(report, *args) in a child process, with progress events and cancel()."""
+
+    def __init__(self, fn, *args):
+        context = multiprocessing.get_context("spawn")
+        self.events = context.Queue()
+        self.process = context.Process(target=_run, args=(self.events, fn, args), daemon=True)
+        self.process.start()
+        self.finished = False
+
+    def poll(self):
+        """Events since the last call, without blocking.
+
+        ("progress", stage, done, total) as fn reports them, then once
+        ("done", result) or ("error", message), after which the job is
+        finished.
+        """
+        events = []
+        while not self.finished:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                # Anything sent before the child exited is in the pipe by now
+                if self.process.is_alive() or not self.events.empty():
+                    break
+                event = ("error", f"worker exited with code {self.process.exitcode}")
+            events.append(event)
+            if event[0] != "progress":
+                self._close()
+        return events
+
+    def cancel(self):
+        """Stop the job; no more events come after this."""
+        if not self.finished:
+            self.process.terminate()
+            self._close()
+
+    def _close(self):
+        self.finished = True
+        self.process.join()
+        self.events.close()
@@ -0,0 +1,118 @@
+# Fanning a command of commands.py out over a process pool.
+#
+# Paths are read lazily and sent to the workers in chunks of a few files, so
+# the pool is never handed more than ``max_pending`` chunks at once: the
+# parent holds at most that many chunks of results, whatever the size of the
+# corpus, and records are yielded as soon as their chunk completes (not in
+# input order).  Each worker imports acdlab once and then only receives path
+# names and sends back plain dicts, so the work scales with the number of
+# processes until the disk or the parent's JSON encoding becomes the limit.
+
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+from .cache import GrammarCache, canonical_file
+from .commands import COMMANDS
+from .loader import GrammarError, read_grammar
+from .profiling import stage
+
+ERRORS = (OSError, ValueError, KeyError, IndexError, RecursionError)
+_caches = {}                         # directory -> GrammarCache, per process
+
+
+def default_jobs():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def cached_report(cache, command, text, options=None):
+    """COMMANDS[command](text), looked up in a GrammarCache first.
+
+    Grammar inputs are keyed by their canonical rules and precedence
+    declarations, other inputs by their text with the whitespace of every
+    line normalized.
+    """
+    options = options or {}
+    if command == "tac":
+        canonical = "\n".join(" ".join(line.split()) for line in text.splitlines() if line.strip())
+    else:
+        canonical = canonical_file(read_grammar(text.splitlines()))
+    key = cache.key(f"report-{command}-{json.dumps(options, sort_keys=True)}", canonical)
+    result = cache.load(key)
+    if result is None:
+        result = cache.store(key, COMMANDS[command](text, **options))
+    return result
+
+
+def run_one(command, path, options=None, cache=None):
+    """{"path", "result" or "error", "seconds"} for one input file.
+
+    ``cache`` names a GrammarCache directory to look results up in.
+    """
+    t0 = time.perf_counter()
+    try:
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        with stage(command, path):
+            if cache is None:
+                result = COMMANDS[command](text, **(options or {}))
+            else:
+                if cache not in _caches:
+                    _caches[cache] = GrammarCache(cache)
+                result = cached_report(_caches[cache], command, text, options)
+        record = {"path": path, "result": result}
+    except GrammarError as e:
+        record = {"path": path, "error": f"GrammarError: {path}:{e.line}:{e.column}: {e.message}"}
+    except ERRORS as e:
+        record = {"path": path, "error": f"{type(e).__name__}: {e}"}
+    record["seconds"] = time.perf_counter() - t0
+    return record
+
+
+def _run_chunk(command, paths, options, cache):
+    return [run_one(command, path, options, cache) for path in paths]
+
+
+def _chunks(paths, size):
+    paths = iter(paths)
+    while True:
+        chunk = list(islice(paths, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_batch(paths, command="analyze", options=None, jobs=None, chunk=8, max_pending=None,
+              cache=None):
+    """Yield run_one() records for every path, as they complete.
+
+    ``jobs`` is the number of worker processes (default: the usable CPUs);
+    with 1 everything runs in this process, in input order.  At most
+    ``max_pending`` chunks of ``chunk`` paths are in flight at a time
+    (default: four per worker).  ``cache`` is passed on to run_one().
+    """
+    if jobs is None:
+        jobs = default_jobs()
+    if jobs <= 1:
+        for path in paths:
+            yield run_one(command, path, options, cache)
+        return
+    if max_pending is None:
+        max_pending = 4 * jobs
+    with ProcessPoolExecutor(jobs) as pool:
+        pending = set()
+        for paths_chunk in _chunks(paths, chunk):
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+            pending.add(pool.submit(_run_chunk, command, paths_chunk, options, cache))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
@@ -0,0 +1 @@
+"""Benchmarks for the acdlab engines.  Run them with ``python -m acdlab.bench.<name>``."""
@@ -0,0 +1,101 @@
+"""Loading .jff files and the subset construction: states and time per automaton.
+
+    python -m acdlab.bench.automata [--from-end 8 12 16] [--keywords 200 1000]
+
+Three groups of automata:
+
+  jff        every finite automaton in "All exps"
+  from-end   "the n-th symbol from the end is a" over {a, b}: n + 1 NFA states
+             whose DFA needs 2^n, the textbook blow-up
+  keywords   "contains one of k random keywords" over a..z: a Sigma* loop and
+             one chain per keyword, thousands of NFA states with a DFA of
+             about the same size (an Aho-Corasick automaton)
+
+The synthetic NFAs are written to a .jff file first, so the load column
+times read_jff() on them as well.
+"""
+
+import argparse
+import glob
+import os
+import random
+import shutil
+import tempfile
+
+from acdlab.automata import NFA, determinize
+from acdlab.bench.lrparse import best_of
+from acdlab.jff import read_jff, write_jff
+
+ALL_EXPS = os.path.join(os.path.dirname(__file__), "..", "..", "..", "All exps")
+
+
+def nth_from_end(n):
+    """NFA for strings over {a, b} whose n-th symbol from the end is a."""
+    nfa = NFA("ab")
+    for i in range(n + 1):
+        nfa.add_state(accepting=i == n)
+    nfa.add_transition(0, "a", 0)
+    nfa.add_transition(0, "b", 0)
+    nfa.add_transition(0, "a", 1)
+    for i in range(1, n):
+        nfa.add_transition(i, "a", i + 1)
+        nfa.add_transition(i, "b", i + 1)
+    return nfa
+
+
+def keywords(k, seed=0):
+    """NFA for strings over a..z containing one of ``k`` random keywords of length 4 to 10."""
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    nfa = NFA(letters)
+    start = nfa.add_state()
+    for a in letters:
+        nfa.add_transition(start, a, start)
+    final = nfa.add_state(accepting=True)
+    for a in letters:
+        nfa.add_transition(final, a, final)
+    for _ in range(k):
+        word = "".join(rng.choice(letters) for _ in range(rng.randint(4, 10)))
+        p = start
+        for a in word[:-1]:
+            q = nfa.add_state()
+            nfa.add_transition(p, a, q)
+            p = q
+        nfa.add_transition(p, word[-1], final)
+    return nfa
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--from-end", type=int, nargs="*", default=[8, 12, 16])
+    parser.add_argument("--keywords", type=int, nargs="*", default=[200, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    directory = tempfile.mkdtemp()
+    cases = []
+    for path in sorted(glob.glob(os.path.join(ALL_EXPS, "*.jff"))):
+        if read_jff(path).automaton is not None:
+            cases.append((os.path.basename(path)[:-4], path))
+    synthetic = [(f"from-end-{n}", nth_from_end(n)) for n in args.from_end]
+    synthetic += [(f"keywords-{k}", keywords(k)) for k in args.keywords]
+    for name, nfa in synthetic:
+        path = os.path.join(directory, name + ".jff")
+        write_jff(nfa, path)
+        cases.append((name, path))
+
+    print(f"{'automaton':>34} {'nfa':>6} {'dfa':>7} {'load':>9} {'subset':>9} {'dfa/s':>9}")
+    try:
+        for name, path in cases:
+            load = best_of(args.repeat, lambda: read_jff(path))
+            nfa = read_jff(path).automaton
+            subset = best_of(args.repeat, lambda: determinize(nfa))
+            dfa = determinize(nfa)
+            print(f"{name[:34]:>34} {len(nfa):>6} {len(dfa):>7} {load * 1000:>7.2f}ms "
+                  f"{subset * 1000:>7.2f}ms {len(dfa) / subset:>9,.0f}")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
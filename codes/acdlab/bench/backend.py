@@ -0,0 +1,82 @@
+"""Optimizing backend: instruction and memory-access counts before and after, and compile time.
+
+    python -m acdlab.bench.backend [--statements 10000 100000 1000000] [--registers 2 4 8]
+
+The programs are random "x = y op z" statements over 32 variables v0..v31 and
+32 temporaries t0..t31, like hand-flattened expressions: a statement reads the
+temporaries written shortly before it, sometimes recomputes an expression
+seen a few statements earlier, and now and then has a constant operand.
+Only the variables are live at the end.  "before" is generate_tac(), which
+stores every statement's result; "after" is optimize() and allocate_registers()
+of backend.py.
+"""
+
+import argparse
+import random
+import time
+
+from acdlab.backend import BasicBlock, allocate_registers, build_block, code_stats, optimize
+from acdlab.tac import generate_tac
+
+
+def random_program(n, variables=32, temporaries=32, seed=0, constant_divisors=False):
+    """``n`` statements as "x = y op z" strings, and the variables live at the end.
+
+    With ``constant_divisors`` every / divides by a constant from 1 to 9, so
+    the program can be run without dividing by zero.
+    """
+    rng = random.Random(seed)
+    names = [f"v{i}" for i in range(variables)]
+    temps = [f"t{i}" for i in range(temporaries)]
+    recent = []
+    statements = []
+    for i in range(n):
+        if recent and rng.random() < 0.2:
+            _, a, op, b = rng.choice(recent)
+        else:
+            operands = []
+            for _ in range(2):
+                r = rng.random()
+                if r < 0.1:
+                    operands.append(str(rng.randint(0, 9)))
+                elif r < 0.5:
+                    operands.append(temps[(i - rng.randint(1, 4)) % temporaries])
+                else:
+                    operands.append(rng.choice(names))
+            a, b = operands
+            op = rng.choice("+-*/")
+            if op == "/" and (constant_divisors or b in "0123456789"):
+                b = str(rng.randint(1, 9))
+        dst = temps[i % temporaries] if rng.random() < 0.7 else rng.choice(names)
+        statements.append(f"{dst} = {a} {op} {b}")
+        recent.append((dst, a, op, b))
+        del recent[:-8]
+    return statements, set(names)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--statements", type=int, nargs="*", default=[10000, 100000, 1000000])
+    parser.add_argument("--registers", type=int, nargs="*", default=[2, 4, 8])
+    args = parser.parse_args(argv)
+
+    print(f"{'statements':>10} {'regs':>4} {'instr before':>12} {'after':>9} {'memory before':>13} "
+          f"{'after':>9} {'optimize':>9} {'allocate':>9}")
+    for n in args.statements:
+        statements, live_out = random_program(n)
+        before = code_stats(generate_tac(statements))
+        block = BasicBlock(build_block(statements, []).quads, live_out)
+        t0 = time.perf_counter()
+        optimized = optimize(block)
+        optimize_seconds = time.perf_counter() - t0
+        for registers in args.registers:
+            t0 = time.perf_counter()
+            after = code_stats(allocate_registers(optimized, registers))
+            allocate_seconds = time.perf_counter() - t0
+            print(f"{n:>10} {registers:>4} {before['instructions']:>12} {after['instructions']:>9} "
+                  f"{before['memory']:>13} {after['memory']:>9} {optimize_seconds:>8.2f}s "
+                  f"{allocate_seconds:>8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
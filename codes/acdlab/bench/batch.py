@@ -0,0 +1,61 @@
+"""Batch analysis throughput and memory over a generated grammar corpus.
+
+    python -m acdlab.bench.batch [--files 1000 4000] [--size 60] [--jobs 1 2 4]
+
+Every file goes through the "analyze" pipeline and its JSON line is encoded
+and discarded, as when streaming to a file.  "maxrss" is the parent process's
+peak resident size so far: it should stay flat as the corpus grows.
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import tempfile
+import time
+
+from acdlab.batch import default_jobs, run_batch
+from acdlab.bench.grammars import synthetic_grammar
+from acdlab.loader import grammar_files
+from acdlab.transform import join_rules
+
+
+def write_corpus(directory, n_files, size):
+    for i in range(n_files):
+        rules = synthetic_grammar(size, seed=i)
+        with open(os.path.join(directory, f"g{i:06d}.g"), "w", encoding="utf-8") as f:
+            f.write("\n".join(join_rules(rules)) + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, nargs="*", default=[1000, 4000])
+    parser.add_argument("--size", type=int, default=60, help="productions per grammar")
+    parser.add_argument("--jobs", type=int, nargs="*", default=None)
+    parser.add_argument("--chunk", type=int, default=8)
+    args = parser.parse_args(argv)
+    jobs_list = args.jobs or sorted({1, 2, default_jobs()})
+
+    print(f"{default_jobs()} usable CPUs")
+    print(f"{'files':>7} {'jobs':>5} {'seconds':>9} {'files/s':>9} {'speedup':>8} {'errors':>7} {'maxrss':>10}")
+    for n_files in args.files:
+        directory = tempfile.mkdtemp()
+        write_corpus(directory, n_files, args.size)
+        base = None
+        for jobs in jobs_list:
+            errors = 0
+            t0 = time.perf_counter()
+            for record in run_batch(grammar_files([directory]), jobs=jobs, chunk=args.chunk):
+                json.dumps(record)
+                errors += "error" in record
+            seconds = time.perf_counter() - t0
+            maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            base = base or seconds
+            print(f"{n_files:>7} {jobs:>5} {seconds:>8.2f}s {n_files / seconds:>9.0f} "
+                  f"{base / seconds:>7.2f}x {errors:>7} {maxrss:>8,}KB")
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
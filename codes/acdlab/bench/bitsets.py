@@ -0,0 +1,88 @@
+"""Bitmask terminal sets vs. Python sets of strings on a grammar with 500+ terminals.
+
+    python -m acdlab.bench.bitsets [--productions 6000] [--terminals 600]
+"""
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+
+from acdlab import Grammar, analyze
+from acdlab.bench import legacy
+from acdlab.bench.grammars import synthetic_grammar
+
+
+def measure(fn, *args):
+    """(seconds, bytes still allocated by the result, peak bytes, result)"""
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - t0
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, retained, peak, result
+
+
+def set_ops(pairs):
+    t0 = time.perf_counter()
+    for a, b in pairs:
+        a | b
+        a - b
+        a <= b
+    return time.perf_counter() - t0
+
+
+def mask_ops(pairs):
+    t0 = time.perf_counter()
+    for a, b in pairs:
+        a | b
+        a & ~b
+        a & ~b == 0
+    return time.perf_counter() - t0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--productions", type=int, default=6000)
+    parser.add_argument("--terminals", type=int, default=600)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 100000))
+
+    rules = synthetic_grammar(args.productions, n_terminals=args.terminals, seed=args.seed)
+    start = next(iter(rules))
+
+    def interned():
+        grammar = Grammar(rules)
+        return grammar, analyze(grammar)
+
+    t_old, mem_old, peak_old, (old_first, old_follow) = measure(legacy.firstandfollowshort, rules, start)
+    t_new, mem_new, peak_new, (grammar, (first, follow, nullable)) = measure(interned)
+
+    for A in grammar.nonterminals:
+        name = grammar.symbols[A]
+        assert grammar.names(follow[A]) == old_follow[name]
+        assert grammar.names(first[A]) == old_first[name] - {"ε"}
+
+    print(f"grammar: {args.productions} productions, {grammar.n_terminals} terminals, "
+          f"{len(rules)} nonterminals")
+    print(f"{'':24} {'time':>10} {'retained':>12} {'peak':>12}")
+    print(f"{'string sets (original)':24} {t_old:>9.4f}s {mem_old:>12,} {peak_old:>12,}")
+    print(f"{'interned bitmasks':24} {t_new:>9.4f}s {mem_new:>12,} {peak_new:>12,}")
+
+    rng = random.Random(args.seed)
+    names = list(rules)
+    picks = [(rng.choice(names), rng.choice(names)) for _ in range(100000)]
+    string_pairs = [(old_follow[a], old_follow[b]) for a, b in picks]
+    mask_pairs = [(follow[grammar.ids[a]], follow[grammar.ids[b]]) for a, b in picks]
+    t_sets = set_ops(string_pairs)
+    t_masks = mask_ops(mask_pairs)
+    print(f"\n100k FOLLOW pairs, union + difference + subset:")
+    print(f"{'string sets':24} {t_sets:>9.4f}s")
+    print(f"{'bitmasks':24} {t_masks:>9.4f}s  ({t_sets / t_masks:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Cold vs. warm GrammarCache lookups per artifact and grammar.
+
+    python -m acdlab.bench.cache [--synthetic 1000 3000]
+
+Cold runs start from an empty cache directory (compute and store), warm runs
+use a fresh GrammarCache on the same directory, as a second process would.
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from acdlab import Grammar
+from acdlab.bench.grammars import LANGUAGES, language_grammar, synthetic_grammar
+from acdlab.cache import GrammarCache
+from acdlab.transform import join_rules
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--synthetic", type=int, nargs="*", default=[1000, 3000])
+    args = parser.parse_args(argv)
+
+    cases = [(name, language_grammar(name)) for name in LANGUAGES]
+    cases += [(f"synthetic-{n}", synthetic_grammar(n)) for n in args.synthetic]
+    directory = tempfile.mkdtemp()
+
+    print(f"{'grammar':>16} {'artifact':>13} {'cold':>10} {'warm':>10} {'speedup':>8}")
+    for name, rules in cases:
+        strings = join_rules(rules)
+        artifacts = [
+            ("cfg", lambda cache: cache.transformed(strings)),
+            ("first_follow", lambda cache: cache.first_follow(rules)),
+            ("lr0", lambda cache: cache.automaton(Grammar(rules))),
+            ("table-lalr", lambda cache: cache.table(Grammar(rules), "lalr")),
+        ]
+        for artifact, fn in artifacts:
+            cold = GrammarCache(directory)
+            cold.clear()
+            t_cold = timed(lambda: fn(cold))
+            t_warm = timed(lambda: fn(GrammarCache(directory)))
+            print(f"{name:>16} {artifact:>13} {t_cold * 1000:>8.2f}ms {t_warm * 1000:>8.2f}ms "
+                  f"{t_cold / t_warm:>7.1f}x")
+    print(f"cache size: {sum(os.path.getsize(os.path.join(d, f)) for d, _, fs in os.walk(directory) for f in fs):,} bytes")
+    shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Conflict reports: time per grammar and projected cost of a large batch.
+
+    python -m acdlab.bench.conflicts [--synthetic 300 1000 3000] [--batch 10000]
+
+For every grammar, conflict_report() (LL(1) and SLR conflicts with their
+counterexample prefixes) is timed against build_table() alone, the part that
+any table-building run pays anyway.
+"""
+
+import argparse
+
+from acdlab import Grammar, build_table, conflict_report
+from acdlab.bench.grammars import LANGUAGES, language_grammar, synthetic_grammar
+from acdlab.bench.lrparse import best_of
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--synthetic", type=int, nargs="*", default=[300, 1000, 3000],
+                        help="sizes (productions) of synthetic grammars to add")
+    parser.add_argument("--batch", type=int, default=10000,
+                        help="number of grammars to project the total for")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    cases = [(name, language_grammar(name)) for name in LANGUAGES]
+    cases += [(f"synthetic-{n}", synthetic_grammar(n)) for n in args.synthetic]
+
+    print(f"{'grammar':>16} {'prods':>6} {'ll1':>5} {'lr':>5} {'table':>9} {'report':>9} "
+          f"{'x' + str(args.batch):>10}")
+    for name, rules in cases:
+        grammar = Grammar(rules)
+        table = best_of(args.repeat, lambda: build_table(grammar, "slr"))
+        report = best_of(args.repeat, lambda: conflict_report(grammar, "slr"))
+        result = conflict_report(grammar, "slr")
+        print(f"{name:>16} {len(grammar.productions):>6} {len(result['ll1']):>5} "
+              f"{len(result['lr']):>5} {table * 1000:>7.2f}ms {report * 1000:>7.2f}ms "
+              f"{report * args.batch:>9.1f}s")
+
+
+if __name__ == "__main__":
+    main()
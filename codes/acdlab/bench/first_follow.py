@@ -0,0 +1,50 @@
+"""FIRST/FOLLOW: acdlab engine vs. the original script implementations.
+
+    python -m acdlab.bench.first_follow [--sizes 100 1000 10000] [--legacy-limit N]
+"""
+
+import argparse
+import sys
+import time
+
+from acdlab import first_follow
+from acdlab.bench import legacy
+from acdlab.bench.grammars import synthetic_grammar
+from acdlab.transform import join_rules
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - t0, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--legacy-limit", type=int, default=10000,
+                        help="skip the original implementations above this many productions")
+    args = parser.parse_args(argv)
+
+    # The original FIRST is recursive, one frame per nonterminal on a chain
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 100000))
+
+    print(f"{'productions':>11} {'engine':>10} {'ffshort':>10} {'acd7up':>10}  agree")
+    for size in args.sizes:
+        rules = synthetic_grammar(size, seed=args.seed)
+        start = next(iter(rules))
+        t_new, (first, follow, _) = timed(first_follow, rules, start)
+        row = f"{size:>11} {t_new:>9.4f}s"
+        if size <= args.legacy_limit:
+            t_ff, (old_first, old_follow) = timed(legacy.firstandfollowshort, rules, start)
+            t_acd, _ = timed(legacy.acd7up, join_rules(rules))
+            agree = all(first[A] == old_first[A] and follow[A] == old_follow[A] for A in rules)
+            row += f" {t_ff:>9.4f}s {t_acd:>9.4f}s  {agree}"
+        else:
+            row += f" {'-':>10} {'-':>10}  -"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Expression front end: lines/sec and peak memory of streamed translation against the input size.
+
+    python -m acdlab.bench.frontend [--lines 10000 100000 1000000]
+
+The input is a file of random "x = expression" statements over 26 variables,
+with parentheses, unary minus and 1 to 12 operators each.  translate_lines()
+reads it line by line and every quadruple is written to an output file as it
+comes, so peak memory (a second run under tracemalloc) should not grow with
+the number of lines.  "temps" is the largest number of temporaries any
+statement used.
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from acdlab.backend import format_quad
+from acdlab.bench.loader import peak
+from acdlab.frontend import translate_lines
+
+VARIABLES = "abcdefghijklmnopqrstuvwxyz"
+
+
+def random_expression(rng, operators):
+    """A random expression string with ``operators`` binary operators."""
+    if not operators:
+        if rng.random() < 0.2:
+            return str(rng.randint(0, 99))
+        return rng.choice(VARIABLES)
+    left = rng.randint(0, operators - 1)
+    text = (f"{random_expression(rng, left)} {rng.choice('+-*/')} "
+            f"{random_expression(rng, operators - 1 - left)}")
+    r = rng.random()
+    if r < 0.3:
+        return f"({text})"
+    if r < 0.35:
+        return f"-({text})"
+    return text
+
+
+def write_program(path, n, seed=0):
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        for _ in range(n):
+            f.write(f"{rng.choice(VARIABLES)} = {random_expression(rng, rng.randint(1, 12))}\n")
+
+
+def translate_file(source, target):
+    temporaries = 0
+    with open(source, encoding="utf-8") as f, open(target, "w", encoding="utf-8") as out:
+        for quad in translate_lines(f):
+            if quad[1].startswith("_t"):
+                temporaries = max(temporaries, int(quad[1][2:]))
+            out.write(format_quad(quad) + "\n")
+    return temporaries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, nargs="*", default=[10000, 100000, 1000000])
+    args = parser.parse_args(argv)
+
+    directory = tempfile.mkdtemp()
+    print(f"{'lines':>8} {'input':>9} {'seconds':>9} {'lines/s':>9} {'us/line':>8} {'peak':>9} {'temps':>5}")
+    try:
+        for n in args.lines:
+            source = os.path.join(directory, f"p{n}.txt")
+            target = os.path.join(directory, f"p{n}.tac")
+            write_program(source, n)
+            t0 = time.perf_counter()
+            temporaries = translate_file(source, target)
+            seconds = time.perf_counter() - t0
+            peak_bytes = peak(lambda: translate_file(source, target))
+            print(f"{n:>8} {os.path.getsize(source) / 1e6:>7.1f}MB {seconds:>8.2f}s {n / seconds:>9,.0f} "
+                  f"{seconds / n * 1e6:>8.1f} {peak_bytes / 1e3:>7.0f}kB {temporaries:>5}")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
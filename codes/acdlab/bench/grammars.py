@@ -0,0 +1,306 @@
+import random
+
+from acdlab.loader import parse_rules
+
+# Grammars used by the benchmarks.
+#
+# Synthetic grammars use the same conventions as the lab scripts: nonterminals
+# are upper case (N0, N1, ...), terminals lower case (t0, t1, ...) and an
+# epsilon alternative is written as ["ε"].
+#
+# The real-language grammars are written as "A -> x y | z" lines, one token per
+# whitespace-separated word; a line starting with "|" continues the previous
+# rule and quoted tokens such as '|' are ordinary terminals.
+
+
+def synthetic_grammar(n_productions, n_terminals=None, seed=0, nullable_rate=0.1, max_rhs=5):
+    """Random grammar with ``n_productions`` alternatives, as {A: [[X, Y], ...]}.
+
+    Every nonterminal that can start an alternative of Ni (directly or behind
+    nullable symbols) has a higher index than Ni, so the grammar has no left
+    recursion and the recursive FIRST implementations terminate on it.
+    Right-hand sides after that point refer to any nonterminal, which gives
+    FOLLOW plenty of cycles.
+    """
+    rng = random.Random(seed)
+    n_nonterminals = max(1, n_productions // 4)
+    if n_terminals is None:
+        n_terminals = max(2, n_productions // 10)
+    nonterminals = [f"N{i}" for i in range(n_nonterminals)]
+    terminals = [f"t{i}" for i in range(n_terminals)]
+    may_vanish = {A for A in nonterminals[1:] if rng.random() < nullable_rate}
+
+    # Every nonterminal gets one terminal alternative so it can derive a string
+    rules = {A: [[rng.choice(terminals)]] for A in nonterminals}
+    for _ in range(n_productions - n_nonterminals):
+        i = rng.randrange(n_nonterminals)
+        A = nonterminals[i]
+        if A in may_vanish and not any(alt == ["ε"] for alt in rules[A]):
+            rules[A].append(["ε"])
+            continue
+        alt = []
+        leading = True               # still inside a prefix that may vanish
+        for _ in range(rng.randint(1, max_rhs)):
+            if rng.random() < 0.5:
+                alt.append(rng.choice(terminals))
+                leading = False
+            elif leading:
+                if i + 1 >= n_nonterminals:
+                    alt.append(rng.choice(terminals))
+                    leading = False
+                    continue
+                B = nonterminals[rng.randrange(i + 1, n_nonterminals)]
+                alt.append(B)
+                leading = B in may_vanish
+            else:
+                alt.append(rng.choice(nonterminals))
+        rules[A].append(alt)
+    return rules
+
+
+def generate_grammar(n_productions, seed=0, nullable_rate=0.1, depth=0, ambiguity=0.0,
+                     n_terminals=None):
+    """synthetic_grammar() with recursion depth and ambiguity on top, in about ``n_productions``.
+
+    ``depth`` puts a left-recursive operator tower above it, like the
+    precedence levels of an expression grammar:
+
+        L0 -> L0 o0 L1 | L1   ...   Ld-1 -> Ld-1 od-1 P | P   P -> ( L0 ) | N0
+
+    so a derivation from the start symbol L0 goes through ``depth`` levels
+    of nesting before it reaches the random part.  ``ambiguity`` is the share
+    of nonterminals (tower levels included) that get an extra alternative
+    X -> X op X, which has two parse trees for X op X op X and gives LR
+    conflicts.  The extras are drawn from their own seeded generator, so with
+    depth 0 and ambiguity 0 this is synthetic_grammar() itself, and the same
+    arguments always give the same grammar.
+    """
+    extra = 2 * depth + 2 if depth else 0
+    ambiguous = round(ambiguity * (n_productions // 4 + extra // 2))
+    base = max(4, n_productions - extra - ambiguous)
+    rules = synthetic_grammar(base, n_terminals, seed, nullable_rate)
+    if depth:
+        levels = [f"L{i}" for i in range(depth)]
+        tower = {}
+        for i, level in enumerate(levels):
+            below = levels[i + 1] if i + 1 < depth else "P"
+            tower[level] = [[level, f"o{i}", below], [below]]
+        tower["P"] = [["(", "L0", ")"], [next(iter(rules))]]
+        rules = {**tower, **rules}   # L0 first: the start symbol
+    rng = random.Random(f"ambiguity-{seed}")
+    nonterminals = list(rules)
+    for A in rng.sample(nonterminals, min(len(nonterminals), round(ambiguity * len(nonterminals)))):
+        rules[A].append([A, "op", A])
+    return rules
+
+
+EXPRESSION = """
+E -> E + T | T
+T -> T * F | F
+F -> ( E ) | id
+"""
+
+# The language of "All exps/parser.y" with its %left/%right declarations
+# written into the grammar, so plain LALR(1) accepts it without conflicts.
+CALCULATOR = """
+expr -> expr + term | expr - term | term
+term -> term * factor | term / factor | factor
+factor -> ( expr ) | - factor | NUMBER
+"""
+
+# CALCULATOR without left recursion, for the LL(1) parser
+CALCULATOR_LL = """
+expr -> term expr'
+expr' -> + term expr' | - term expr' | ε
+term -> factor term'
+term' -> * factor term' | / factor term' | ε
+factor -> ( expr ) | - factor | NUMBER
+"""
+
+JSON = """
+value -> object | array | STRING | NUMBER | true | false | null
+object -> '{' '}' | '{' members '}'
+members -> pair | members ',' pair
+pair -> STRING ':' value
+array -> '[' ']' | '[' elements ']'
+elements -> value | elements ',' value
+"""
+
+SQL = """
+statement_list -> statement ';' | statement_list statement ';'
+statement -> select_stmt | insert_stmt | update_stmt | delete_stmt
+select_stmt -> SELECT opt_distinct select_list FROM table_refs opt_where opt_group opt_having opt_order opt_limit
+opt_distinct -> DISTINCT | ε
+select_list -> '*' | select_items
+select_items -> select_item | select_items ',' select_item
+select_item -> expr | expr AS IDENT
+table_refs -> table_ref | table_refs ',' table_ref
+table_ref -> table_factor | table_ref join_type JOIN table_factor ON expr
+join_type -> INNER | LEFT | LEFT OUTER | RIGHT | RIGHT OUTER | ε
+table_factor -> IDENT | IDENT AS IDENT | '(' select_stmt ')' AS IDENT
+opt_where -> WHERE expr | ε
+opt_group -> GROUP BY expr_list | ε
+opt_having -> HAVING expr | ε
+opt_order -> ORDER BY order_list | ε
+order_list -> order_item | order_list ',' order_item
+order_item -> expr | expr ASC | expr DESC
+opt_limit -> LIMIT NUMBER | LIMIT NUMBER OFFSET NUMBER | ε
+insert_stmt -> INSERT INTO IDENT opt_columns VALUES value_rows | INSERT INTO IDENT opt_columns select_stmt
+opt_columns -> '(' ident_list ')' | ε
+ident_list -> IDENT | ident_list ',' IDENT
+value_rows -> '(' expr_list ')' | value_rows ',' '(' expr_list ')'
+update_stmt -> UPDATE IDENT SET assignments opt_where
+assignments -> assignment | assignments ',' assignment
+assignment -> IDENT '=' expr
+delete_stmt -> DELETE FROM IDENT opt_where
+expr_list -> expr | expr_list ',' expr
+expr -> expr OR and_expr | and_expr
+and_expr -> and_expr AND not_expr | not_expr
+not_expr -> NOT not_expr | predicate
+predicate -> comparison
+    | comparison IS NULL
+    | comparison IS NOT NULL
+    | comparison IN '(' expr_list ')'
+    | comparison LIKE STRING
+comparison -> additive | additive comp_op additive
+comp_op -> '=' | '<>' | '<' | '>' | '<=' | '>='
+additive -> additive '+' term | additive '-' term | term
+term -> term '*' factor | term '/' factor | factor
+factor -> '-' factor | primary
+primary -> NUMBER | STRING | NULL | column_ref | function_call | '(' expr ')' | EXISTS '(' select_stmt ')'
+column_ref -> IDENT | IDENT '.' IDENT
+function_call -> IDENT '(' ')' | IDENT '(' '*' ')' | IDENT '(' expr_list ')'
+"""
+
+# ANSI C (C89), after the classic yacc grammar.  It keeps the dangling-else
+# ambiguity, so SLR/LALR tables have exactly one shift/reduce conflict.
+C = """
+translation_unit -> external_declaration | translation_unit external_declaration
+external_declaration -> function_definition | declaration
+function_definition -> declaration_specifiers declarator declaration_list compound_statement
+    | declaration_specifiers declarator compound_statement
+    | declarator declaration_list compound_statement
+    | declarator compound_statement
+primary_expression -> IDENTIFIER | CONSTANT | STRING_LITERAL | '(' expression ')'
+postfix_expression -> primary_expression
+    | postfix_expression '[' expression ']'
+    | postfix_expression '(' ')'
+    | postfix_expression '(' argument_expression_list ')'
+    | postfix_expression '.' IDENTIFIER
+    | postfix_expression PTR_OP IDENTIFIER
+    | postfix_expression INC_OP
+    | postfix_expression DEC_OP
+argument_expression_list -> assignment_expression | argument_expression_list ',' assignment_expression
+unary_expression -> postfix_expression
+    | INC_OP unary_expression
+    | DEC_OP unary_expression
+    | unary_operator cast_expression
+    | SIZEOF unary_expression
+    | SIZEOF '(' type_name ')'
+unary_operator -> '&' | '*' | '+' | '-' | '~' | '!'
+cast_expression -> unary_expression | '(' type_name ')' cast_expression
+multiplicative_expression -> cast_expression
+    | multiplicative_expression '*' cast_expression
+    | multiplicative_expression '/' cast_expression
+    | multiplicative_expression '%' cast_expression
+additive_expression -> multiplicative_expression
+    | additive_expression '+' multiplicative_expression
+    | additive_expression '-' multiplicative_expression
+shift_expression -> additive_expression
+    | shift_expression LEFT_OP additive_expression
+    | shift_expression RIGHT_OP additive_expression
+relational_expression -> shift_expression
+    | relational_expression '<' shift_expression
+    | relational_expression '>' shift_expression
+    | relational_expression LE_OP shift_expression
+    | relational_expression GE_OP shift_expression
+equality_expression -> relational_expression
+    | equality_expression EQ_OP relational_expression
+    | equality_expression NE_OP relational_expression
+and_expression -> equality_expression | and_expression '&' equality_expression
+exclusive_or_expression -> and_expression | exclusive_or_expression '^' and_expression
+inclusive_or_expression -> exclusive_or_expression | inclusive_or_expression '|' exclusive_or_expression
+logical_and_expression -> inclusive_or_expression | logical_and_expression AND_OP inclusive_or_expression
+logical_or_expression -> logical_and_expression | logical_or_expression OR_OP logical_and_expression
+conditional_expression -> logical_or_expression | logical_or_expression '?' expression ':' conditional_expression
+assignment_expression -> conditional_expression | unary_expression assignment_operator assignment_expression
+assignment_operator -> '=' | MUL_ASSIGN | DIV_ASSIGN | MOD_ASSIGN | ADD_ASSIGN | SUB_ASSIGN
+    | LEFT_ASSIGN | RIGHT_ASSIGN | AND_ASSIGN | XOR_ASSIGN | OR_ASSIGN
+expression -> assignment_expression | expression ',' assignment_expression
+constant_expression -> conditional_expression
+declaration -> declaration_specifiers ';' | declaration_specifiers init_declarator_list ';'
+declaration_specifiers -> storage_class_specifier | storage_class_specifier declaration_specifiers
+    | type_specifier | type_specifier declaration_specifiers
+    | type_qualifier | type_qualifier declaration_specifiers
+init_declarator_list -> init_declarator | init_declarator_list ',' init_declarator
+init_declarator -> declarator | declarator '=' initializer
+storage_class_specifier -> TYPEDEF | EXTERN | STATIC | AUTO | REGISTER
+type_specifier -> VOID | CHAR | SHORT | INT | LONG | FLOAT | DOUBLE | SIGNED | UNSIGNED
+    | struct_or_union_specifier | enum_specifier | TYPE_NAME
+struct_or_union_specifier -> struct_or_union IDENTIFIER '{' struct_declaration_list '}'
+    | struct_or_union '{' struct_declaration_list '}'
+    | struct_or_union IDENTIFIER
+struct_or_union -> STRUCT | UNION
+struct_declaration_list -> struct_declaration | struct_declaration_list struct_declaration
+struct_declaration -> specifier_qualifier_list struct_declarator_list ';'
+specifier_qualifier_list -> type_specifier specifier_qualifier_list | type_specifier
+    | type_qualifier specifier_qualifier_list | type_qualifier
+struct_declarator_list -> struct_declarator | struct_declarator_list ',' struct_declarator
+struct_declarator -> declarator | ':' constant_expression | declarator ':' constant_expression
+enum_specifier -> ENUM '{' enumerator_list '}' | ENUM IDENTIFIER '{' enumerator_list '}' | ENUM IDENTIFIER
+enumerator_list -> enumerator | enumerator_list ',' enumerator
+enumerator -> IDENTIFIER | IDENTIFIER '=' constant_expression
+type_qualifier -> CONST | VOLATILE
+declarator -> pointer direct_declarator | direct_declarator
+direct_declarator -> IDENTIFIER
+    | '(' declarator ')'
+    | direct_declarator '[' constant_expression ']'
+    | direct_declarator '[' ']'
+    | direct_declarator '(' parameter_type_list ')'
+    | direct_declarator '(' identifier_list ')'
+    | direct_declarator '(' ')'
+pointer -> '*' | '*' type_qualifier_list | '*' pointer | '*' type_qualifier_list pointer
+type_qualifier_list -> type_qualifier | type_qualifier_list type_qualifier
+parameter_type_list -> parameter_list | parameter_list ',' ELLIPSIS
+parameter_list -> parameter_declaration | parameter_list ',' parameter_declaration
+parameter_declaration -> declaration_specifiers declarator
+    | declaration_specifiers abstract_declarator
+    | declaration_specifiers
+identifier_list -> IDENTIFIER | identifier_list ',' IDENTIFIER
+type_name -> specifier_qualifier_list | specifier_qualifier_list abstract_declarator
+abstract_declarator -> pointer | direct_abstract_declarator | pointer direct_abstract_declarator
+direct_abstract_declarator -> '(' abstract_declarator ')'
+    | '[' ']'
+    | '[' constant_expression ']'
+    | direct_abstract_declarator '[' ']'
+    | direct_abstract_declarator '[' constant_expression ']'
+    | '(' ')'
+    | '(' parameter_type_list ')'
+    | direct_abstract_declarator '(' ')'
+    | direct_abstract_declarator '(' parameter_type_list ')'
+initializer -> assignment_expression | '{' initializer_list '}' | '{' initializer_list ',' '}'
+initializer_list -> initializer | initializer_list ',' initializer
+statement -> labeled_statement | compound_statement | expression_statement
+    | selection_statement | iteration_statement | jump_statement
+labeled_statement -> IDENTIFIER ':' statement | CASE constant_expression ':' statement | DEFAULT ':' statement
+compound_statement -> '{' '}' | '{' statement_list '}' | '{' declaration_list '}'
+    | '{' declaration_list statement_list '}'
+declaration_list -> declaration | declaration_list declaration
+statement_list -> statement | statement_list statement
+expression_statement -> ';' | expression ';'
+selection_statement -> IF '(' expression ')' statement
+    | IF '(' expression ')' statement ELSE statement
+    | SWITCH '(' expression ')' statement
+iteration_statement -> WHILE '(' expression ')' statement
+    | DO statement WHILE '(' expression ')' ';'
+    | FOR '(' expression_statement expression_statement ')' statement
+    | FOR '(' expression_statement expression_statement expression ')' statement
+jump_statement -> GOTO IDENTIFIER ';' | CONTINUE ';' | BREAK ';' | RETURN ';' | RETURN expression ';'
+"""
+
+LANGUAGES = {"expr": EXPRESSION, "json": JSON, "sql": SQL, "c": C}
+
+
+def language_grammar(name):
+    """Rules dict of one of the LANGUAGES grammars."""
+    return parse_rules(LANGUAGES[name])
@@ -0,0 +1,65 @@
+"""Per-edit cost of an AnalysisSession against recomputing from scratch.
+
+    python -m acdlab.bench.incremental [--synthetic 300 1000 3000] [--edits 200]
+
+Every edit replaces one alternative of a random rule by a random alternative
+taken from elsewhere in the grammar, then undoes it.  "full" is first_follow()
+plus the LL(1) table of the edited grammar; "region" is the mean number of
+nonterminals whose FIRST and FOLLOW were solved again.
+"""
+
+import argparse
+import random
+import time
+
+from acdlab import AnalysisSession, Grammar, LL1Parser, first_follow
+from acdlab.bench.grammars import LANGUAGES, language_grammar, synthetic_grammar
+
+
+def full_analysis(rules):
+    first_follow(rules)
+    LL1Parser(Grammar(rules))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--synthetic", type=int, nargs="*", default=[300, 1000, 3000])
+    parser.add_argument("--edits", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    cases = [(name, language_grammar(name)) for name in LANGUAGES]
+    cases += [(f"synthetic-{n}", synthetic_grammar(n)) for n in args.synthetic]
+
+    print(f"{'grammar':>16} {'prods':>6} {'median':>9} {'max':>9} {'full':>9} "
+          f"{'speedup':>8} {'region':>11}")
+    for name, rules in cases:
+        rng = random.Random(args.seed)
+        session = AnalysisSession(rules)
+        alternatives = [alt for alts in session.rules.values() for alt in alts]
+        names = list(session.rules)
+        times, first_sizes, follow_sizes = [], [], []
+        for _ in range(args.edits):
+            A = rng.choice(names)
+            old = rng.choice(session.rules[A])
+            new = rng.choice(alternatives)
+            if new in session.rules[A]:
+                continue
+            t0 = time.perf_counter()
+            report = session.replace_production(A, old, new)
+            times.append(time.perf_counter() - t0)
+            first_sizes.append(report["recomputed"]["first"])
+            follow_sizes.append(report["recomputed"]["follow"])
+            session.replace_production(A, new, old)
+        t0 = time.perf_counter()
+        full_analysis(session.to_rules())
+        full = time.perf_counter() - t0
+        times.sort()
+        median = times[len(times) // 2]
+        region = f"{sum(first_sizes) / len(times):.0f}/{sum(follow_sizes) / len(times):.0f}"
+        print(f"{name:>16} {len(alternatives):>6} {median * 1000:>7.2f}ms {times[-1] * 1000:>7.2f}ms "
+              f"{full * 1000:>7.2f}ms {full / median:>7.1f}x {region:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""SLR vs. LALR(1) tables: state count, conflicts and build time per grammar.
+
+    python -m acdlab.bench.lalr [--synthetic 300 1000 3000]
+"""
+
+import argparse
+
+from acdlab import Grammar
+from acdlab.bench.grammars import LANGUAGES, language_grammar, synthetic_grammar
+from acdlab.lrtable import compare_methods
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--synthetic", type=int, nargs="*", default=[300, 1000, 3000],
+                        help="sizes (productions) of synthetic grammars to add")
+    args = parser.parse_args(argv)
+
+    cases = [(name, language_grammar(name)) for name in LANGUAGES]
+    cases += [(f"synthetic-{n}", synthetic_grammar(n)) for n in args.synthetic]
+
+    print(f"{'grammar':>16} {'method':>6} {'states':>7} {'conflicts':>9} {'lr0':>9} {'table':>9}")
+    for name, rules in cases:
+        for row in compare_methods(Grammar(rules)):
+            print(f"{name:>16} {row['method']:>6} {row['states']:>7} {row['conflicts']:>9} "
+                  f"{row['lr0_seconds']:>8.4f}s {row['table_seconds']:>8.4f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+from collections import defaultdict, deque
+
+# The implementations the lab scripts used before acdlab, kept
+# verbatim apart from taking the grammar as an argument instead of a global.
+# They exist only so the benchmarks have a baseline to compare against.
+
+
+def firstandfollowshort(grammar, start):
+    """firstandfollowshort.py: recursive FIRST, loop-until-unchanged FOLLOW."""
+    first, follow = defaultdict(set), defaultdict(set)
+
+    def compute_first(X):
+        if X in first and first[X]: return first[X]
+        if not X.isupper(): return {X}
+        for prod in grammar[X]:
+            for sym in prod:
+                sym_first = compute_first(sym)
+                first[X] |= sym_first - {'ε'}
+                if 'ε' not in sym_first: break
+            else: first[X].add('ε')
+        return first[X]
+
+    def compute_follow(start):
+        follow[start].add('$')
+        updated = True
+        while updated:
+            updated = False
+            for lhs in grammar:
+                for prod in grammar[lhs]:
+                    for i, B in enumerate(prod):
+                        if B.isupper():
+                            trailer = prod[i+1:]
+                            temp = set()
+                            for sym in trailer:
+                                sym_first = compute_first(sym)
+                                temp |= sym_first - {'ε'}
+                                if 'ε' not in sym_first: break
+                            else: temp |= follow[lhs]
+                            if not temp <= follow[B]:
+                                follow[B] |= temp
+                                updated = True
+
+    for nt in grammar: compute_first(nt)
+    compute_follow(start)
+    return first, follow
+
+
+def acd7up(grammar):
+    """acd7up.py: compute_first_sets + compute_follow_sets on "A -> x | y" strings."""
+    def compute_first_sets(grammar):
+        first = defaultdict(set)
+        rules = {rule.split("->")[0].strip(): rule.split("->")[1].strip().split("|") for rule in grammar}
+
+        def first_of(symbol):
+            if symbol in first:
+                return first[symbol]
+            if not symbol.isupper():
+                return {symbol}
+            for production in rules.get(symbol, []):
+                for char in production.split():
+                    first[symbol] |= first_of(char)
+                    if 'ε' not in first_of(char):
+                        break
+            return first[symbol]
+
+        for non_terminal in rules:
+            first_of(non_terminal)
+
+        return first
+
+    def compute_follow_sets(grammar, first_sets):
+        follow = defaultdict(set)
+        rules = {rule.split("->")[0].strip(): rule.split("->")[1].strip().split("|") for rule in grammar}
+
+        start_symbol = next(iter(rules))
+        follow[start_symbol].add("$")
+
+        changed = True
+        while changed:
+            changed = False
+            for non_terminal, productions in rules.items():
+                for production in productions:
+                    trailer = follow[non_terminal].copy()
+
+                    for i in reversed(range(len(production.split()))):
+                        symbol = production.split()[i]
+
+                        if symbol in rules:
+                            original_size = len(follow[symbol])
+                            follow[symbol] |= trailer
+
+                            if 'ε' in first_sets[symbol]:
+                                trailer |= (first_sets[symbol] - {'ε'})
+                            else:
+                                trailer = first_sets[symbol]
+
+                            if len(follow[symbol]) > original_size:
+                                changed = True
+                        else:
+                            trailer = first_sets[symbol] if symbol in first_sets else {symbol}
+        return follow
+
+    first = compute_first_sets(grammar)
+    return first, compute_follow_sets(grammar, first)
+
+
+def slrtableshort_items(grammar, start):
+    """slrtableshort.py: closure / goto / items with list-based state dedup.
+
+    ``grammar`` must already be augmented with ``start`` -> S; alternatives
+    are turned into tuples so items stay hashable.
+    """
+    grammar = {A: [tuple(s for s in alt if s != 'ε') for alt in alts] for A, alts in grammar.items()}
+    non_terminals = set(grammar.keys())
+    terminals = {s for alts in grammar.values() for alt in alts for s in alt if s not in non_terminals} | {'$'}
+
+    def closure(items):
+        closure_set = set(items)
+        added = True
+        while added:
+            added = False
+            new_items = set()
+            for lhs, rhs, dot_pos in closure_set:
+                if dot_pos < len(rhs) and rhs[dot_pos] in non_terminals:
+                    B = rhs[dot_pos]
+                    for prod in grammar[B]:
+                        item = (B, prod, 0)
+                        if item not in closure_set:
+                            new_items.add(item)
+                            added = True
+            closure_set |= new_items
+        return frozenset(closure_set)
+
+    def goto(items, symbol):
+        moved = {(lhs, rhs, dot+1) for (lhs, rhs, dot) in items if dot < len(rhs) and rhs[dot] == symbol}
+        return closure(moved) if moved else frozenset()
+
+    def items():
+        C = []
+        init = closure([(start, grammar[start][0], 0)])
+        C.append(init)
+        queue = deque([init])
+        transitions = {}
+
+        while queue:
+            I = queue.popleft()
+            for X in terminals | non_terminals:
+                goto_I = goto(I, X)
+                if goto_I and goto_I not in C:
+                    C.append(goto_I)
+                    queue.append(goto_I)
+                if goto_I:
+                    transitions[(I, X)] = goto_I
+        return C, transitions
+
+    return items()
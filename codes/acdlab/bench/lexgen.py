@@ -0,0 +1,127 @@
+"""Generated lexers for lexer.l and tokens.l: MB/s and tokens/s on large files.
+
+    python -m acdlab.bench.lexgen [--megabytes 256] [--repeat 1]
+
+Two inputs of --megabytes are written, each a megabyte of random lines
+repeated:
+
+  source   C-like declarations and statements (int a = 10; ...), scanned
+           with lexer.l, whose tokens are the keywords; everything else is
+           one-byte ignored tokens skipped from the start state
+  calc     calculator lines (12 + 34 * (5 - 6)) for tokens.l: numbers,
+           operators and newlines are tokens, blanks are ignored
+
+Both are read through mmap and only the (rule, start, end) records are
+counted.  "re" is the usual Python tokenizer for comparison: one pattern
+with an alternative per rule, in rule order, run with finditer() (first
+match rather than longest, which gives the same tokens for these two
+specs).
+"""
+
+import argparse
+import os
+import random
+import re
+import shutil
+import tempfile
+import time
+
+from acdlab.bench.lrparse import best_of
+from acdlab.lexgen import load_lexer
+from acdlab.matcher import map_file
+
+ALL_EXPS = os.path.join(os.path.dirname(__file__), "..", "..", "..", "All exps")
+
+# The rules of each spec for re, and the ones whose tokens are kept
+PYTHON_RULES = {
+    "lexer.l": ([rb"int|float|char", rb"(?s:.)"], {0}),
+    "tokens.l": ([rb"[0-9]+", rb"[\t ]+", rb"[\n ]", rb"[+\-*/()]", rb"."], {0, 2, 3, 4}),
+}
+
+
+def source_line(rng):
+    name = rng.choice("abcdefghxyz") + rng.choice(["", "1", "_count", "tmp"])
+    return rng.choice([
+        f"int {name} = {rng.randint(0, 999)};",
+        f"float {name} = {rng.randint(0, 99)}.{rng.randint(0, 9)};",
+        f"char {name} = '{rng.choice('xyz')}';",
+        f"    {name} = {name} * ({rng.randint(1, 9)} + {name});",
+        f"    if ({name} > {rng.randint(0, 9)}) {{ printf(\"%d\\n\", {name}); }}",
+        "// interior point of the mesh",
+        "}",
+    ])
+
+
+def calc_line(rng):
+    terms = [str(rng.randint(0, 9999)) for _ in range(rng.randint(1, 6))]
+    line = terms[0]
+    for term in terms[1:]:
+        op = rng.choice("+-*/")
+        line += f" {op} ({term})" if rng.random() < 0.2 else f" {op} {term}"
+    return line
+
+
+def write_repeated(path, size, make_line, seed=0):
+    """``size`` bytes: one megabyte of random lines, repeated."""
+    rng = random.Random(seed)
+    lines = []
+    length = 0
+    while length < 1 << 20:
+        lines.append(make_line(rng) + "\n")
+        length += len(lines[-1])
+    block = "".join(lines).encode()
+    with open(path, "wb") as f:
+        for start in range(0, size, len(block)):
+            f.write(block[:size - start])
+
+
+def python_count(spec, path):
+    patterns, kept = PYTHON_RULES[spec]
+    master = re.compile(b"|".join(b"(" + p + b")" for p in patterns))
+    kept = {k + 1 for k in kept}
+    return map_file(path, lambda data: sum(1 for m in master.finditer(data) if m.lastindex in kept))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megabytes", type=int, default=256)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--no-re", action="store_true", help="skip the re tokenizer")
+    args = parser.parse_args(argv)
+
+    size = args.megabytes << 20
+    directory = tempfile.mkdtemp()
+    try:
+        source = os.path.join(directory, "source.c")
+        calc = os.path.join(directory, "calc.txt")
+        write_repeated(source, size, source_line)
+        write_repeated(calc, size, calc_line)
+
+        print(f"{'spec':>9} {'input':>7} {'build':>8} {'states':>7} {'classes':>7} {'tokens':>11} "
+              f"{'MB/s':>7} {'tokens/s':>11} {'re MB/s':>8}")
+        for spec, path in (("lexer.l", source), ("tokens.l", calc)):
+            start = time.perf_counter()
+            lexer = load_lexer(os.path.join(ALL_EXPS, spec))
+            build = time.perf_counter() - start
+
+            def scan():
+                return sum(1 for _ in lexer.tokens_file(path))
+
+            seconds = best_of(args.repeat, scan)
+            count = scan()
+            re_rate = ""
+            if not args.no_re:
+                re_seconds = best_of(args.repeat, lambda: python_count(spec, path))
+                if python_count(spec, path) != count:
+                    re_rate = "differs"
+                else:
+                    re_rate = f"{size / re_seconds / 1e6:.1f}"
+            print(f"{spec:>9} {os.path.basename(path):>7} {build * 1000:>6.1f}ms {len(lexer):>7} "
+                  f"{lexer.columns:>7} {count:>11,} {size / seconds / 1e6:>7.1f} "
+                  f"{count / seconds:>11,.0f} {re_rate:>8}")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""LL(1) parse throughput in tokens/sec: compiled int table vs. the string table of acd7up.py.
+
+    python -m acdlab.bench.ll1 [--tokens 1000000 3000000] [--error-rate 0.001] [--repeat 3]
+
+The string-table driver is what parsing with compute_parsing_table_logic()'s
+output looks like: {A: {terminal: "x y z"}} cells split at every expansion.
+The error column parses the same input with a fraction of its tokens
+replaced by random ones, under panic-mode recovery.
+"""
+
+import argparse
+import random
+import time
+
+from acdlab import Grammar, LRParser, PackedTable
+from acdlab.bench.grammars import CALCULATOR, CALCULATOR_LL, parse_rules
+from acdlab.bench.lrparse import best_of, generate_expression, lex
+from acdlab.ll1 import LL1Parser
+from acdlab.lrtable import build_table
+
+
+def string_table(ll):
+    """{A: {t: "x y z"}} in the format of compute_parsing_table_logic()."""
+    grammar = ll.grammar
+    symbols = grammar.symbols
+    table = {}
+    for A in grammar.nonterminals:
+        row = table[symbols[A]] = {}
+        for t in grammar.terminals:
+            p = ll.entry(A, t)
+            if p >= 0:
+                rhs = grammar.productions[p][1]
+                row[symbols[t]] = " ".join(symbols[X] for X in rhs) or grammar.epsilon
+    return table
+
+
+def string_parse(table, start, tokens, end="$", epsilon="ε"):
+    """Predictive parse over the string table; tokens are terminal names."""
+    stack = [end, start]
+    tokens = iter(tokens)
+    t = next(tokens, end)
+    while True:
+        X = stack.pop()
+        if X in table:
+            prod = table[X].get(t)
+            if prod is None:
+                raise ValueError(f"no entry for ({X}, {t})")
+            if prod != epsilon:
+                stack.extend(reversed(prod.split()))
+        elif X == t:
+            if t == end:
+                return True
+            t = next(tokens, end)
+        else:
+            raise ValueError(f"expected {X}, got {t}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tokens", type=int, nargs="*", default=[1000000, 3000000])
+    parser.add_argument("--error-rate", type=float, default=0.001)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    grammar = Grammar(parse_rules(CALCULATOR_LL))
+    t0 = time.perf_counter()
+    ll = LL1Parser(grammar)
+    print(f"compiled {len(grammar.productions)} productions in "
+          f"{(time.perf_counter() - t0) * 1000:.2f}ms, {len(ll.conflicts)} conflicts")
+    table = string_table(ll)
+    start = grammar.symbols[grammar.start]
+    lr = LRParser(PackedTable.from_table(build_table(Grammar(parse_rules(CALCULATOR)))))
+    rng = random.Random(1)
+    terminals = [t for t in grammar.terminals if t != ll.end]
+
+    print(f"{'tokens':>10} {'strings':>12} {'ll1':>12} {'lex+ll1':>12} {'recover':>12} "
+          f"{'errors':>7} {'lalr':>12}   tokens/sec")
+    for n in args.tokens:
+        text, n_tokens = generate_expression(n)
+        ids = list(lex(text, grammar.ids))
+        names = [grammar.symbols[t] for t in ids]
+        broken = [rng.choice(terminals) if rng.random() < args.error_rate else t for t in ids]
+        lr_ids = lr.token_ids(names)
+
+        t_str = best_of(args.repeat, lambda: string_parse(table, start, names))
+        t_ll = best_of(args.repeat, lambda: ll.parse(ids))
+        t_lex = best_of(args.repeat, lambda: ll.parse(lex(text, grammar.ids)))
+        t_rec = best_of(args.repeat, lambda: ll.parse(broken, recover=True))
+        n_errors = len(ll.parse(broken, recover=True))
+        t_lr = best_of(args.repeat, lambda: lr.recognize(lr_ids))
+        print(f"{n_tokens:>10} {n_tokens / t_str:>12,.0f} {n_tokens / t_ll:>12,.0f} "
+              f"{n_tokens / t_lex:>12,.0f} {n_tokens / t_rec:>12,.0f} {n_errors:>7} "
+              f"{n_tokens / t_lr:>12,.0f}")
+        del ids, names, broken, lr_ids
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Grammar file loading: throughput and peak memory against the file size.
+
+    python -m acdlab.bench.loader [--productions 10000 100000]
+
+"split" is the lab scripts' way, the file read whole and every rule string
+split on "->" and "|" (split_rules); "stream" is open_grammar(), which also
+builds the interned Grammar.  Peak memory is measured in a second run under
+tracemalloc and includes the result.
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import tracemalloc
+
+from acdlab.bench.grammars import synthetic_grammar
+from acdlab.bench.lrparse import best_of
+from acdlab.loader import open_grammar
+from acdlab.transform import join_rules, split_rules
+
+
+def split_file(path):
+    with open(path, encoding="utf-8") as f:
+        return split_rules(f.read().splitlines())
+
+
+def write_grammar(path, n_productions):
+    rules = synthetic_grammar(n_productions)
+    with open(path, "w", encoding="utf-8") as f:
+        for rule in join_rules(rules):
+            f.write(rule + "\n")
+
+
+def peak(fn):
+    tracemalloc.start()
+    result = fn()
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak_bytes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--productions", type=int, nargs="*", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    directory = tempfile.mkdtemp()
+    print(f"{'prods':>7} {'file':>9} {'reader':>7} {'seconds':>9} {'prods/s':>10} {'peak':>9} {'peak/file':>9}")
+    for n in args.productions:
+        path = os.path.join(directory, f"g{n}.g")
+        write_grammar(path, n)
+        size = os.path.getsize(path)
+        for name, fn in (("split", lambda: split_file(path)), ("stream", lambda: open_grammar(path))):
+            seconds = best_of(args.repeat, fn)
+            peak_bytes = peak(fn)
+            print(f"{n:>7} {size / 1e6:>7.2f}MB {name:>7} {seconds:>8.3f}s {n / seconds:>10,.0f} "
+                  f"{peak_bytes / 1e6:>7.2f}MB {peak_bytes / size:>8.1f}x")
+    shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""LR(0) collection: LR0Automaton vs. the original items() of slrtableshort.py.
+
+    python -m acdlab.bench.lr0 [--synthetic 100 300 1000] [--legacy-limit N]
+"""
+
+import argparse
+import time
+
+from acdlab import Grammar
+from acdlab.bench import legacy
+from acdlab.bench.grammars import LANGUAGES, language_grammar, synthetic_grammar
+from acdlab.lr0 import LR0Automaton
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--synthetic", type=int, nargs="*", default=[100, 300, 1000],
+                        help="sizes (productions) of synthetic grammars to add")
+    parser.add_argument("--legacy-limit", type=int, default=1000,
+                        help="skip the original items() above this many productions")
+    args = parser.parse_args(argv)
+
+    cases = [(name, language_grammar(name)) for name in LANGUAGES]
+    cases += [(f"synthetic-{n}", synthetic_grammar(n)) for n in args.synthetic]
+
+    print(f"{'grammar':>16} {'prods':>6} {'states':>7} {'hits':>6} {'reused':>7} "
+          f"{'new':>10} {'original':>10} {'speedup':>8}")
+    for name, rules in cases:
+        n_productions = sum(map(len, rules.values()))
+        grammar = Grammar(rules).augmented()
+        t0 = time.perf_counter()
+        automaton = LR0Automaton(grammar)
+        t_new = time.perf_counter() - t0
+        stats = automaton.closure_stats()
+        # "reused": closure items served from the expansion cache instead of rebuilt
+        reused = stats["items_reused"] / max(1, stats["items_reused"] + stats["items_built"])
+        row = (f"{name:>16} {n_productions:>6} {len(automaton):>7} {stats['hit_rate']:>6.1%} "
+               f"{reused:>7.1%} {t_new:>9.4f}s")
+        if n_productions <= args.legacy_limit:
+            t0 = time.perf_counter()
+            C, _ = legacy.slrtableshort_items(grammar.to_rules(), grammar.symbols[grammar.start])
+            t_old = time.perf_counter() - t0
+            assert len(C) == len(automaton)
+            row += f" {t_old:>9.4f}s {t_old / t_new:>7.1f}x"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
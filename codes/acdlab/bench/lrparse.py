@@ -0,0 +1,186 @@
+"""LR parse throughput in tokens/sec: acdlab.LRParser vs. the bison parser of "All exps".
+
+    python -m acdlab.bench.lrparse [--tokens 1000000 3000000] [--repeat 3]
+
+Both parsers read the same generated arithmetic expressions.  The bison side
+compiles "All exps/parser.tab.c" with gcc together with a small C yylex()
+that does what tokens.l does (flex is not needed); process start-up is timed
+on a one-token input and subtracted.  The bison runs are skipped when gcc is
+not on PATH.
+"""
+
+import argparse
+import os
+import random
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+
+from acdlab import Grammar, LRParser, PackedTable
+from acdlab.bench.grammars import CALCULATOR, parse_rules
+from acdlab.lrtable import build_table
+
+PARSER_C = os.path.join(os.path.dirname(__file__), "..", "..", "..", "All exps", "parser.tab.c")
+
+# tokens.l without flex: NUMBER is 258 in parser.tab.c, a newline ends the input
+YYLEX_C = r"""
+#include <stdio.h>
+extern int yylval;
+int yylex(void) {
+    int c = getchar_unlocked();
+    while (c == ' ' || c == '\t')
+        c = getchar_unlocked();
+    if (c >= '0' && c <= '9') {
+        int v = 0;
+        while (c >= '0' && c <= '9') {
+            v = v * 10 + (c - '0');
+            c = getchar_unlocked();
+        }
+        ungetc(c, stdin);
+        yylval = v;
+        return 258;
+    }
+    if (c == EOF || c == '\n')
+        return 0;
+    return c;
+}
+"""
+
+TOKEN = re.compile(r"\d+|[-+*/()]")
+
+
+def generate_expression(n_tokens, seed=0, max_depth=20):
+    """One line of about ``n_tokens`` tokens in the calculator language."""
+    rng = random.Random(seed)
+    out = []
+    depth = 0
+    while True:
+        # expecting an operand
+        r = rng.random()
+        if r < 0.1:
+            out.append("-")
+            continue
+        if r < 0.25 and depth < max_depth:
+            out.append("(")
+            depth += 1
+            continue
+        out.append(str(rng.randrange(1000)))
+        while depth and rng.random() < 0.3:
+            out.append(")")
+            depth -= 1
+        if len(out) >= n_tokens:
+            break
+        out.append(rng.choice("+-*/"))
+    out.extend(")" * depth)
+    return " ".join(out) + "\n", len(out)
+
+
+def lex(text, ids):
+    """Terminal ids of ``text``, lazily."""
+    number = ids["NUMBER"]
+    for m in TOKEN.finditer(text):
+        token = m.group()
+        yield number if token[0].isdigit() else ids[token]
+
+
+def evaluator(grammar):
+    """Semantic actions computing the expression's value modulo 2**31 - 1."""
+    M = (1 << 31) - 1
+    ops = {
+        "+": lambda v, i: (v[i] + v[i + 2]) % M,
+        "-": lambda v, i: (v[i] - v[i + 2]) % M,
+        "*": lambda v, i: (v[i] * v[i + 2]) % M,
+        "/": lambda v, i: v[i] // v[i + 2] if v[i + 2] else 0,
+    }
+    actions = [None] * len(grammar.productions)
+    for p, (_, rhs) in enumerate(grammar.productions):
+        names = [grammar.symbols[X] for X in rhs]
+        if len(names) == 3 and names[1] in ops:
+            actions[p] = ops[names[1]]
+        elif names == ["(", "expr", ")"]:
+            actions[p] = lambda v, i: v[i + 1]
+        elif names[:1] == ["-"]:
+            actions[p] = lambda v, i: -v[i + 1] % M
+    return actions
+
+
+def compile_bison(workdir):
+    """Path of the compiled bison parser, or None without gcc."""
+    if shutil.which("gcc") is None or not os.path.exists(PARSER_C):
+        return None
+    lexer = os.path.join(workdir, "yylex.c")
+    with open(lexer, "w") as f:
+        f.write(YYLEX_C)
+    exe = os.path.join(workdir, "parser")
+    subprocess.run(["gcc", "-O2", "-w", "-o", exe, PARSER_C, lexer], check=True)
+    return exe
+
+
+def run_bison(exe, path, repeat):
+    best = None
+    for _ in range(repeat):
+        with open(path, "rb") as f:
+            t0 = time.perf_counter()
+            result = subprocess.run([exe], stdin=f, capture_output=True)
+            seconds = time.perf_counter() - t0
+        if b"Valid Expression" not in result.stdout:
+            raise RuntimeError(f"bison parser rejected {path}: {result.stdout[-200:]!r}")
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+def best_of(repeat, fn):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        seconds = time.perf_counter() - t0
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tokens", type=int, nargs="*", default=[1000000, 3000000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    table = build_table(Grammar(parse_rules(CALCULATOR)))
+    lr = LRParser(PackedTable.from_table(table))
+    actions = evaluator(table.grammar)
+    workdir = tempfile.mkdtemp()
+    exe = compile_bison(workdir)
+    startup = None
+    if exe is not None:
+        path = os.path.join(workdir, "empty.txt")
+        with open(path, "w") as f:
+            f.write("1\n")
+        startup = run_bison(exe, path, args.repeat)
+
+    print(f"{'tokens':>10} {'ids':>12} {'lex+parse':>12} {'+actions':>12} {'bison':>12}   tokens/sec")
+    for n in args.tokens:
+        text, n_tokens = generate_expression(n)
+        ids = list(lex(text, lr.ids))
+        values = [int(tok) if tok[0].isdigit() else None for tok in TOKEN.findall(text)]
+
+        t_ids = best_of(args.repeat, lambda: lr.recognize(ids))
+        t_lex = best_of(args.repeat, lambda: lr.recognize(lex(text, lr.ids)))
+        t_act = best_of(args.repeat, lambda: lr.parse(ids, values, actions))
+        row = [n_tokens / t for t in (t_ids, t_lex, t_act)]
+        if exe is not None:
+            path = os.path.join(workdir, f"input-{n}.txt")
+            with open(path, "w") as f:
+                f.write(text)
+            t_bison = max(run_bison(exe, path, args.repeat) - startup, 1e-9)
+            row.append(n_tokens / t_bison)
+            os.remove(path)
+        cells = " ".join(f"{rate:>12,.0f}" for rate in row)
+        print(f"{n_tokens:>10} {cells}")
+        del ids, values
+    shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
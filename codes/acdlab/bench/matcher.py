@@ -0,0 +1,119 @@
+"""Hopcroft minimization and byte matching: states, time and MB/s.
+
+    python -m acdlab.bench.matcher [--megabytes 64] [--from-end 8 12 16] [--keywords 200 1000]
+
+The first table minimizes the DFA of every automaton in "All exps" and of
+the synthetic NFAs of bench/automata.py.
+
+The second scans files of --megabytes random bytes through mmap:
+
+  start with a       membership over {a, b}: after the first a every a or b
+                     stays put, so the scan is one character class search in C
+  ends with ab       membership over {a, b} ("'ab' as a sub-string.jff"):
+                     no state stays put for long, every byte goes through the
+                     table loop; the slowest case
+  search ab          the same automaton as a search: count the ends of "ab"
+                     in random lowercase text (a in 1 byte of 27)
+  search keywords    count the ends of 200 random keywords in random
+                     lowercase text (an Aho-Corasick automaton)
+  atmost 2           membership, stops at the dead state after 3 bytes
+
+"naive" is DFA.accepts(), one dict lookup per symbol, on the first MB.
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from acdlab.automata import determinize, minimize
+from acdlab.bench.automata import ALL_EXPS, keywords, nth_from_end
+from acdlab.bench.lrparse import best_of
+from acdlab.jff import load_automaton, read_jff
+from acdlab.matcher import compile_matcher
+
+
+def random_text(path, size, letters, seed=0):
+    """Write ``size`` random bytes drawn evenly from ``letters``."""
+    rng = random.Random(seed)
+    table = bytes(letters[i % len(letters)] for i in range(256))
+    with open(path, "wb") as f:
+        for start in range(0, size, 1 << 20):
+            f.write(rng.randbytes(min(1 << 20, size - start)).translate(table))
+
+
+def minimization(args):
+    cases = []
+    for name in sorted(os.listdir(ALL_EXPS)):
+        if name.endswith(".jff"):
+            loaded = read_jff(os.path.join(ALL_EXPS, name))
+            if loaded.automaton is not None:
+                cases.append((name[:-4], loaded.automaton))
+    cases += [(f"from-end-{n}", nth_from_end(n)) for n in args.from_end]
+    cases += [(f"keywords-{k}", keywords(k)) for k in args.keywords]
+    print(f"{'automaton':>34} {'nfa':>6} {'dfa':>7} {'minimal':>7} {'hopcroft':>10} {'states/s':>10}")
+    for name, nfa in cases:
+        dfa = determinize(nfa)
+        seconds = best_of(args.repeat, lambda: minimize(dfa))
+        print(f"{name[:34]:>34} {len(nfa):>6} {len(dfa):>7} {len(minimize(dfa)):>7} "
+              f"{seconds * 1000:>8.2f}ms {len(dfa) / seconds:>10,.0f}")
+
+
+def naive(dfa, path):
+    with open(path, "rb") as f:
+        text = f.read(1 << 20).decode("latin-1")
+    start = time.perf_counter()
+    dfa.accepts(text)
+    return len(text) / (time.perf_counter() - start)
+
+
+def throughput(args, directory):
+    size = args.megabytes << 20
+    ab = os.path.join(directory, "ab.txt")
+    lower = os.path.join(directory, "lower.txt")
+    random_text(ab, size - 1, b"ab")
+    with open(ab, "r+b") as f:          # starts with a
+        f.seek(0)
+        f.write(b"a")
+    random_text(lower, size, b"abcdefghijklmnopqrstuvwxyz ")
+    ends_ab = load_automaton(os.path.join(ALL_EXPS, "'ab' as a sub-string.jff"))
+    cases = [
+        ("start with a", load_automaton(os.path.join(ALL_EXPS, "start with a.jff")), False, ab),
+        ("ends with ab", ends_ab, False, ab),
+        ("search ab", ends_ab, True, lower),
+        ("search keywords", keywords(200), True, lower),
+        ("atmost 2", load_automaton(os.path.join(ALL_EXPS, "string length atmost 2.jff")), False, ab),
+    ]
+    print(f"\n{'case':>16} {'states':>7} {'compile':>9} {'MB':>6} {'seconds':>8} {'MB/s':>8} "
+          f"{'naive':>8} {'result':>10}")
+    for name, nfa, search, path in cases:
+        start = time.perf_counter()
+        matcher = compile_matcher(nfa, search)
+        compile_time = time.perf_counter() - start
+        scan = matcher.count_file if search else matcher.match_file
+        seconds = best_of(args.repeat, lambda: scan(path))
+        naive_rate = "" if search else f"{naive(determinize(nfa), path) / 1e6:>7.1f}"
+        print(f"{name:>16} {len(matcher):>7} {compile_time * 1000:>7.1f}ms {args.megabytes:>6} "
+              f"{seconds:>8.3f} {size / seconds / 1e6:>8.1f} {naive_rate:>8} {scan(path)!s:>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megabytes", type=int, default=64)
+    parser.add_argument("--from-end", type=int, nargs="*", default=[8, 12, 16])
+    parser.add_argument("--keywords", type=int, nargs="*", default=[200, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    minimization(args)
+    directory = tempfile.mkdtemp()
+    try:
+        throughput(args, directory)
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Thompson NFAs simulated by a lazy DFA against Python's re: MB/s on large files.
+
+    python -m acdlab.bench.regex [--megabytes 8] [--from-end 8 12 16] [--max-states 4096]
+
+Cases, all over files of --megabytes random bytes read through mmap:
+
+  exp 03       the expression of "exp 03 re to epslon nfa.jff", (a+b)*abb,
+               matched against a whole file of a and b ending in abb
+  from-end-n   (a+b)*a(a+b)...(a+b), the n-th symbol from the end is a: a
+               Thompson NFA of about 6n states whose DFA has 2^n; with n
+               past log2(--max-states) the cache is emptied again and again
+               and every byte costs a subset step, so memory stays bounded
+               but the speed is that of simulating the NFA
+  search       q(u+v)(i+x)z inside random lowercase text; lazy counts the
+               ends of matches, re the matches of finditer()
+
+"states" is the number of DFA states in the cache at the end and "flushes"
+how often it was emptied.  Every Thompson NFA is also exported with
+write_jff() and read back, and the time of that round trip is in "jff".
+"""
+
+import argparse
+import os
+import re
+import shutil
+import tempfile
+import time
+
+from acdlab.bench.lrparse import best_of
+from acdlab.bench.matcher import random_text
+from acdlab.jff import read_jff, write_jff
+from acdlab.matcher import map_file
+from acdlab.regex import LazyDFA, parse_regex, python_pattern, thompson
+
+EXP_03 = os.path.join(os.path.dirname(__file__), "..", "..", "..", "All exps",
+                      "exp 03 re to epslon nfa.jff")
+
+
+def from_end(n):
+    return "(a+b)*a" + "(a+b)" * (n - 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megabytes", type=int, default=8)
+    parser.add_argument("--from-end", type=int, nargs="*", default=[8, 12, 16])
+    parser.add_argument("--max-states", type=int, default=4096)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    size = args.megabytes << 20
+    directory = tempfile.mkdtemp()
+    try:
+        ab = os.path.join(directory, "ab.txt")
+        random_text(ab, size - 3, b"ab")
+        with open(ab, "ab") as f:
+            f.write(b"abb")
+        lower = os.path.join(directory, "lower.txt")
+        random_text(lower, size, b"abcdefghijklmnopqrstuvwxyz ")
+
+        cases = [("exp 03", read_jff(EXP_03).expression, False, ab)]
+        cases += [(f"from-end-{n}", from_end(n), False, ab) for n in args.from_end]
+        cases += [("search", "q(u+v)(i+x)z", True, lower)]
+
+        print(f"{'case':>12} {'nfa':>5} {'jff':>8} {'lazy MB/s':>10} {'states':>7} {'flushes':>8} "
+              f"{'re MB/s':>9} {'result':>16}")
+        for name, expression, search, path in cases:
+            tree = parse_regex(expression)
+            nfa = thompson(tree)
+            exported = os.path.join(directory, name + ".jff")
+            start = time.perf_counter()
+            write_jff(nfa, exported)
+            read_jff(exported)
+            jff_time = time.perf_counter() - start
+
+            pattern = re.compile(python_pattern(tree).encode())
+            if search:
+                def re_run():
+                    return map_file(path, lambda data: sum(1 for _ in pattern.finditer(data)))
+            else:
+                def re_run():
+                    return map_file(path, lambda data: pattern.fullmatch(data) is not None)
+            lazy_seconds = None
+            for _ in range(args.repeat):
+                lazy = LazyDFA(nfa, search, args.max_states)
+                start = time.perf_counter()
+                result = (lazy.count_file if search else lazy.match_file)(path)
+                seconds = time.perf_counter() - start
+                lazy_seconds = seconds if lazy_seconds is None else min(lazy_seconds, seconds)
+            re_seconds = best_of(args.repeat, re_run)
+            print(f"{name:>12} {len(nfa):>5} {jff_time * 1000:>6.1f}ms {size / lazy_seconds / 1e6:>10.2f} "
+                  f"{len(lazy):>7} {lazy.flushes:>8} {size / re_seconds / 1e6:>9.1f} "
+                  f"{f'{result}/{re_run()}':>16}")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
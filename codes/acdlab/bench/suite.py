@@ -0,0 +1,218 @@
+"""Every stage of the pipeline on fixed grammars and inputs, saved as JSON and compared between runs.
+
+    python -m acdlab.bench.suite [--out results.json] [--baseline old.json]
+                                 [--threshold 0.1] [--scale 1] [--repeat 5]
+
+Grammars, all fixed by their seed and size (see grammars.py):
+
+  expr json sql c calculator   the real-language grammars
+  synthetic-500, -2000         generate_grammar() defaults
+  nullable-1000                40% of the nonterminals nullable
+  deep-1000                    an operator tower 20 levels deep
+  ambiguous-1000               a fifth of the nonterminals with X -> X op X
+
+and for each: FIRST/FOLLOW, the LR(0) automaton, its SLR and LALR tables,
+the left-recursion and factoring transform, and the LL(1) table of
+acd7up.py on the result.  Besides the grammars: LR and LL(1) parsing of a
+generated calculator expression and generate_tac() on random statements.
+--scale multiplies every grammar and input size.
+
+Each measurement is the best of --repeat runs after a garbage collection.
+--out writes them with the Python version and machine to a JSON file keyed
+"case/stage"; --baseline reads such a file and flags every measurement that
+got slower by more than --threshold (and by more than --min-delta seconds,
+under which timings are noise), and the exit status is then 1 if any did.
+"""
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+
+from acdlab import Grammar, LRParser, PackedTable
+from acdlab.bench.backend import random_program
+from acdlab.bench.grammars import (CALCULATOR, CALCULATOR_LL, LANGUAGES, generate_grammar,
+                                   language_grammar, parse_rules)
+from acdlab.bench.lrparse import generate_expression, lex
+from acdlab.firstfollow import analyze
+from acdlab.ll1 import LL1Parser, ll1_parsing_table
+from acdlab.lr0 import LR0Automaton
+from acdlab.lrtable import LRTable, build_table
+from acdlab.tac import generate_tac
+from acdlab.transform import join_rules, transform_rules
+
+FORMAT = 1
+
+SYNTHETIC = [
+    ("synthetic-500", 500, {}),
+    ("synthetic-2000", 2000, {}),
+    ("nullable-1000", 1000, {"nullable_rate": 0.4}),
+    ("deep-1000", 1000, {"depth": 20}),
+    ("ambiguous-1000", 1000, {"ambiguity": 0.2}),
+]
+
+
+def measure(repeat, fn):
+    """(best seconds of ``repeat`` runs, result of the last run)."""
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        result = fn()
+        seconds = time.perf_counter() - t0
+        best = seconds if best is None else min(best, seconds)
+    return best, result
+
+
+def grammar_cases(scale):
+    cases = [(name, language_grammar(name)) for name in LANGUAGES]
+    cases.append(("calculator", parse_rules(CALCULATOR)))
+    for name, size, options in SYNTHETIC:
+        cases.append((name, generate_grammar(max(8, round(size * scale)), seed=0, **options)))
+    return cases
+
+
+def run_grammar(rules, repeat, results):
+    """Time every stage on one grammar; returns its sizes."""
+    grammar = Grammar(rules)
+    results["first_follow"], _ = measure(repeat, lambda: analyze(grammar))
+    augmented = grammar.augmented()
+    results["lr0"], automaton = measure(repeat, lambda: LR0Automaton(augmented))
+    results["slr"], slr = measure(repeat, lambda: LRTable(automaton, "slr"))
+    results["lalr"], lalr = measure(repeat, lambda: LRTable(automaton, "lalr"))
+    results["transform"], (transformed, _) = measure(repeat, lambda: transform_rules(rules))
+    lines = join_rules(transformed)
+    results["ll1_table"], _ = measure(repeat, lambda: ll1_parsing_table(lines))
+    return {
+        "productions": len(grammar.productions),
+        "states": len(automaton),
+        "slr_conflicts": len(slr.conflicts),
+        "lalr_conflicts": len(lalr.conflicts),
+        "ll1_productions": sum(len(alts) for alts in transformed.values()),
+    }
+
+
+def run_inputs(scale, repeat, results):
+    """Parsing and TAC generation on generated inputs; returns their sizes."""
+    text, n_tokens = generate_expression(max(100, round(200000 * scale)))
+    lr_grammar = Grammar(parse_rules(CALCULATOR))
+    lr = LRParser(PackedTable.from_table(build_table(lr_grammar)))
+    lr_ids = lr.token_ids(lr_grammar.symbols[t] for t in lex(text, lr_grammar.ids))
+    results["lr_parse"], _ = measure(repeat, lambda: lr.recognize(lr_ids))
+
+    ll_grammar = Grammar(parse_rules(CALCULATOR_LL))
+    ll = LL1Parser(ll_grammar)
+    ll_ids = list(lex(text, ll_grammar.ids))
+    results["ll1_parse"], _ = measure(repeat, lambda: ll.parse(ll_ids))
+
+    n_statements = max(100, round(100000 * scale))
+    statements, _ = random_program(n_statements)
+    results["tac"], _ = measure(repeat, lambda: generate_tac(statements))
+    return {"tokens": n_tokens, "statements": n_statements}
+
+
+def run_suite(scale=1.0, repeat=5, only=None, log=None):
+    """The suite as the JSON document --out writes."""
+    measurements = {}
+    sizes = {}
+    cases = grammar_cases(scale) + [("inputs", None)]
+    for name, rules in cases:
+        if only and not any(word in name for word in only):
+            continue
+        results = {}
+        t0 = time.perf_counter()
+        if rules is None:
+            sizes[name] = run_inputs(scale, repeat, results)
+        else:
+            sizes[name] = run_grammar(rules, repeat, results)
+        for stage, seconds in results.items():
+            measurements[f"{name}/{stage}"] = seconds
+        if log:
+            log(f"{name}: {time.perf_counter() - t0:.1f}s")
+    return {
+        "format": FORMAT,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "scale": scale,
+        "repeat": repeat,
+        "sizes": sizes,
+        "seconds": measurements,
+    }
+
+
+def compare(baseline, current, threshold=0.1, min_delta=0.0005):
+    """(key, old, new, ratio) for every measurement in both, and the keys of the regressions."""
+    rows = []
+    regressions = []
+    for key, new in current["seconds"].items():
+        old = baseline["seconds"].get(key)
+        if old is None:
+            continue
+        ratio = new / old if old else float("inf")
+        rows.append((key, old, new, ratio))
+        if ratio > 1 + threshold and new - old > min_delta:
+            regressions.append(key)
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", metavar="FILE", help="write the results as JSON")
+    parser.add_argument("--baseline", metavar="FILE", help="results of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="slowdown flagged as a regression (default 0.1, i.e. 10%%)")
+    parser.add_argument("--min-delta", type=float, default=0.0005,
+                        help="seconds a slowdown must also exceed (default 0.0005)")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="*", help="run only the cases whose name contains one of these words")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("format") != FORMAT:
+            parser.error(f"{args.baseline}: not a results file of this suite")
+        if baseline["scale"] != args.scale:
+            print(f"note: {args.baseline} was run with --scale {baseline['scale']}; "
+                  f"using it for this run too", file=sys.stderr)
+            args.scale = baseline["scale"]
+
+    current = run_suite(args.scale, args.repeat, args.only,
+                        log=lambda line: print(line, file=sys.stderr))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=1)
+            f.write("\n")
+
+    if baseline is None:
+        print(f"{'case/stage':>28} {'ms':>10}")
+        for key, seconds in current["seconds"].items():
+            print(f"{key:>28} {seconds * 1000:>10.3f}")
+        return 0
+
+    rows, regressions = compare(baseline, current, args.threshold, args.min_delta)
+    flagged = set(regressions)
+    print(f"{'case/stage':>28} {'before ms':>10} {'after ms':>10} {'ratio':>6}")
+    for key, old, new, ratio in rows:
+        mark = "  REGRESSION" if key in flagged else ""
+        print(f"{key:>28} {old * 1000:>10.3f} {new * 1000:>10.3f} {ratio:>6.2f}{mark}")
+    # Cases left out with --only are not missing
+    for key in sorted(set(current["seconds"]) ^ set(baseline["seconds"])):
+        if key.split("/")[0] in current["sizes"]:
+            print(f"{key:>28} only in {'this run' if key in current['seconds'] else args.baseline}")
+    if (baseline["python"], baseline["machine"]) != (current["python"], current["machine"]):
+        print(f"note: baseline ran on Python {baseline['python']} ({baseline['machine']}), "
+              f"this run on {current['python']} ({current['machine']})")
+    print(f"{len(regressions)} regressions over {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""Packed ACTION/GOTO tables vs. the (state, symbol)-keyed dicts of slrtableshort.py.
+
+    python -m acdlab.bench.tables [--synthetic 1000 3000] [--lookups 200000]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from acdlab import Grammar
+from acdlab.bench.grammars import LANGUAGES, language_grammar, synthetic_grammar
+from acdlab.lrtable import build_table, named_tables
+from acdlab.packed import PackedTable
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--synthetic", type=int, nargs="*", default=[1000, 3000])
+    parser.add_argument("--lookups", type=int, default=200000)
+    args = parser.parse_args(argv)
+
+    cases = [(name, language_grammar(name)) for name in LANGUAGES]
+    cases += [(f"synthetic-{n}", synthetic_grammar(n)) for n in args.synthetic]
+    rng = random.Random(0)
+    path = os.path.join(tempfile.mkdtemp(), "table.bin")
+
+    print(f"{'grammar':>16} {'states':>7} {'dict bytes':>12} {'packed':>10} "
+          f"{'build':>9} {'load':>9} {'dict get':>9} {'packed':>9} {'mmap':>9}")
+    for name, rules in cases:
+        t0 = time.perf_counter()
+        table = build_table(Grammar(rules))
+        packed = PackedTable.from_table(table)
+        build = time.perf_counter() - t0
+
+        tracemalloc.start()
+        action, _ = named_tables(table)
+        dict_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        packed.save(path)
+        t0 = time.perf_counter()
+        loaded = PackedTable.load(path)
+        load = time.perf_counter() - t0
+
+        symbols = table.grammar.symbols
+        T = table.grammar.n_terminals
+        probes = [(rng.randrange(len(table)), rng.randrange(T)) for _ in range(args.lookups)]
+        named = [(s, symbols[t]) for s, t in probes]
+        t0 = time.perf_counter()
+        for key in named:
+            action.get(key)
+        t_dict = time.perf_counter() - t0
+        timings = []
+        for tables in (packed, loaded):
+            lookup = tables.action
+            t0 = time.perf_counter()
+            for s, t in probes:
+                lookup(s, t)
+            timings.append(time.perf_counter() - t0)
+
+        print(f"{name:>16} {len(table):>7} {dict_bytes:>12,} {packed.nbytes():>10,} "
+              f"{build:>8.3f}s {load * 1000:>7.2f}ms {t_dict:>8.3f}s {timings[0]:>8.3f}s {timings[1]:>8.3f}s")
+        del loaded
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
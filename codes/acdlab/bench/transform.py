@@ -0,0 +1,67 @@
+"""Left-recursion removal and prefix factoring on large grammars.
+
+    python -m acdlab.bench.transform [--sizes 1000 10000 100000]
+
+"recursive" grammars are synthetic grammars in which a share of the rules
+call back to an earlier nonterminal at the start of an alternative, so that
+indirect left recursion has to be removed by substitution; "prefixed" ones
+have many alternatives per rule sharing long prefixes.  Time should grow about
+linearly with the number of alternatives; "growth" is the ratio of
+right-hand-side symbols after and before.
+"""
+
+import argparse
+import random
+
+from acdlab.bench.grammars import LANGUAGES, language_grammar, synthetic_grammar
+from acdlab.bench.lrparse import best_of
+from acdlab.transform import transform_rules
+
+
+def recursive_grammar(n_productions, seed=0, rate=0.2):
+    rng = random.Random(seed)
+    rules = synthetic_grammar(n_productions, seed=seed)
+    names = list(rules)
+    for i, A in enumerate(names):
+        if rng.random() < rate:
+            # a left-corner cycle through the rule itself or one of the few before it
+            B = names[rng.randrange(max(0, i - 3), i + 1)]
+            rules[A].append([B] + [f"t{rng.randrange(10)}" for _ in range(rng.randint(1, 3))])
+            if B != A:
+                rules[B].append([A] + [f"t{rng.randrange(10)}" for _ in range(rng.randint(1, 3))])
+    return rules
+
+
+def prefixed_grammar(n_productions, seed=0, per_rule=50):
+    rng = random.Random(seed)
+    rules = {}
+    for i in range(max(1, n_productions // per_rule)):
+        rules[f"N{i}"] = [[f"t{rng.randrange(4)}" for _ in range(rng.randint(1, 8))]
+                          for _ in range(per_rule)]
+    return rules
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    cases = [(name, language_grammar(name)) for name in LANGUAGES]
+    for n in args.sizes:
+        cases.append((f"recursive-{n}", recursive_grammar(n)))
+        cases.append((f"prefixed-{n}", prefixed_grammar(n)))
+
+    print(f"{'grammar':>17} {'alts':>7} {'seconds':>9} {'us/alt':>7} {'subst':>7} "
+          f"{'new':>6} {'rules':>13} {'growth':>7}")
+    for name, rules in cases:
+        _, report = transform_rules(rules)
+        seconds = best_of(args.repeat, lambda: transform_rules(rules))
+        (r0, a0, _), (r1, _, _) = report["before"], report["after"]
+        print(f"{name:>17} {a0:>7} {seconds:>8.3f}s {seconds / a0 * 1e6:>7.1f} "
+              f"{report['substitutions']:>7} {len(report['new_nonterminals']):>6} "
+              f"{f'{r0}->{r1}':>13} {report['growth']:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Target code on the VM: instructions, memory accesses, cycles and run speed, naive vs. optimized.
+
+    python -m acdlab.bench.vm [--statements 100000 1000000] [--registers 2 4 8]
+
+Every program of bench/backend.py (with constant divisors, so it cannot
+divide by zero) is compiled by generate_tac() ("naive") and by the
+optimizing backend for each register count, decoded once and run on the same
+memory.  "agree" checks that every live variable ends with the same value as
+under the naive code, where that value is finite: long random programs can
+overflow to inf or nan, for which value numbering's x - x = 0 does not hold.
+"Minstr/s" is the interpreter's speed.
+"""
+
+import argparse
+import math
+import random
+import time
+
+from acdlab.backend import build_block, compile_block
+from acdlab.bench.backend import random_program
+from acdlab.tac import generate_tac
+from acdlab.vm import Program
+
+
+def same(a, b):
+    return not math.isfinite(a) or a == b or math.isclose(a, b, rel_tol=1e-9)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--statements", type=int, nargs="*", default=[100000, 1000000])
+    parser.add_argument("--registers", type=int, nargs="*", default=[2, 4, 8])
+    args = parser.parse_args(argv)
+
+    print(f"{'statements':>10} {'code':>6} {'instr':>9} {'memory':>9} {'cycles':>10} "
+          f"{'decode':>8} {'run':>8} {'Minstr/s':>8} {'agree':>5}")
+    for n in args.statements:
+        statements, live_out = random_program(n, constant_divisors=True)
+        rng = random.Random(n)
+        memory = {name: rng.uniform(0.5, 1.5) for name in sorted(live_out)}
+        block = build_block(statements, [])
+        block.live_out = live_out
+        cases = [("naive", generate_tac(statements))]
+        cases += [(f"R{k}", compile_block(block, k)) for k in args.registers]
+        expected = None
+        for name, code in cases:
+            t0 = time.perf_counter()
+            program = Program(code)
+            decode = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            result = program.run(memory)
+            run = time.perf_counter() - t0
+            if expected is None:
+                expected = result
+            agree = all(same(expected.get(v, memory[v]), result.get(v, memory[v])) for v in live_out)
+            stats = program.stats()
+            print(f"{n:>10} {name:>6} {stats['instructions']:>9} {stats['memory']:>9} "
+                  f"{stats['cycles']:>10} {decode:>7.2f}s {run:>7.2f}s "
+                  f"{stats['instructions'] / run / 1e6:>8.1f} {'yes' if agree else 'NO':>5}")
+
+
+if __name__ == "__main__":
+    main()
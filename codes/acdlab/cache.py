@@ -0,0 +1,337 @@
+# Content-addressed on-disk cache of grammar analyses.
+#
+# An entry is keyed by the SHA-256 of its kind ("cfg", "first_follow",
+# "lr0", "table-lalr", ...) and the canonical text of the grammar: one
+# "A -> x y | z" line per rule with single spaces, epsilon alternatives
+# spelled with the epsilon symbol.  Rules keep their order: an interned
+# Grammar's text also lists its symbols in numbering order, because automata
+# and tables are stored in symbol and item ids that are only meaningful for
+# that numbering.  Grammars that differ only in layout therefore share
+# entries, and an edited grammar simply misses: nothing is ever invalidated.
+#
+# Parse tables are stored in the PackedTable file format and mapped back with
+# PackedTable.load(); everything else is a small marshal payload (bitmasks,
+# int tuples, strings), zlib-compressed.  marshal's format belongs to the
+# Python version, which is therefore part of every key.
+#
+# Files are written to a temporary name and renamed, so processes can share a
+# cache directory.  Reading an entry touches its mtime; when the directory
+# grows past ``max_bytes`` the least recently used entries are deleted.  A
+# cache that cannot be written is not an error: the failed entry is counted
+# in ``stats["errors"]`` and the result is returned as computed.  An entry
+# that cannot be read back is counted the same way, deleted and recomputed.
+
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+import zlib
+
+from .firstfollow import analyze
+from .grammar import Grammar, bit_names
+from .lr0 import LR0Automaton
+from .lrtable import build_table
+from .packed import PackedTable
+from .profiling import count
+from .transform import compute_cfg
+
+MAGIC = b"ACDC"
+VERSION = 5
+_SALT = f"acdlab-cache-{VERSION}-py{sys.version_info[0]}.{sys.version_info[1]}"
+
+
+def default_directory():
+    """$ACDLAB_CACHE, or acdlab/ under the user's cache directory."""
+    if os.environ.get("ACDLAB_CACHE"):
+        return os.environ["ACDLAB_CACHE"]
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "acdlab")
+
+
+def canonical_rules(rules, epsilon="ε"):
+    """Canonical text of a {A: [[x, y], ...]} dict."""
+    return "\n".join(f"{A} -> " + " | ".join(" ".join(s for s in alt if s != epsilon) or epsilon
+                                               for alt in alts)
+                     for A, alts in rules.items())
+
+
+def canonical_lines(grammar):
+    """Canonical text of a list of "A -> x y | z" strings, one rule per string."""
+    lines = []
+    for rule in grammar:
+        lhs, rhs = rule.split("->", 1)
+        lines.append(f"{lhs.strip()} -> " + " | ".join(" ".join(alt.split()) for alt in rhs.split("|")))
+    return "\n".join(lines)
+
+
+def canonical_grammar(grammar):
+    """Canonical text of an interned Grammar, in the grammar's own numbering.
+
+    The symbols are listed by id and the rules in production order, so two
+    grammars share the text only if their automata and tables are identical.
+    """
+    return (f"%end {grammar.end}\n%start {grammar.symbols[grammar.start]}\n"
+            f"%symbols {' '.join(grammar.symbols)}\n"
+            + canonical_rules(grammar.to_rules(), grammar.epsilon))
+
+
+def canonical_file(loaded):
+    """Canonical text of a loader.GrammarFile: its rules and precedence declarations."""
+    lines = [f"%{assoc} " + " ".join(names) for assoc, names in loaded.precedence]
+    lines += [f"%prec {p} {token}" for p, token in sorted(loaded.prec.items())]
+    return "\n".join(lines + [canonical_rules(loaded.rules(), loaded.grammar.epsilon)])
+
+
+_default = None
+
+
+def default_cache():
+    """The GrammarCache of default_directory(), created on first use.
+
+    If the directory cannot be created the result is a NullCache, which
+    computes everything and stores nothing.
+    """
+    global _default
+    if _default is None:
+        try:
+            _default = GrammarCache()
+        except OSError:
+            _default = NullCache()
+    return _default
+
+
+class GrammarCache:
+    """Size-bounded on-disk LRU of transformed grammars, FIRST/FOLLOW, LR(0) and tables.
+
+    ``stats`` counts hits, misses, writes, evictions and failed writes of
+    this instance.  Creating the directory raises OSError; later write
+    failures do not.
+    """
+
+    def __init__(self, directory=None, max_bytes=64 << 20):
+        self.directory = directory or default_directory()
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "errors": 0}
+        os.makedirs(self.directory, exist_ok=True)
+        self._size = None            # bytes on disk, counted on the first write
+
+    def key(self, kind, text):
+        digest = hashlib.sha256(f"{_SALT}\0{kind}\0{text}".encode()).hexdigest()
+        return f"{digest}.{kind}"
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    # Raw entries
+
+    def get(self, key):
+        """Bytes stored under ``key``, or None."""
+        data = self._read(key)
+        self._tally(data is not None)
+        return data
+
+    def _read(self, key):
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def _tally(self, hit):
+        name = "hits" if hit else "misses"
+        self.stats[name] += 1
+        count(f"cache.{name}")
+
+    def put(self, key, data):
+        """Store ``data`` under ``key``; returns False if it could not be written."""
+        def write(tmp):
+            with open(tmp, "wb") as f:
+                f.write(data)
+        return self._write(key, write)
+
+    def _write(self, key, write):
+        path = self.path(key)
+        tmp = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+            os.close(fd)
+            write(tmp)
+            os.replace(tmp, path)
+            self.stats["writes"] += 1
+            self._account(os.path.getsize(path))
+        except OSError:
+            if tmp is not None:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+            self.stats["errors"] += 1
+            count("cache.errors")
+            return False
+        return True
+
+    def load(self, key):
+        """Payload stored with store(), or None."""
+        data = self._read(key)
+        payload = None
+        if data is not None:
+            try:
+                if data[:4] != MAGIC:
+                    raise ValueError("not a cache entry")
+                payload = marshal.loads(zlib.decompress(data[4:]))
+            except (zlib.error, ValueError, EOFError, TypeError):
+                self._discard(key)
+        self._tally(payload is not None)
+        return payload
+
+    def _discard(self, key):
+        """Count and delete an entry that could not be read back."""
+        self.stats["errors"] += 1
+        count("cache.errors")
+        try:
+            os.remove(self.path(key))
+        except OSError:
+            pass
+
+    def store(self, key, payload):
+        self.put(key, MAGIC + zlib.compress(marshal.dumps(payload), 1))
+        return payload
+
+    def _entries(self):
+        for sub in os.scandir(self.directory):
+            if sub.is_dir():
+                for entry in os.scandir(sub.path):
+                    if not entry.name.startswith(".tmp-"):
+                        yield entry
+
+    def _account(self, added):
+        if self._size is None:
+            self._size = sum(entry.stat().st_size for entry in self._entries())
+        else:
+            self._size += added
+        if self._size > self.max_bytes:
+            # down to 90% so that the next writes do not rescan right away
+            self.evict(self.max_bytes * 9 // 10)
+
+    def evict(self, limit=None):
+        """Delete least recently used entries until the cache fits in ``limit`` (max_bytes)."""
+        if limit is None:
+            limit = self.max_bytes
+        entries = []
+        for entry in self._entries():
+            st = entry.stat()
+            entries.append((st.st_mtime, st.st_size, entry.path))
+        entries.sort()
+        size = sum(e[1] for e in entries)
+        for _, nbytes, path in entries:
+            if size <= limit:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            size -= nbytes
+            self.stats["evictions"] += 1
+        self._size = size
+
+    def clear(self):
+        for entry in list(self._entries()):
+            os.remove(entry.path)
+        self._size = 0
+
+    # Analyses
+
+    def transformed(self, grammar):
+        """compute_cfg() of a list of "A -> x y | z" strings."""
+        key = self.key("cfg", canonical_lines(grammar))
+        cached = self.load(key)
+        if cached is not None:
+            return list(cached)
+        return self.store(key, compute_cfg(grammar))
+
+    def first_follow(self, rules, start=None, epsilon="ε", end="$"):
+        """Same result as firstfollow.first_follow(), cached as bitmasks."""
+        header = f"%end {end}\n%start {start}\n" if start is not None else f"%end {end}\n"
+        key = self.key("first_follow", header + canonical_rules(rules, epsilon))
+        cached = self.load(key)
+        if cached is None:
+            grammar = Grammar(rules, start, epsilon, end)
+            first, follow, nullable = analyze(grammar)
+            nonterminals = grammar.nonterminals
+            cached = self.store(key, (
+                grammar.symbols[:grammar.n_terminals],
+                [grammar.symbols[A] for A in nonterminals],
+                [first[A] for A in nonterminals],
+                [follow[A] for A in nonterminals],
+                [bool(nullable[A]) for A in nonterminals],
+            ))
+        terminals, names, first, follow, nullable = cached
+        first_sets, follow_sets, nullable_set = {}, {}, set()
+        for name, f, g, n in zip(names, first, follow, nullable):
+            first_sets[name] = bit_names(terminals, f)
+            follow_sets[name] = bit_names(terminals, g)
+            if n:
+                first_sets[name].add(epsilon)
+                nullable_set.add(name)
+        return first_sets, follow_sets, nullable_set
+
+    def automaton(self, grammar):
+        """LR0Automaton of ``grammar.augmented()``."""
+        grammar = grammar.augmented()
+        key = self.key("lr0", canonical_grammar(grammar))
+        cached = self.load(key)
+        if cached is not None:
+            return LR0Automaton(grammar, collection=cached)
+        automaton = LR0Automaton(grammar)
+        self.store(key, (automaton.kernels, automaton.transitions, automaton.reductions))
+        return automaton
+
+    def table(self, grammar, method="lalr"):
+        """PackedTable of ``grammar``, mapped from the cache when present."""
+        key = self.key(f"table-{method}", canonical_grammar(grammar.augmented()))
+        path = self.path(key)
+        try:
+            packed = PackedTable.load(path)
+        except OSError:
+            self._tally(False)
+        except (ValueError, TypeError, KeyError):
+            self._discard(key)
+            self._tally(False)
+        else:
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            self._tally(True)
+            return packed
+        packed = PackedTable.from_table(build_table(grammar, method, self.automaton(grammar)))
+        self._write(key, packed.save)
+        return packed
+
+
+class NullCache(GrammarCache):
+    """A GrammarCache without a directory: every lookup misses, nothing is stored."""
+
+    def __init__(self):
+        self.directory = None
+        self.max_bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "errors": 0}
+        self._size = 0
+
+    def _read(self, key):
+        return None
+
+    def _write(self, key, write):
+        return False
+
+    def table(self, grammar, method="lalr"):
+        self._tally(False)
+        return PackedTable.from_table(build_table(grammar, method, self.automaton(grammar)))
+
+    def clear(self):
+        pass
@@ -0,0 +1,144 @@
+# One report per input file, for the command line (python -m acdlab).
+#
+# Every command takes the text of one input file and returns a dict that
+# json.dumps() accepts, so a batch run is a loop over files with no state
+# carried between them.  Sets are returned as sorted lists.
+
+import time
+
+from .backend import build_block, compile_block
+from .conflicts import Precedence, conflict_report
+from .firstfollow import first_follow
+from .grammar import Grammar
+from .ll1 import LL1Parser, is_ll1, ll1_parsing_table
+from .loader import parse_rules, read_grammar
+from .lrtable import build_table, named_tables
+from .tac import generate_tac, target_code
+from .transform import compute_cfg, join_rules, split_rules, transform_rules
+from .vm import Program
+
+
+def first_follow_report(text):
+    rules = parse_rules(text)
+    first, follow, nullable = first_follow(rules)
+    return {
+        "first": {A: sorted(first[A]) for A in rules},
+        "follow": {A: sorted(follow[A]) for A in rules},
+        "nullable": sorted(nullable),
+    }
+
+
+def transform_report(text):
+    rules, growth = transform_rules(parse_rules(text))
+    return {"rules": join_rules(rules), "growth": growth}
+
+
+def _ll1_conflicts(grammar):
+    interned = Grammar(split_rules(grammar))
+    return [[interned.symbols[A], interned.symbols[t],
+             [interned.production_str(p) for p in productions]]
+            for A, t, productions in LL1Parser(interned).conflicts]
+
+
+def _lr_conflicts(table):
+    symbols = table.grammar.symbols
+    return [[s, symbols[t], [table.describe(code) for code in codes]]
+            for s, t, codes in table.conflicts]
+
+
+def ll1_report(text):
+    """LL(1) table of the transformed grammar, like acd7up's "Compute Parsing Table"."""
+    grammar = compute_cfg(join_rules(parse_rules(text)))
+    table, terminals = ll1_parsing_table(grammar)
+    conflicts = _ll1_conflicts(grammar)
+    return {
+        "rules": grammar,
+        "ll1": is_ll1(grammar) and not conflicts,
+        "terminals": terminals,
+        "table": table,
+        "conflicts": conflicts,
+    }
+
+
+def table_report(text, method="slr", full=False):
+    """ACTION/GOTO of the grammar, with the file's %left/%right/%nonassoc applied."""
+    loaded = read_grammar(text.splitlines())
+    table = build_table(loaded.grammar, method, precedence=Precedence.from_file(loaded))
+    report = {
+        "method": method,
+        "states": len(table),
+        "conflicts": _lr_conflicts(table),
+        "resolved": len(table.resolved),
+    }
+    if full:
+        action, goto_table = named_tables(table)
+        report["action"] = [[s, a, list(v)] for (s, a), v in sorted(action.items())]
+        report["goto"] = [[s, A, j] for (s, A), j in sorted(goto_table.items())]
+    return report
+
+
+def conflicts_report(text, method="slr"):
+    loaded = read_grammar(text.splitlines())
+    return conflict_report(loaded.grammar, method, Precedence.from_file(loaded))
+
+
+def tac_report(text, registers=4):
+    """generate_tac() output and the optimized code of backend.py, with their costs on vm.py."""
+    statements = [line.strip() for line in text.splitlines() if line.strip()]
+    errors = []
+    tac = generate_tac(statements, errors)
+    optimized = compile_block(build_block(statements, []), registers)
+    return {
+        "tac": tac,
+        "target": target_code(tac),
+        "optimized": optimized,
+        "counts": {"before": Program(tac).stats(), "after": Program(optimized).stats()},
+        "errors": errors,
+    }
+
+
+def analyze_report(text):
+    """The whole GUI pipeline on one grammar, with the time of every stage.
+
+    compute_cfg -> FIRST/FOLLOW of the result -> LL(1) check, and an SLR
+    table of the grammar as written.
+    """
+    clock = time.perf_counter
+    marks = [clock()]
+    loaded = read_grammar(text.splitlines())
+    rules = loaded.rules()
+    marks.append(clock())
+    grammar = compute_cfg(join_rules(rules))
+    marks.append(clock())
+    first, follow, nullable = first_follow(split_rules(grammar))
+    marks.append(clock())
+    conflicts = _ll1_conflicts(grammar)
+    ll1 = is_ll1(grammar, first) and not conflicts
+    marks.append(clock())
+    table = build_table(loaded.grammar, "slr")
+    marks.append(clock())
+    stages = ("load", "cfg", "first_follow", "ll1", "slr")
+    timings = {stage: b - a for stage, a, b in zip(stages, marks, marks[1:])}
+    return {
+        "productions": sum(len(alts) for alts in rules.values()),
+        "rules": grammar,
+        "first": {A: sorted(first[A]) for A in first},
+        "follow": {A: sorted(follow[A]) for A in follow},
+        "nullable": sorted(nullable),
+        "ll1": ll1,
+        "ll1_conflicts": conflicts,
+        "slr_states": len(table),
+        "slr_conflicts": _lr_conflicts(table),
+        "timings": timings,
+    }
+
+
+COMMANDS = {
+    "analyze": analyze_report,
+    "first-follow": first_follow_report,
+    "transform": transform_report,
+    "ll1": ll1_report,
+    "conflicts": conflicts_report,
+    "table": table_report,
+    "tac": tac_report,
+}
@@ -0,0 +1,323 @@
+# Conflict analysis of LL(1) and LR tables, with yacc-style precedence.
+#
+# LL(1): one sweep over the alternatives of every nonterminal.  Alternative p
+# of A claims the terminals of FIRST(rhs), plus FOLLOW(A) when rhs can vanish;
+# the cells claimed twice are the OR of (claimed so far & claimed by p) over
+# the alternatives, so only conflicting cells are ever looked at.  A cell is a
+# FIRST/FIRST conflict when every claim comes from FIRST, FOLLOW/FOLLOW when
+# every claim comes from FOLLOW (two alternatives vanish), FIRST/FOLLOW
+# otherwise.
+#
+# LR: the conflicts LRTable recorded while filling the table, which already is
+# a single pass over the states; %left/%right/%nonassoc are applied there.
+#
+# Counterexample prefixes show how a conflict is reached.  For an LR state it
+# is the shortest viable prefix, the symbols on a shortest path from state 0
+# (one BFS over the automaton).  For an LL(1) cell (A, t) it is a shortest
+# input u with S =>* u A ..., found with Knuth's generalization of Dijkstra's
+# algorithm: first the shortest terminal string every symbol derives, then
+# the shortest left context of every nonterminal.  Both are near-linear, so a
+# report costs about as much as building the tables.
+
+from heapq import heappop, heappush
+
+from .firstfollow import analyze
+from .grammar import iter_bits
+from .lrtable import build_table, decode
+
+
+class Precedence:
+    """%left/%right/%nonassoc levels and %prec overrides, by symbol name.
+
+    ``levels`` lists (assoc, names) lowest first, like GrammarFile.precedence;
+    ``prec`` maps (lhs, rhs names) of a production to the token whose level
+    it takes.  Other productions take the level of their last terminal, as in
+    yacc.
+    """
+
+    def __init__(self, levels=(), prec=None):
+        self.assoc = [None]          # level -> "left", "right" or "nonassoc"
+        self.level = {}              # name -> level, 1 being the lowest
+        for assoc, names in levels:
+            self.assoc.append(assoc)
+            for name in names:
+                self.level[name] = len(self.assoc) - 1
+        self.prec = dict(prec or {})
+
+    @classmethod
+    def from_file(cls, loaded):
+        """Precedence declared in a loader.GrammarFile."""
+        grammar = loaded.grammar
+        symbols = grammar.symbols
+        prec = {}
+        for p, token in loaded.prec.items():
+            lhs, rhs = grammar.productions[p]
+            prec[symbols[lhs], tuple(symbols[X] for X in rhs)] = token
+        return cls(loaded.precedence, prec)
+
+    def __bool__(self):
+        return bool(self.level)
+
+    def compile(self, grammar):
+        """(level per terminal id, level per production, assoc per level); 0 means none."""
+        symbols = grammar.symbols
+        T = grammar.n_terminals
+        token_level = [self.level.get(symbols[t], 0) for t in range(T)]
+        production_level = []
+        for A, rhs in grammar.productions:
+            token = self.prec.get((symbols[A], tuple(symbols[X] for X in rhs))) if self.prec else None
+            if token is not None:
+                production_level.append(self.level.get(token, 0))
+                continue
+            level = 0
+            for X in reversed(rhs):
+                if X < T:
+                    level = token_level[X]
+                    break
+            production_level.append(level)
+        return token_level, production_level, self.assoc
+
+
+def shortest_yields(grammar):
+    """(length, choice) per symbol: the length of a shortest terminal string it
+    derives and, for a nonterminal, the production that starts it (None and -1
+    for nonterminals that derive no terminal string).
+    """
+    T = grammar.n_terminals
+    productions = grammar.productions
+    length = [1] * T + [None] * (len(grammar.symbols) - T)
+    choice = [-1] * len(grammar.symbols)
+    partial = [0] * len(productions)
+    missing = [0] * len(productions)
+    uses = [[] for _ in grammar.symbols]
+    heap = []
+    for p, (_, rhs) in enumerate(productions):
+        for X in rhs:
+            if X < T:
+                partial[p] += 1
+            else:
+                uses[X].append(p)
+                missing[p] += 1
+        if not missing[p]:
+            heappush(heap, (partial[p], p))
+    while heap:
+        n, p = heappop(heap)
+        A = productions[p][0]
+        if length[A] is not None:
+            continue
+        length[A] = n
+        choice[A] = p
+        for q in uses[A]:
+            partial[q] += n
+            missing[q] -= 1
+            if not missing[q]:
+                heappush(heap, (partial[q], q))
+    return length, choice
+
+
+def expand(grammar, choice, symbols, limit=40):
+    """Terminal ids of a shortest string derived from ``symbols``, and whether
+    it was cut at ``limit`` terminals."""
+    T = grammar.n_terminals
+    productions = grammar.productions
+    out = []
+    stack = list(reversed(symbols))
+    while stack and len(out) < limit:
+        X = stack.pop()
+        if X < T:
+            out.append(X)
+        else:
+            stack.extend(reversed(productions[choice[X]][1]))
+    return out, bool(stack)
+
+
+def left_contexts(grammar, length):
+    """Per nonterminal, the (production, position) through which it is reached
+    with the shortest terminal prefix from the start symbol, or None."""
+    T = grammar.n_terminals
+    productions = grammar.productions
+    dist = [None] * len(grammar.symbols)
+    parent = [None] * len(grammar.symbols)
+    dist[grammar.start] = 0
+    heap = [(0, grammar.start)]
+    while heap:
+        d, B = heappop(heap)
+        if d != dist[B]:
+            continue
+        for p in grammar.by_lhs[B]:
+            prefix = d
+            for i, X in enumerate(productions[p][1]):
+                if X >= T and (dist[X] is None or prefix < dist[X]):
+                    dist[X] = prefix
+                    parent[X] = (p, i)
+                    heappush(heap, (prefix, X))
+                if length[X] is None:
+                    break
+                prefix += length[X]
+    return dist, parent
+
+
+def context_prefix(grammar, parent, choice, A, limit=40):
+    """Shortest input u with start =>* u A ..., as terminal ids, and whether it was cut."""
+    productions = grammar.productions
+    chunks = []
+    while parent[A] is not None:
+        p, i = parent[A]
+        chunks.append(productions[p][1][:i])
+        A = productions[p][0]
+    return expand(grammar, choice, [X for chunk in reversed(chunks) for X in chunk], limit)
+
+
+def access_paths(automaton):
+    """(parent state, symbol) of every state on a shortest path from state 0."""
+    parent = [None] * len(automaton.kernels)
+    parent[0] = (-1, -1)
+    queue = [0]
+    for s in queue:
+        for X, target in automaton.transitions[s].items():
+            if parent[target] is None:
+                parent[target] = (s, X)
+                queue.append(target)
+    return parent
+
+
+def viable_prefix(parent, state):
+    """Symbol ids of a shortest viable prefix leading to ``state``."""
+    symbols = []
+    while state > 0:
+        state, X = parent[state]
+        symbols.append(X)
+    symbols.reverse()
+    return symbols
+
+
+def _names(grammar, ids, cut):
+    names = [grammar.symbols[X] for X in ids]
+    if cut:
+        names.append("...")
+    return names
+
+
+def ll1_conflicts(grammar, analysis=None, limit=40):
+    """Every conflicting cell of the LL(1) table of ``grammar``.
+
+    Returns a list of {"kind", "nonterminal", "terminal", "productions",
+    "prefix"} dicts; "productions" are in grammar order and "prefix" is a
+    shortest input that brings the parser to the cell (None if the
+    nonterminal cannot be reached).  ``analysis`` is analyze(grammar) if
+    already computed.
+    """
+    first, follow, nullable = analysis or analyze(grammar)
+    productions = grammar.productions
+    rows = []
+    for A in grammar.nonterminals:
+        seen = 0
+        twice = 0
+        claims = []
+        for p in grammar.by_lhs[A]:
+            mask = 0
+            vanishes = True
+            for X in productions[p][1]:
+                mask |= first[X]
+                if not nullable[X]:
+                    vanishes = False
+                    break
+            claim = mask | follow[A] if vanishes else mask
+            twice |= seen & claim
+            seen |= claim
+            claims.append((p, mask, claim))
+        if twice:
+            rows.append((A, twice, claims))
+    if not rows:
+        return []
+
+    length, choice = shortest_yields(grammar)
+    _, parent = left_contexts(grammar, length)
+    names = {}
+    report = []
+    for A, twice, claims in rows:
+        if A == grammar.start or parent[A] is not None:
+            prefix = _names(grammar, *context_prefix(grammar, parent, choice, A, limit))
+        else:
+            prefix = None
+        for t in iter_bits(twice):
+            wanting = [(p, mask >> t & 1) for p, mask, claim in claims if claim >> t & 1]
+            for p, _ in wanting:
+                if p not in names:
+                    names[p] = grammar.production_str(p)
+            vias = {via for _, via in wanting}
+            kind = "FIRST/FIRST" if vias == {1} else "FOLLOW/FOLLOW" if vias == {0} else "FIRST/FOLLOW"
+            report.append({
+                "kind": kind,
+                "nonterminal": grammar.symbols[A],
+                "terminal": grammar.symbols[t],
+                "productions": [names[p] for p, _ in wanting],
+                "prefix": prefix,
+            })
+    return report
+
+
+def lr_conflicts(table):
+    """The conflicts and precedence decisions of an LRTable.
+
+    Returns (conflicts, resolved): {"kind", "state", "terminal", "actions",
+    "prefix"} dicts, actions[0] being the one kept and "prefix" a shortest
+    viable prefix of the state, and {"state", "terminal", "production",
+    "decision"} dicts.
+    """
+    grammar = table.grammar
+    symbols = grammar.symbols
+    conflicts = []
+    if table.conflicts:
+        parent = access_paths(table.automaton)
+        # A state conflicts on many terminals, between the same few actions
+        actions = {}
+        prefixes = {}
+        for state, t, codes in table.conflicts:
+            for code in codes:
+                if code not in actions:
+                    actions[code] = list(table.describe(code))
+            if state not in prefixes:
+                prefixes[state] = [symbols[X] for X in viable_prefix(parent, state)]
+            conflicts.append({
+                "kind": "shift/reduce" if any(code > 0 for code in codes) else "reduce/reduce",
+                "state": state,
+                "terminal": symbols[t],
+                "actions": [actions[code] for code in codes],
+                "prefix": prefixes[state],
+            })
+    resolved = [{
+        "state": state,
+        "terminal": symbols[t],
+        "production": grammar.production_str(decode(reduce)[1]),
+        "decision": decision,
+    } for state, t, _, reduce, decision in table.resolved]
+    return conflicts, resolved
+
+
+def conflict_report(grammar, method="slr", precedence=None, limit=40):
+    """LL(1) and LR conflicts of one grammar with counts per kind.
+
+    ``precedence`` (a Precedence) is applied to the LR table only; LL(1)
+    tables have no shift/reduce choices for it to settle.
+    """
+    ll1 = ll1_conflicts(grammar, limit=limit)
+    lr, resolved = lr_conflicts(build_table(grammar, method, precedence=precedence or None))
+    counts = {}
+    for conflict in ll1 + lr:
+        counts[conflict["kind"]] = counts.get(conflict["kind"], 0) + 1
+    return {"method": method, "ll1": ll1, "lr": lr, "resolved": resolved, "counts": counts}
+
+
+def format_conflict(conflict):
+    """One line describing an ll1_conflicts() or lr_conflicts() entry."""
+    if "nonterminal" in conflict:
+        where = f"M[{conflict['nonterminal']}, {conflict['terminal']}]"
+        choices = " | ".join(conflict["productions"])
+    else:
+        where = f"state {conflict['state']} on {conflict['terminal']}"
+        choices = " | ".join(" ".join(str(part) for part in action) for action in conflict["actions"])
+    line = f"{conflict['kind']} conflict in {where}: {choices}"
+    if conflict["prefix"] is not None:
+        line += f"; example: {' '.join(conflict['prefix'] + ['•', conflict['terminal']])}"
+    return line
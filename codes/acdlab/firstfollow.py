@@ -0,0 +1,220 @@
+from .grammar import Grammar
+from .profiling import count, timed
+
+# Shared FIRST / FOLLOW / NULLABLE engine.
+#
+# Instead of re-walking every production until nothing changes, the engine
+# builds the "FIRST(A) includes FIRST(B)" and "FOLLOW(B) includes FOLLOW(A)"
+# graphs once, condenses them into strongly connected components and pushes the
+# sets through the condensation in topological order.  Every component is
+# finished in a single visit, so the work is linear in the size of the grammar
+# plus the size of the resulting sets, and left or mutual recursion cannot
+# loop forever.
+#
+# The engine works on an interned Grammar: symbols are ints and terminal sets
+# are int bitmasks (see grammar.py).  first_follow() is the string-level entry
+# point the scripts call; it interns the rules dict and decodes the result.
+
+
+def strongly_connected_components(nodes, succ):
+    """Iterative Tarjan.  Components come out sinks first (reverse topological order)."""
+    index, low = {}, {}
+    stack, on_stack = [], set()
+    components = []
+    counter = 0
+    for root in nodes:
+        if root in index:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(succ[root]))]
+        while work:
+            v, edges = work[-1]
+            for w in edges:
+                if w not in index:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack.add(w)
+                    work.append((w, iter(succ[w])))
+                    break
+                if w in on_stack and index[w] < low[v]:
+                    low[v] = index[w]
+            else:
+                work.pop()
+                if work:
+                    u = work[-1][0]
+                    if low[v] < low[u]:
+                        low[u] = low[v]
+                if low[v] == index[v]:
+                    component = []
+                    while True:
+                        w = stack.pop()
+                        on_stack.discard(w)
+                        component.append(w)
+                        if w == v:
+                            break
+                    components.append(component)
+    return components
+
+
+def propagate(nodes, succ, base):
+    """result[v] = base[v] | result[w] for every w reachable from v (bitmasks).
+
+    ``base`` and ``succ`` are indexed by node; nodes outside ``nodes`` keep
+    their base value.  Within a component, members not yet finished still hold
+    their base value, which the accumulator includes anyway, so no membership
+    test is needed.
+    """
+    result = list(base)
+    components = strongly_connected_components(nodes, succ)
+    count("propagate.components", len(components))
+    for component in components:
+        acc = 0
+        for v in component:
+            acc |= base[v]
+            for w in succ[v]:
+                acc |= result[w]
+        for v in component:
+            result[v] = acc
+    return result
+
+
+def compute_nullable(grammar):
+    """bytearray with 1 for every symbol that derives the empty string.
+
+    Counting worklist: each production tracks how many of its nonterminals are
+    not yet known to be nullable and fires when that count reaches zero.
+    """
+    T = grammar.n_terminals
+    nullable = bytearray(len(grammar.symbols))
+    occurrences = [[] for _ in grammar.symbols]
+    pending = []
+    work = []
+    for p, (A, rhs) in enumerate(grammar.productions):
+        left = 0
+        for X in rhs:
+            if X < T:
+                left = -1             # contains a terminal, can never vanish
+                break
+            left += 1
+        pending.append(left)
+        if left == 0:
+            work.append(A)
+        elif left > 0:
+            for X in rhs:
+                occurrences[X].append(p)
+    productions = grammar.productions
+    pops = 0
+    while work:
+        A = work.pop()
+        pops += 1
+        if nullable[A]:
+            continue
+        nullable[A] = 1
+        for p in occurrences[A]:
+            pending[p] -= 1
+            if pending[p] == 0:
+                work.append(productions[p][0])
+    count("nullable.worklist_pops", pops)
+    return nullable
+
+
+@timed("first_follow")
+def analyze(grammar):
+    """FIRST, FOLLOW and NULLABLE of an interned Grammar.
+
+    Returns (first, follow, nullable).  ``first`` and ``follow`` are lists of
+    terminal bitmasks indexed by symbol id (FIRST of terminal t is 1 << t);
+    ``nullable`` is a bytearray.  Epsilon is never a bit: use ``nullable``.
+    """
+    T = grammar.n_terminals
+    n = len(grammar.symbols)
+    nonterminals = grammar.nonterminals
+    nullable = compute_nullable(grammar)
+
+    first_base = [1 << X if X < T else 0 for X in range(n)]
+    first_succ = [[] for _ in range(n)]
+    follow_base = [0] * n
+    follow_succ = [[] for _ in range(n)]
+    follow_from_first = []            # (B, C): FOLLOW(B) includes FIRST(C)
+
+    for A, rhs in grammar.productions:
+        # FIRST(A) gets the leading symbols up to the first non-nullable one
+        for X in rhs:
+            if X < T:
+                first_base[A] |= 1 << X
+                break
+            first_succ[A].append(X)
+            if not nullable[X]:
+                break
+        # FOLLOW(B) gets FIRST of whatever can come right after B
+        for i, B in enumerate(rhs):
+            if B < T:
+                continue
+            for X in rhs[i + 1:]:
+                if X < T:
+                    follow_base[B] |= 1 << X
+                    break
+                follow_from_first.append((B, X))
+                if not nullable[X]:
+                    break
+            else:
+                if B != A:
+                    follow_succ[B].append(A)
+
+    first = propagate(nonterminals, first_succ, first_base)
+    for B, C in follow_from_first:
+        follow_base[B] |= first[C]
+    if grammar.start is not None:
+        follow_base[grammar.start] |= 1 << grammar.ids[grammar.end]
+    follow = propagate(nonterminals, follow_succ, follow_base)
+    return first, follow, nullable
+
+
+def sequence_first(symbols, first, nullable):
+    """FIRST bitmask of a sequence of symbol ids, and whether it can vanish."""
+    mask = 0
+    for X in symbols:
+        mask |= first[X]
+        if not nullable[X]:
+            return mask, False
+    return mask, True
+
+
+def first_follow(rules, start=None, epsilon="ε", end="$"):
+    """Compute FIRST, FOLLOW and NULLABLE for a {A: [alternatives]} grammar.
+
+    Returns (first, follow, nullable) keyed by nonterminal name.  FIRST(A)
+    contains ``epsilon`` when A is nullable, FOLLOW(start) contains ``end``.
+    ``start`` defaults to the first nonterminal of ``rules``.
+    """
+    grammar = Grammar(rules, start, epsilon, end)
+    first, follow, nullable = analyze(grammar)
+    first_sets, follow_sets, nullable_set = {}, {}, set()
+    for A in grammar.nonterminals:
+        name = grammar.symbols[A]
+        first_sets[name] = grammar.names(first[A])
+        follow_sets[name] = grammar.names(follow[A])
+        if nullable[A]:
+            first_sets[name].add(epsilon)
+            nullable_set.add(name)
+    return first_sets, follow_sets, nullable_set
+
+
+def first_of_sequence(symbols, first, epsilon="ε"):
+    """FIRST of a string of symbol names, with ``epsilon`` included if it can vanish."""
+    result = set()
+    for symbol in symbols:
+        if symbol == epsilon:
+            continue
+        if symbol not in first:
+            result.add(symbol)
+            return result
+        result |= first[symbol] - {epsilon}
+        if epsilon not in first[symbol]:
+            return result
+    result.add(epsilon)
+    return result
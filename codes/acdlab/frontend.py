@@ -0,0 +1,201 @@
+# Expression front end: "x = (a + b) * -c" statements to quadruples.
+#
+# The operators and their precedence are those of "All exps/parser.y":
+#
+#   %left '+' '-'
+#   %left '*' '/'
+#   %right UMINUS
+#
+# with parentheses, numbers and variable names as operands.  The parser is
+# precedence climbing: a loop per precedence level instead of a rule per
+# level, so a long chain a + b + c + ... costs no recursion at all.
+#
+# The tree is lowered with Sethi-Ullman numbering.  A leaf needs no
+# temporary (it is an operand of its parent); an operator node needs
+# max(l, r) temporaries when its operands need l != r, and l + 1 when they
+# need the same.  Evaluating the operand that needs more first, into the
+# lowest free temporary, makes every statement use no more temporaries than
+# its label, and the root's result goes straight to the assigned variable.
+# Temporaries are named _t1, _t2, ...; variable names cannot start with an
+# underscore, so they never clash, and the same ones are reused by every
+# statement.
+#
+# translate_lines() reads any iterable of lines (an open file) and yields the
+# quadruples of each statement before reading the next: time is linear in the
+# input and memory is bounded by the longest statement.
+
+import re
+
+# Binary operators are all left associative; unary minus binds tighter
+BINARY = {"+": 1, "-": 1, "*": 2, "/": 2}
+
+_TOKEN = re.compile(r"\s*(?:(\d+\.?\d*|\.\d+)|([A-Za-z]\w*)|(\S))")
+_REGISTER = re.compile(r"R\d+$")           # reserved for the target code
+
+
+class ExpressionError(ValueError):
+    """A statement that does not parse; ``column`` counts from 1."""
+
+    def __init__(self, message, column):
+        super().__init__(f"column {column}: {message}")
+        self.message = message
+        self.column = column
+
+
+def tokenize(text):
+    """(kind, value, column) triples: kind is "number", "name" or the character itself."""
+    tokens = []
+    for match in _TOKEN.finditer(text):
+        number, name, char = match.groups()
+        if number is not None:
+            value = float(number) if "." in number else int(number)
+            tokens.append(("number", value, match.start(1) + 1))
+        elif name is not None:
+            if _REGISTER.match(name):
+                raise ExpressionError(f"{name} is the name of a register", match.start(2) + 1)
+            tokens.append(("name", name, match.start(2) + 1))
+        elif char is not None:
+            if char not in BINARY and char not in "()=":
+                raise ExpressionError(f"Unsupported operation: {char}", match.start(3) + 1)
+            tokens.append((char, char, match.start(3) + 1))
+    return tokens
+
+
+def _leaf(operand):
+    return (0, operand)
+
+
+def _node(op, left, right):
+    l, r = left[0], right[0]
+    return (l + 1 if l == r else max(l, r), op, left, right)
+
+
+class _Parser:
+
+    def __init__(self, tokens, end):
+        self.tokens = tokens
+        self.pos = 0
+        self.end = end               # column just past the statement
+
+    def peek(self):
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else None
+
+    def fail(self, expected):
+        if self.pos < len(self.tokens):
+            kind, value, column = self.tokens[self.pos]
+            raise ExpressionError(f"expected {expected}, found {value!r}", column)
+        raise ExpressionError(f"expected {expected} at the end", self.end)
+
+    def expression(self, level=1):
+        left = self.unary()
+        while self.peek() in BINARY and BINARY[self.peek()] >= level:
+            op = self.tokens[self.pos][0]
+            self.pos += 1
+            left = _node(op, left, self.expression(BINARY[op] + 1))
+        return left
+
+    def unary(self):
+        kind = self.peek()
+        if kind == "-":
+            self.pos += 1
+            operand = self.unary()
+            if len(operand) == 2 and not isinstance(operand[1], str):
+                return _leaf(-operand[1])
+            return _node("-", _leaf(0), operand)
+        if kind == "(":
+            self.pos += 1
+            inner = self.expression()
+            if self.peek() != ")":
+                self.fail("')'")
+            self.pos += 1
+            return inner
+        if kind in ("number", "name"):
+            self.pos += 1
+            return _leaf(self.tokens[self.pos - 1][1])
+        self.fail("an operand")
+
+
+def parse_statement(text):
+    """(variable, tree) of "variable = expression".
+
+    A tree is (0, operand) for a name or number and (label, op, left, right)
+    otherwise, label being its Sethi-Ullman number; -x is 0 - x.
+    """
+    tokens = tokenize(text)
+    parser = _Parser(tokens, len(text.rstrip()) + 1)
+    if parser.peek() != "name":
+        parser.fail("a variable")
+    name = tokens[0][1]
+    parser.pos = 1
+    if parser.peek() != "=":
+        parser.fail("'='")
+    parser.pos = 2
+    try:
+        tree = parser.expression()
+    except RecursionError:
+        raise ExpressionError("expression nested too deeply", 1) from None
+    if parser.pos < len(tokens):
+        parser.fail("an operator")
+    return name, tree
+
+
+def lower(name, tree):
+    """Quadruples computing ``tree`` into ``name`` with tree[0] temporaries at most."""
+    if len(tree) == 2:
+        return [("=", name, tree[1], None)]
+    quads = []
+    results = []
+    work = [(tree, 0, name)]
+    while work:
+        item = work.pop()
+        if item[0] is None:
+            _, op, target, swapped = item
+            second = results.pop()
+            first = results.pop()
+            a, b = (second, first) if swapped else (first, second)
+            quads.append((op, target, a, b))
+            results.append(target)
+            continue
+        node, base, target = item
+        if len(node) == 2:
+            results.append(node[1])
+            continue
+        _, op, left, right = node
+        swapped = right[0] > left[0]
+        first, second = (right, left) if swapped else (left, right)
+        work.append((None, op, target or f"_t{base + 1}", swapped))
+        work.append((second, base + 1 if first[0] else base, None))
+        work.append((first, base, None))
+    return quads
+
+
+def translate(statement):
+    """Quadruples of one statement; raises ExpressionError."""
+    return lower(*parse_statement(statement))
+
+
+def is_temporary(name):
+    return name.startswith("_t")
+
+
+def translate_lines(lines, errors=None):
+    """Quadruples of every statement in ``lines``, one statement at a time.
+
+    Blank lines are skipped.  A statement that does not parse produces no
+    code and a message that goes to ``errors`` if it is a list, otherwise it
+    is printed, like generate_tac() does.
+    """
+    report = print if errors is None else errors.append
+    for line in lines:
+        statement = line.strip()
+        if not statement:
+            continue
+        try:
+            quads = translate(statement)
+        except ExpressionError as error:
+            if error.message.startswith("Unsupported operation"):
+                report(error.message)
+            else:
+                report(f"Invalid statement format: {statement} ({error})")
+            continue
+        yield from quads
@@ -0,0 +1,164 @@
+# Interned grammar representation.
+#
+# Every symbol is numbered once when the grammar is built.  Terminals come
+# first, starting with the end marker at id 0, and nonterminals follow, so
+# "is X a nonterminal" is the integer test X >= n_terminals instead of
+# X.isupper() or a dict lookup.  Because terminals are 0..n_terminals-1, a set
+# of terminals is just an int with bit t set for terminal t: union, difference
+# and subset tests are single big-int operations (a, a | b, a & ~b, a & ~b == 0).
+
+from itertools import compress
+
+# bin(mask) reversed, with '0'/'1' turned into 0/1 bytes, is a selector for compress()
+_BIT_BYTES = str.maketrans("01", "\x00\x01")
+
+
+def iter_bits(mask):
+    """Yield the positions of the set bits of ``mask``, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def bit_names(symbols, mask):
+    """Set of ``symbols[t]`` for every bit t set in ``mask``."""
+    return set(compress(symbols, bin(mask)[:1:-1].translate(_BIT_BYTES).encode()))
+
+
+class Grammar:
+    """A context-free grammar with integer symbols.
+
+    ``rules`` maps each nonterminal to its alternatives, each a sequence of
+    symbols, exactly like the dicts the lab scripts build.  The first key is
+    the start symbol unless ``start`` is given.  Occurrences of ``epsilon`` are
+    dropped, so an epsilon alternative becomes an empty right-hand side.
+    """
+
+    def __init__(self, rules, start=None, epsilon="ε", end="$"):
+        self.epsilon = epsilon
+        self.end = end
+        nonterminals = list(rules)
+        terminals = [end]
+        seen = {end}
+        for alternatives in rules.values():
+            for alt in alternatives:
+                for symbol in alt:
+                    if symbol not in seen and symbol not in rules and symbol != epsilon:
+                        seen.add(symbol)
+                        terminals.append(symbol)
+
+        self.symbols = terminals + nonterminals
+        self.ids = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.n_terminals = len(terminals)
+        if start is None:
+            start = nonterminals[0] if nonterminals else None
+        self.start = self.ids[start] if start is not None else None
+
+        ids = self.ids
+        self.productions = []       # (lhs, rhs) with rhs a tuple of symbol ids
+        self.by_lhs = [[] for _ in self.symbols]
+        for A, alternatives in rules.items():
+            a = ids[A]
+            for alt in alternatives:
+                rhs = tuple(ids[symbol] for symbol in alt if symbol != epsilon)
+                self.by_lhs[a].append(len(self.productions))
+                self.productions.append((a, rhs))
+
+    @classmethod
+    def from_interned(cls, names, rules, start=None, epsilon="ε", end="$"):
+        """Grammar from numbered symbols, without a dict of names in between.
+
+        ``names[i]`` is the name of symbol i and ``rules`` maps the number of
+        every nonterminal to its alternatives, tuples of symbol numbers without
+        epsilon.  The result equals Grammar() of the same rules spelled out.
+        """
+        grammar = cls.__new__(cls)
+        grammar.epsilon = epsilon
+        grammar.end = end
+        remap = [None] * len(names)
+        terminals = [end]
+        for X, name in enumerate(names):
+            if name == end:
+                remap[X] = 0
+        for alternatives in rules.values():
+            for rhs in alternatives:
+                for X in rhs:
+                    if remap[X] is None and X not in rules:
+                        remap[X] = len(terminals)
+                        terminals.append(names[X])
+        n_terminals = len(terminals)
+        for i, A in enumerate(rules):
+            remap[A] = n_terminals + i
+
+        grammar.symbols = terminals + [names[A] for A in rules]
+        grammar.ids = {symbol: i for i, symbol in enumerate(grammar.symbols)}
+        grammar.n_terminals = n_terminals
+        if start is None:
+            start = grammar.symbols[n_terminals] if rules else None
+        grammar.start = grammar.ids[start] if start is not None else None
+        grammar.productions = []
+        grammar.by_lhs = [[] for _ in grammar.symbols]
+        for A, alternatives in rules.items():
+            a = remap[A]
+            for rhs in alternatives:
+                grammar.by_lhs[a].append(len(grammar.productions))
+                grammar.productions.append((a, tuple(remap[X] for X in rhs)))
+        return grammar
+
+    @property
+    def nonterminals(self):
+        return range(self.n_terminals, len(self.symbols))
+
+    @property
+    def terminals(self):
+        return range(self.n_terminals)
+
+    def is_terminal(self, symbol):
+        return symbol < self.n_terminals
+
+    def names(self, mask):
+        """Terminal bitmask -> set of terminal names."""
+        return bit_names(self.symbols, mask)
+
+    def mask(self, names):
+        """Iterable of terminal names -> terminal bitmask."""
+        ids = self.ids
+        mask = 0
+        for name in names:
+            mask |= 1 << ids[name]
+        return mask
+
+    def production_str(self, p):
+        lhs, rhs = self.productions[p]
+        symbols = self.symbols
+        body = " ".join(symbols[X] for X in rhs) or self.epsilon
+        return f"{symbols[lhs]} -> {body}"
+
+    def augmented(self):
+        """Copy of the grammar with a fresh start symbol S' and the single rule S' -> S.
+
+        LR automata are built on the augmented grammar; a grammar whose start
+        symbol already has exactly one alternative made of one nonterminal
+        that appears on no right-hand side (like the "S' -> S" of
+        slrtableshort.py) is returned unchanged.
+        """
+        start_rules = self.by_lhs[self.start]
+        if len(start_rules) == 1:
+            rhs = self.productions[start_rules[0]][1]
+            if (len(rhs) == 1 and rhs[0] >= self.n_terminals
+                    and not any(self.start in body for _, body in self.productions)):
+                return self
+        name = self.symbols[self.start] + "'"
+        while name in self.ids:
+            name += "'"
+        rules = {name: [[self.symbols[self.start]]]}
+        rules.update(self.to_rules())
+        return Grammar(rules, name, self.epsilon, self.end)
+
+    def to_rules(self):
+        """Back to the {A: [[x, y], ...]} dict form, epsilon alternatives as [epsilon]."""
+        symbols = self.symbols
+        return {symbols[A]: [[symbols[X] for X in self.productions[p][1]] or [self.epsilon]
+                             for p in self.by_lhs[A]]
+                for A in self.nonterminals}
@@ -0,0 +1,371 @@
+# Incremental FIRST/FOLLOW/NULLABLE and LL(1) rows under production edits.
+#
+# A session keeps the grammar by name together with an occurrence index
+# (symbol -> nonterminals whose alternatives mention it) and the current
+# bitmask values.  An edit replaces the alternatives of one nonterminal and
+# then recomputes, in order:
+#
+#   NULLABLE  for the edited nonterminal and everything whose nullability can
+#             depend on it (alternatives made only of nonterminals),
+#   FIRST     for the edited nonterminal, the nonterminals whose nullability
+#             changed, and everything that can see them at a FIRST position,
+#   FOLLOW    for the nonterminals occurring in the old or new alternatives or
+#             next to a symbol whose FIRST or NULLABLE changed, and everything
+#             their FOLLOW flows into,
+#   LL(1)     the rows of the edited nonterminal and of every nonterminal whose
+#             FOLLOW changed or whose alternatives mention a changed symbol.
+#
+# Each region is reset and solved to its least fixed point with the values
+# outside it held fixed.  Resetting (rather than only propagating the
+# difference) is what keeps removals correct on recursive rules, where a
+# stale set could otherwise keep supporting itself around a cycle.
+#
+# Symbols follow the lab scripts' rule: a symbol is a nonterminal exactly when
+# it has a rule, so adding the first rule for a symbol or removing its last
+# one also changes what every alternative mentioning it means.  Terminals get
+# their bit the first time they are seen and keep it.
+
+from .firstfollow import analyze
+from .grammar import Grammar, bit_names, iter_bits
+
+
+class AnalysisSession:
+    """Editable grammar with FIRST/FOLLOW/NULLABLE and LL(1) rows kept up to date.
+
+    Every edit returns a report of what changed (see ``set_rule``).
+    """
+
+    def __init__(self, rules, start=None, epsilon="ε", end="$"):
+        self.epsilon = epsilon
+        self.end = end
+        self.rules = {A: [tuple(s for s in alt if s != epsilon) for alt in alts]
+                      for A, alts in rules.items()}
+        self.start = start if start is not None else next(iter(self.rules), None)
+
+        grammar = Grammar(self.rules, self.start, epsilon, end)
+        first, follow, nullable = analyze(grammar)
+        T = grammar.n_terminals
+        self.terminals = grammar.symbols[:T]
+        self.tid = {name: t for t, name in enumerate(self.terminals)}
+        self._first, self._follow, self._nullable = {}, {}, {}
+        for A in grammar.nonterminals:
+            name = grammar.symbols[A]
+            self._first[name] = first[A]
+            self._follow[name] = follow[A]
+            self._nullable[name] = bool(nullable[A])
+
+        self._occ = {}               # symbol -> {nonterminal: occurrences}
+        for A, alts in self.rules.items():
+            self._index(A, alts, 1)
+        self._rows = {}
+        self.conflicts = {}          # nonterminal -> {terminal id: [alternative indices]}
+        for A in self.rules:
+            self._rows[A], self.conflicts[A] = self._row(A)
+
+    # Values
+
+    def _terminal(self, X):
+        t = self.tid.get(X)
+        if t is None:
+            t = self.tid[X] = len(self.terminals)
+            self.terminals.append(X)
+        return t
+
+    def _sym_first(self, X):
+        if X in self.rules:
+            return self._first[X]
+        return 1 << self._terminal(X)
+
+    def _sym_nullable(self, X):
+        return X in self.rules and self._nullable[X]
+
+    def _sequence(self, symbols):
+        mask = 0
+        for X in symbols:
+            mask |= self._sym_first(X)
+            if not self._sym_nullable(X):
+                return mask, False
+        return mask, True
+
+    def first(self, A):
+        """FIRST(A) as names, with epsilon if A is nullable."""
+        names = bit_names(self.terminals, self._first[A])
+        if self._nullable[A]:
+            names.add(self.epsilon)
+        return names
+
+    def follow(self, A):
+        return bit_names(self.terminals, self._follow[A])
+
+    def nullable(self, A):
+        return self._nullable[A]
+
+    def first_follow(self):
+        """(first, follow, nullable) in the format of firstfollow.first_follow()."""
+        first = {A: self.first(A) for A in self.rules}
+        follow = {A: self.follow(A) for A in self.rules}
+        return first, follow, {A for A in self.rules if self._nullable[A]}
+
+    def ll1_row(self, A):
+        """{terminal: alternative} of A's LL(1) row, a later alternative winning a cell."""
+        alts = self.rules[A]
+        return {self.terminals[t]: " ".join(alts[i]) or self.epsilon
+                for t, i in sorted(self._rows[A].items())}
+
+    def to_rules(self):
+        return {A: [list(alt) or [self.epsilon] for alt in alts] for A, alts in self.rules.items()}
+
+    # Edits
+
+    def add_production(self, A, alt):
+        return self.set_rule(A, self.rules.get(A, []) + [tuple(alt)])
+
+    def remove_production(self, A, alt):
+        alts = list(self.rules[A])
+        alts.remove(tuple(s for s in alt if s != self.epsilon))
+        return self.set_rule(A, alts)
+
+    def replace_production(self, A, old, new):
+        alts = list(self.rules[A])
+        alts[alts.index(tuple(s for s in old if s != self.epsilon))] = tuple(new)
+        return self.set_rule(A, alts)
+
+    def edit_line(self, rule):
+        """set_rule() from an "A -> x y | z" string, as typed in the GUIs."""
+        lhs, rhs = rule.split("->", 1)
+        return self.set_rule(lhs.strip(), [alt.split() for alt in rhs.split("|")])
+
+    def set_rule(self, A, alternatives):
+        """Replace all alternatives of A (an empty list removes the rule).
+
+        Returns {"first": {B: (old, new)}, "follow": {B: (old, new)},
+        "nullable": {B: new}, "ll1_rows": {B: row or None}, "recomputed":
+        {"nullable": n, "first": n, "follow": n, "ll1_rows": n}}, with sets
+        of names and only the entries that actually changed (A's own row is
+        always reported).  "recomputed" gives the size of every region that
+        was solved again.
+        """
+        alternatives = [tuple(s for s in alt if s != self.epsilon) for alt in alternatives]
+        old_alts = self.rules.get(A, [])
+        was_rule = A in self.rules
+        old_first = {}
+        old_follow = {}
+        if was_rule:
+            self._index(A, old_alts, -1)
+            old_first[A] = self._first[A]
+            old_follow[A] = self._follow[A]
+        status_changed = set()
+        if alternatives:
+            self.rules[A] = alternatives
+            self._index(A, alternatives, 1)
+            if not was_rule:
+                status_changed.add(A)
+                self._first[A] = 0
+                self._follow[A] = 0
+                self._nullable[A] = False
+        elif was_rule:
+            del self.rules[A]
+            status_changed.add(A)
+            null_before = self._nullable.pop(A)
+            del self._first[A], self._follow[A], self._rows[A], self.conflicts[A]
+
+        # NULLABLE
+        seeds = {A} if alternatives else set()
+        for X in status_changed:
+            seeds.update(self._occ.get(X, ()))
+        null_changed, null_old = self._update_nullable(seeds)
+        if was_rule and not alternatives:
+            null_old[A] = null_before
+        null_changed |= status_changed
+
+        # FIRST
+        seeds = ({A} if alternatives else set()) | (null_changed & self.rules.keys())
+        for X in null_changed:
+            seeds.update(B for B in self._occ.get(X, ()) if self._first_position(B, X, null_old))
+        for X in status_changed:
+            seeds.update(self._occ.get(X, ()))
+        first_changed, first_old = self._update_first(seeds, null_old)
+        first_old.update(old_first)
+        touched = first_changed | null_changed
+
+        # FOLLOW
+        seeds = set()
+        for alt in old_alts + alternatives:
+            seeds.update(X for X in alt if X in self.rules)
+        for X in touched:
+            for B in self._occ.get(X, ()):
+                for alt in self.rules[B]:
+                    if X in alt:
+                        seeds.update(Y for Y in alt if Y in self.rules)
+        if status_changed & self.rules.keys():
+            seeds.update(status_changed & self.rules.keys())
+        follow_changed, follow_old = self._update_follow(seeds)
+        follow_old.update(old_follow)
+
+        # LL(1) rows
+        rows = set(follow_changed)
+        if alternatives:
+            rows.add(A)
+        for X in touched:
+            rows.update(self._occ.get(X, ()))
+        ll1_rows = {}
+        for B in rows:
+            row, conflicts = self._row(B)
+            self.conflicts[B] = conflicts
+            if row != self._rows.get(B) or B == A:
+                self._rows[B] = row
+                ll1_rows[B] = self.ll1_row(B)
+        if was_rule and not alternatives:
+            ll1_rows[A] = None
+
+        names = self.terminals
+        return {
+            "first": {B: (bit_names(names, first_old.get(B, 0)), bit_names(names, self._first.get(B, 0)))
+                      for B in sorted(first_changed | status_changed)},
+            "follow": {B: (bit_names(names, follow_old.get(B, 0)), bit_names(names, self._follow[B]))
+                       for B in sorted(follow_changed)},
+            "nullable": {B: self._nullable.get(B, False) for B in sorted(null_changed)},
+            "ll1_rows": ll1_rows,
+            "recomputed": {"nullable": self._last_sizes[0], "first": self._last_sizes[1],
+                           "follow": self._last_sizes[2], "ll1_rows": len(rows)},
+        }
+
+    # Internals
+
+    def _index(self, A, alts, delta):
+        occ = self._occ
+        for alt in alts:
+            for X in set(alt):
+                counts = occ.setdefault(X, {})
+                n = counts.get(A, 0) + delta
+                if n:
+                    counts[A] = n
+                else:
+                    del counts[A]
+
+    def _first_position(self, B, X, null_old):
+        # X can start a FIRST contribution of B under the old or new NULLABLE
+        for alt in self.rules[B]:
+            for Y in alt:
+                if Y == X:
+                    return True
+                if not (self._sym_nullable(Y) or null_old.get(Y, False)):
+                    break
+        return False
+
+    def _update_nullable(self, seeds):
+        rules = self.rules
+        region = set()
+        stack = [X for X in seeds if X in rules]
+        while stack:
+            Y = stack.pop()
+            if Y in region:
+                continue
+            region.add(Y)
+            for B in self._occ.get(Y, ()):
+                if B not in region and any(Y in alt and all(Z in rules for Z in alt)
+                                           for alt in rules[B]):
+                    stack.append(B)
+        old = {B: self._nullable[B] for B in region}
+        for B in region:
+            self._nullable[B] = False
+        changed = True
+        while changed:
+            changed = False
+            for B in region:
+                if not self._nullable[B] and any(all(self._sym_nullable(Z) for Z in alt)
+                                                 for alt in rules[B]):
+                    self._nullable[B] = True
+                    changed = True
+        self._last_sizes = [len(region)]
+        return {B for B in region if old[B] != self._nullable[B]}, old
+
+    def _update_first(self, seeds, null_old):
+        rules = self.rules
+        region = set()
+        stack = [X for X in seeds if X in rules]
+        while stack:
+            Y = stack.pop()
+            if Y in region:
+                continue
+            region.add(Y)
+            for B in self._occ.get(Y, ()):
+                if B not in region and self._first_position(B, Y, null_old):
+                    stack.append(B)
+        old = {B: self._first[B] for B in region}
+        for B in region:
+            self._first[B] = 0
+        changed = True
+        while changed:
+            changed = False
+            for B in region:
+                mask = self._first[B]
+                for alt in rules[B]:
+                    mask |= self._sequence(alt)[0]
+                if mask != self._first[B]:
+                    self._first[B] = mask
+                    changed = True
+        self._last_sizes.append(len(region))
+        return {B for B in region if old[B] != self._first[B]}, old
+
+    def _update_follow(self, seeds):
+        rules = self.rules
+        # FOLLOW(B) includes FOLLOW(A) for A -> ... B (nullable): region grows along A -> B
+        region = set()
+        stack = [X for X in seeds if X in rules]
+        while stack:
+            A = stack.pop()
+            if A in region:
+                continue
+            region.add(A)
+            for alt in rules[A]:
+                for i in range(len(alt) - 1, -1, -1):
+                    X = alt[i]
+                    if X in rules and X not in region:
+                        stack.append(X)
+                    if not self._sym_nullable(X):
+                        break
+        # direct part and FOLLOW dependencies of every B in the region
+        direct = {}
+        deps = {}
+        end_bit = 1 << self.tid[self.end]
+        for B in region:
+            mask = end_bit if B == self.start else 0
+            sources = set()
+            for A in self._occ.get(B, ()):
+                for alt in rules[A]:
+                    for i, X in enumerate(alt):
+                        if X == B:
+                            rest, vanishes = self._sequence(alt[i + 1:])
+                            mask |= rest
+                            if vanishes and A != B:
+                                sources.add(A)
+            direct[B] = mask
+            deps[B] = sources
+        old = {B: self._follow[B] for B in region}
+        for B in region:
+            self._follow[B] = direct[B]
+        changed = True
+        while changed:
+            changed = False
+            for B in region:
+                mask = self._follow[B]
+                for A in deps[B]:
+                    mask |= self._follow[A]
+                if mask != self._follow[B]:
+                    self._follow[B] = mask
+                    changed = True
+        self._last_sizes.append(len(region))
+        return {B for B in region if old[B] != self._follow[B]}, old
+
+    def _row(self, A):
+        cells = {}
+        follow = self._follow[A]
+        for i, alt in enumerate(self.rules[A]):
+            mask, vanishes = self._sequence(alt)
+            if vanishes:
+                mask |= follow
+            for t in iter_bits(mask):
+                cells.setdefault(t, []).append(i)
+        row = {t: alts[-1] for t, alts in cells.items()}
+        return row, {t: alts for t, alts in cells.items() if len(alts) > 1}
@@ -0,0 +1,188 @@
+# Streaming reader for the JFLAP 7 .jff files of "All exps".
+#
+# A .jff file is XML: <structure><type>fa</type><automaton> holding <state>
+# elements (id and name attributes, <initial/> and <final/> children) and
+# <transition> elements (<from>, <to>, <read>), or <type>re</type> with a
+# single <expression>.  ElementTree.iterparse() hands over every state and
+# transition as soon as its end tag is read, and the <automaton> element is
+# emptied right after, so the XML tree never grows beyond one element: memory
+# goes to the NFA being built, not to the document.
+#
+# JFLAP writes an empty <read/> for a lambda (epsilon) move and lets a
+# transition read a whole string; such a transition becomes a chain through
+# new unnamed states, one symbol per step.
+#
+# write_jff() goes the other way for an NFA or a DFA, in the layout JFLAP 7
+# writes itself, with the states on a grid so JFLAP opens the file readable.
+
+import os
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape, quoteattr
+
+from .automata import NFA
+from .grammar import iter_bits
+
+
+class JffError(ValueError):
+    """A .jff file that cannot be read as the automaton asked for."""
+
+    def __init__(self, path, message):
+        self.path = path
+        super().__init__(f"{path}: {message}" if path else message)
+
+
+class JffFile:
+    """What a .jff file holds: ``type`` ("fa", "re", ...), and the NFA for
+    "fa" (``automaton``) or the expression string for "re" (``expression``)."""
+
+    def __init__(self, path, type, automaton=None, expression=None):
+        self.path = path
+        self.type = type
+        self.automaton = automaton
+        self.expression = expression
+
+
+def read_jff(source):
+    """Parse a .jff file (a path or a binary file object) into a JffFile."""
+    path = source if isinstance(source, (str, os.PathLike)) else getattr(source, "name", None)
+    nfa = NFA()
+    states = {}                      # JFLAP id -> NFA state
+    named = set()
+    initial = []
+    kind = None
+    expression = None
+    parent = None
+    try:
+        for event, element in ET.iterparse(source, events=("start", "end")):
+            tag = element.tag
+            if event == "start":
+                if tag == "automaton":
+                    parent = element
+                continue
+            if tag == "type":
+                kind = (element.text or "").strip()
+            elif tag == "expression":
+                expression = (element.text or "").strip()
+            elif tag == "state":
+                jid = element.get("id")
+                s = _state(nfa, states, jid)
+                if jid in named:
+                    raise JffError(path, f"state id {jid} defined twice")
+                named.add(jid)
+                nfa.names[s] = element.get("name") or f"q{jid}"
+                if element.find("initial") is not None:
+                    initial.append(s)
+                if element.find("final") is not None:
+                    nfa.accepting |= 1 << s
+            elif tag == "transition":
+                p = _state(nfa, states, _text(element, "from", path))
+                q = _state(nfa, states, _text(element, "to", path))
+                read = element.findtext("read") or ""
+                read = read.strip("\r\n")
+                while len(read) > 1:
+                    r = nfa.add_state(name="")
+                    nfa.add_transition(p, read[0], r)
+                    p, read = r, read[1:]
+                nfa.add_transition(p, read, q)
+            else:
+                continue
+            if parent is not None and tag in ("state", "transition"):
+                parent.clear()
+    except ET.ParseError as error:
+        raise JffError(path, f"not a JFLAP file ({error})") from None
+
+    if kind is None:
+        raise JffError(path, "no <type>")
+    if kind != "fa":
+        return JffFile(path, kind, expression=expression)
+    missing = set(states) - named
+    if missing:
+        raise JffError(path, f"transition to undefined state {sorted(missing)[0]}")
+    if len(initial) != 1:
+        raise JffError(path, "no initial state" if not initial else "several initial states")
+    nfa.start = initial[0]
+    for s, name in enumerate(nfa.names):
+        if name == "":
+            nfa.names[s] = f"_{s}"
+    return JffFile(path, kind, automaton=nfa)
+
+
+def _state(nfa, states, jid):
+    s = states.get(jid)
+    if s is None:
+        s = states[jid] = nfa.add_state()
+    return s
+
+
+def _text(element, tag, path):
+    text = element.findtext(tag)
+    if text is None:
+        raise JffError(path, f"<transition> without <{tag}>")
+    return text.strip()
+
+
+def load_automaton(path):
+    """The NFA of a "fa" .jff file; raises JffError for anything else."""
+    loaded = read_jff(path)
+    if loaded.automaton is None:
+        raise JffError(path, f"holds a {loaded.type!r} structure, not a finite automaton")
+    return loaded.automaton
+
+
+def jff_files(paths):
+    """The .jff files among ``paths``, directories searched recursively in sorted order."""
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, subdirectories, files in os.walk(path):
+                subdirectories.sort()
+                for name in sorted(files):
+                    if name.endswith(".jff"):
+                        yield os.path.join(directory, name)
+        else:
+            yield path
+
+
+def write_jff(automaton, destination, columns=8):
+    """Write an NFA or DFA as a JFLAP "fa" file (a path or a text file object).
+
+    Epsilon moves become an empty <read/>; the states are placed on a grid
+    ``columns`` wide, in state order.
+    """
+    if isinstance(destination, (str, os.PathLike)):
+        with open(destination, "w", encoding="utf-8") as f:
+            write_jff(automaton, f, columns)
+        return
+    write = destination.write
+    write('<?xml version="1.0" encoding="UTF-8" standalone="no"?><structure>\n'
+          "\t<type>fa</type>\n\t<automaton>\n\t\t<!--The list of states.-->\n")
+    if isinstance(automaton, NFA):
+        final = [automaton.accepting >> s & 1 for s in range(len(automaton))]
+    else:
+        final = automaton.accepting
+    for s, name in enumerate(automaton.names):
+        x, y = 100 + 120 * (s % columns), 100 + 120 * (s // columns)
+        write(f"\t\t<state id=\"{s}\" name={quoteattr(name)}>\n"
+              f"\t\t\t<x>{x}.0</x>\n\t\t\t<y>{y}.0</y>\n")
+        if s == automaton.start:
+            write("\t\t\t<initial/>\n")
+        if final[s]:
+            write("\t\t\t<final/>\n")
+        write("\t\t</state>\n")
+    write("\t\t<!--The list of transitions.-->\n")
+    for p, a, q in _transitions(automaton):
+        read = f"<read>{escape(a)}</read>" if a else "<read/>"
+        write(f"\t\t<transition>\n\t\t\t<from>{p}</from>\n\t\t\t<to>{q}</to>\n"
+              f"\t\t\t{read}\n\t\t</transition>\n")
+    write("\t</automaton>\n</structure>\n")
+
+
+def _transitions(automaton):
+    if not isinstance(automaton, NFA):
+        yield from automaton.transitions()
+        return
+    for p in range(len(automaton)):
+        for a, targets in automaton.moves[p].items():
+            for q in iter_bits(targets):
+                yield p, automaton.alphabet[a], q
+        for q in iter_bits(automaton.epsilon[p]):
+            yield p, "", q
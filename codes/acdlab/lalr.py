@@ -0,0 +1,95 @@
+# LALR(1) lookaheads by DeRemer & Pennello's relations.
+#
+# Everything is defined on the nonterminal transitions (p, A) of the LR(0)
+# automaton, so the cost stays proportional to the LR(0) automaton, never to a
+# canonical LR(1) one:
+#
+#   DR(p, A)      terminals shifted right after A:  goto(p, A) --t-->
+#   (p, A) reads (r, C)       r = goto(p, A), r --C--> and C is nullable
+#   Read(p, A)    = DR(p, A) | Read(r, C) for every (p, A) reads (r, C)
+#   (p, A) includes (p', B)   B -> b A g, g nullable and p' --b--> p
+#   Follow(p, A)  = Read(p, A) | Follow(p', B) for every (p, A) includes (p', B)
+#   (q, A -> w) lookback (p, A)   p --w--> q
+#   LA(q, A -> w) = Follow(p, A) over every lookback
+#
+# Read and Follow are unions over a digraph, which is exactly what
+# firstfollow.propagate computes with one SCC pass each.
+
+from .firstfollow import compute_nullable, propagate
+from .profiling import count, timed
+
+
+@timed("lalr_lookaheads")
+def lalr_lookaheads(automaton):
+    """LALR(1) lookahead bitmasks, aligned with ``automaton.reductions``.
+
+    Returns a list with, for every state, one terminal mask per production in
+    ``automaton.reductions[state]``.
+    """
+    grammar = automaton.grammar
+    T = grammar.n_terminals
+    transitions = automaton.transitions
+    nullable = compute_nullable(grammar)
+
+    # Number the nonterminal transitions
+    edge_index = {}                  # (state, nonterminal) -> node
+    edges = []
+    for p, out in enumerate(transitions):
+        for X, q in out.items():
+            if X >= T:
+                edge_index[p, X] = len(edges)
+                edges.append((p, X, q))
+
+    # Direct reads and the reads relation
+    direct = [0] * len(edges)
+    reads = [[] for _ in edges]
+    for node, (p, A, q) in enumerate(edges):
+        mask = 0
+        for X, r in transitions[q].items():
+            if X < T:
+                mask |= 1 << X
+            elif nullable[X]:
+                reads[node].append(edge_index[q, X])
+        direct[node] = mask
+    # The end marker follows the start symbol: S' -> . S in state 0
+    end = 1 << grammar.ids[grammar.end]
+    (start_production,) = grammar.by_lhs[grammar.start]
+    for S in grammar.productions[start_production][1]:
+        direct[edge_index[0, S]] |= end
+
+    count("lalr.nonterminal_transitions", len(edges))
+    nodes = range(len(edges))
+    read = propagate(nodes, reads, direct)
+
+    # includes and lookback, walking every production from every A-transition
+    includes = [[] for _ in edges]
+    lookback = {}                    # (state, production) -> [nodes]
+    productions = grammar.productions
+    for node, (p, B, _) in enumerate(edges):
+        for prod in grammar.by_lhs[B]:
+            rhs = productions[prod][1]
+            # nullable_tail[i]: rhs[i + 1:] derives epsilon
+            tail = True
+            nullable_tail = [False] * len(rhs)
+            for i in range(len(rhs) - 1, -1, -1):
+                nullable_tail[i] = tail
+                tail = tail and rhs[i] >= T and nullable[rhs[i]]
+            r = p
+            for i, X in enumerate(rhs):
+                if X >= T and nullable_tail[i]:
+                    includes[edge_index[r, X]].append(node)
+                r = transitions[r][X]
+            lookback.setdefault((r, prod), []).append(node)
+
+    follow = propagate(nodes, includes, read)
+
+    lookaheads = []
+    for q, reductions in enumerate(automaton.reductions):
+        row = []
+        for prod in reductions:
+            mask = 0
+            for node in lookback.get((q, prod), ()):
+                mask |= follow[node]
+            row.append(mask)
+        lookaheads.append(row)
+    return lookaheads
@@ -0,0 +1,541 @@
+# Lexer generator for flex specifications, "All exps/lexer.l" and tokens.l.
+#
+# read_spec() takes the definitions and rules sections of a .l file (the C
+# code around them is skipped).  Every pattern is parsed into the trees of
+# regex.py over sets of bytes; the bytes are then split into the classes no
+# pattern tells apart (for lexer.l the letters of int, float and char, \n,
+# and everything else), a Thompson NFA gets one branch per rule, and the
+# subset construction and minimize() give a single DFA.  A DFA state accepts
+# the first rule whose final NFA state it contains, which is flex's rule
+# priority, and minimize() never merges states accepting different rules.
+#
+# Lexer.tokens() is flex's matching loop: from the start state read bytes
+# while the DFA has a move, remember the last position where it accepted,
+# and report the rule of that longest match; a byte no rule matches is an
+# ERROR token (flex would echo it).  Tokens are (rule, start, end) offsets
+# into the input, no text is copied, and the input is translated to classes
+# a window of CHUNK bytes at a time, so an mmap of any size can be scanned.
+#
+# As in matcher.py, two things take the loop out of Python for long runs:
+# in a state that stays put on most bytes (a run of digits or blanks) the
+# end of the run is found with a compiled character class, and the bytes
+# that make a whole ignored token on their own (lexer.l's .|\n) are skipped
+# the same way from the start state, unless ignored tokens are asked for.
+
+import mmap
+import re
+from array import array
+
+from .automata import DFA, NFA, determinize, minimize
+from .grammar import iter_bits
+from .matcher import CHUNK, as_bytes, find_next, needle
+from .regex import thompson_fragment
+
+ERROR = -1                           # rule of a byte no rule matches
+_DEAD = -1
+
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "f": "\f", "v": "\v", "a": "\a", "b": "\b"}
+_POSIX = {
+    "alpha": str.isalpha, "digit": str.isdigit, "alnum": str.isalnum, "upper": str.isupper,
+    "lower": str.islower, "space": str.isspace, "xdigit": lambda c: c in "0123456789abcdefABCDEF",
+    "punct": lambda c: c.isprintable() and not c.isalnum() and not c.isspace(),
+    "blank": lambda c: c in " \t", "cntrl": lambda c: not c.isprintable(),
+    "print": str.isprintable, "graph": lambda c: c.isprintable() and c != " ",
+}
+_ANY = (1 << 256) - 1
+
+
+class LexError(ValueError):
+    """A .l file or pattern that cannot be used; ``line`` counts from 1 (0 if unknown)."""
+
+    def __init__(self, message, line=0):
+        super().__init__(f"line {line}: {message}" if line else message)
+        self.message = message
+        self.line = line
+
+
+class Rule:
+    """A rule of the rules section: ``pattern``, its C ``action`` and its ``line``.
+
+    ``ignored`` is true when the action does nothing (only braces, blanks
+    and comments), as lexer.l's { /* Ignore other characters */ }.
+    """
+
+    def __init__(self, pattern, action, line=0):
+        self.pattern = pattern
+        self.action = action
+        self.line = line
+        code = re.sub(r"/\*.*?\*/|//[^\n]*", "", action, flags=re.S)
+        self.ignored = not code.strip(" \t\r\n{};")
+
+    def __repr__(self):
+        return f"Rule({self.pattern!r}, {self.action!r}, {self.line})"
+
+
+def read_spec(text):
+    """(definitions, rules) of a flex file: {name: (pattern, line)} and a list of Rule."""
+    lines = text.splitlines()
+    definitions = {}
+    rules = []
+    section = 0
+    i = 0
+    while i < len(lines) and section < 2:
+        line = lines[i]
+        number = i + 1
+        i += 1
+        if line.startswith("%%"):
+            section += 1
+            continue
+        if line.startswith("%{"):
+            while i < len(lines) and not lines[i].startswith("%}"):
+                i += 1
+            i += 1
+            continue
+        if not line.strip() or line[0].isspace() or line.startswith("/*"):
+            continue                 # C code, comments
+        if section == 0:
+            if line.startswith(("%x", "%s", "%X", "%S")):
+                raise LexError("start conditions are not supported", number)
+            if line.startswith("%"):
+                continue             # %option and the like
+            match = re.match(r"([A-Za-z_][\w-]*)\s+(\S.*?)\s*$", line)
+            if not match:
+                raise LexError(f"bad definition {line.strip()!r}", number)
+            definitions[match.group(1)] = (match.group(2), number)
+            continue
+        if line.startswith("<"):
+            raise LexError("start conditions are not supported", number)
+        end = _pattern_end(line, number)
+        action, i = _action(lines, i, line[end:].strip(), number)
+        rules.append(Rule(line[:end], action, number))
+    # A "|" action is the action of the next rule
+    for k in range(len(rules) - 2, -1, -1):
+        if rules[k].action == "|":
+            rules[k] = Rule(rules[k].pattern, rules[k + 1].action, rules[k].line)
+    return definitions, rules
+
+
+def _pattern_end(line, number):
+    # Index of the first blank outside brackets, quotes and escapes
+    i, brackets, quoted = 0, False, False
+    while i < len(line):
+        c = line[i]
+        if c == "\\":
+            i += 2
+            continue
+        if quoted:
+            quoted = c != '"'
+        elif brackets:
+            brackets = c != "]" or line[i - 1] == "[" or line[i - 2:i] == "[^"
+        elif c == '"':
+            quoted = True
+        elif c == "[":
+            brackets = True
+        elif c in " \t":
+            return i
+        i += 1
+    if quoted or brackets:
+        raise LexError("unterminated pattern", number)
+    return len(line)
+
+
+def _action(lines, i, text, number):
+    # The action starting with ``text``: up to the matching brace if it opens one
+    if not text.startswith("{"):
+        return text, i
+    depth = 0
+    parts = []
+    state = None                     # inside '"', "'", "/*" or "//"
+    while True:
+        j = 0
+        while j < len(text):
+            c, pair = text[j], text[j:j + 2]
+            if state in ('"', "'"):
+                if c == "\\":
+                    j += 1
+                elif c == state:
+                    state = None
+            elif state == "/*":
+                if pair == "*/":
+                    state = None
+                    j += 1
+            elif pair in ("/*", "//"):
+                state = pair
+                j += 1
+            elif c in "\"'":
+                state = c
+            elif c == "{":
+                depth += 1
+            elif c == "}":
+                depth -= 1
+                if depth == 0:
+                    parts.append(text[:j + 1])
+                    return "\n".join(parts), i
+            j += 1
+        if state == "//":
+            state = None
+        parts.append(text)
+        if i >= len(lines):
+            raise LexError("action not closed", number)
+        text = lines[i]
+        i += 1
+
+
+class _PatternParser:
+
+    def __init__(self, text, definitions, line, expanding=()):
+        self.text = text
+        self.pos = 0
+        self.definitions = definitions
+        self.line = line
+        self.expanding = expanding
+
+    def fail(self, message):
+        raise LexError(f"{message} in pattern {self.text!r}", self.line)
+
+    def peek(self):
+        return self.text[self.pos] if self.pos < len(self.text) else None
+
+    def union(self):
+        items = [self.concatenation()]
+        while self.peek() == "|":
+            self.pos += 1
+            items.append(self.concatenation())
+        return items[0] if len(items) == 1 else ("union", items)
+
+    def concatenation(self):
+        items = []
+        while self.peek() is not None and self.peek() not in "|)":
+            items.append(self.repeat())
+        if not items:
+            self.fail("empty alternative")
+        return items[0] if len(items) == 1 else ("concat", items)
+
+    def repeat(self):
+        node = self.atom()
+        while True:
+            c = self.peek()
+            if c == "*":
+                node = ("repeat", node, 0, None)
+            elif c == "+":
+                node = ("repeat", node, 1, None)
+            elif c == "?":
+                node = ("repeat", node, 0, 1)
+            elif c == "{" and re.match(r"\{\d", self.text[self.pos:]):
+                match = re.match(r"\{(\d+)(,(\d*))?\}", self.text[self.pos:])
+                if not match:
+                    self.fail("bad repetition")
+                low = int(match.group(1))
+                high = low if not match.group(2) else int(match.group(3)) if match.group(3) else None
+                if high is not None and high < low:
+                    self.fail("bad repetition")
+                node = ("repeat", node, low, high)
+                self.pos += match.end() - 1
+            else:
+                return node
+            self.pos += 1
+
+    def atom(self):
+        c = self.peek()
+        self.pos += 1
+        if c == "(":
+            node = self.union()
+            if self.peek() != ")":
+                self.fail("missing ')'")
+            self.pos += 1
+            return node
+        if c == '"':
+            end = self.pos
+            chars = []
+            while end < len(self.text) and self.text[end] != '"':
+                if self.text[end] == "\\":
+                    char, end = self.escape(end + 1)
+                else:
+                    char, end = self.text[end], end + 1
+                chars.append(("set", 1 << ord(char)))
+            if end >= len(self.text):
+                self.fail("unterminated string")
+            self.pos = end + 1
+            return ("concat", chars) if chars else ("empty",)
+        if c == "[":
+            return ("set", self.char_class())
+        if c == ".":
+            return ("set", _ANY & ~(1 << 10))
+        if c == "{":
+            end = self.text.find("}", self.pos)
+            name = self.text[self.pos:end] if end > 0 else ""
+            if name not in self.definitions:
+                self.fail(f"undefined definition {{{name}}}")
+            if name in self.expanding:
+                self.fail(f"definition {{{name}}} refers to itself")
+            self.pos = end + 1
+            pattern, line = self.definitions[name]
+            inner = _PatternParser(pattern, self.definitions, line, self.expanding + (name,))
+            return inner.parse()
+        if c == "\\":
+            char, self.pos = self.escape(self.pos)
+            return ("set", 1 << ord(char))
+        if c == "^" and self.pos == 1:
+            self.fail("'^' anchors are not supported")
+        if c == "$" and self.pos == len(self.text):
+            self.fail("'$' anchors are not supported")
+        if c == "/":
+            self.fail("trailing context is not supported")
+        if c is None or c in "*+?|)":
+            self.fail(f"unexpected {c!r}" if c else "pattern ends early")
+        return ("set", 1 << ord(c))
+
+    def escape(self, i):
+        # The character of the escape after a backslash at i - 1, and the index after it
+        if i >= len(self.text):
+            self.fail("backslash at the end")
+        c = self.text[i]
+        if c in _ESCAPES:
+            return _ESCAPES[c], i + 1
+        if c == "x":
+            match = re.match(r"[0-9A-Fa-f]{1,2}", self.text[i + 1:])
+            if match:
+                return chr(int(match.group(), 16)), i + 1 + match.end()
+        match = re.match(r"[0-7]{1,3}", self.text[i:])
+        if match:
+            return chr(int(match.group(), 8) & 255), i + match.end()
+        return c, i + 1
+
+    def char_class(self):
+        negate = self.peek() == "^"
+        if negate:
+            self.pos += 1
+        mask = 0
+        first = True
+        while True:
+            c = self.peek()
+            if c is None:
+                self.fail("unterminated character class")
+            if c == "]" and not first:
+                self.pos += 1
+                break
+            first = False
+            match = re.match(r"\[:(\w+):\]", self.text[self.pos:])
+            if match and match.group(1) in _POSIX:
+                test = _POSIX[match.group(1)]
+                mask |= sum(1 << b for b in range(128) if test(chr(b)))
+                self.pos += match.end()
+                continue
+            low = self.class_char()
+            if self.peek() == "-" and self.pos + 1 < len(self.text) and self.text[self.pos + 1] != "]":
+                self.pos += 1
+                high = self.class_char()
+                if high < low:
+                    self.fail("bad range")
+                mask |= ((1 << (high + 1)) - 1) & ~((1 << low) - 1)
+            else:
+                mask |= 1 << low
+        return _ANY & ~mask if negate else mask
+
+    def class_char(self):
+        c = self.text[self.pos]
+        if c == "\\":
+            char, self.pos = self.escape(self.pos + 1)
+            return ord(char)
+        self.pos += 1
+        return ord(c)
+
+    def parse(self):
+        if self.text.startswith("<<EOF>>"):
+            self.fail("<<EOF>> rules are not supported")
+        node = self.union()
+        if self.pos < len(self.text):
+            self.fail(f"unexpected {self.peek()!r}")
+        return node
+
+
+def parse_pattern(text, definitions=None, line=0):
+    """Tree of a flex pattern over byte sets: ("set", mask) with bit b for byte b,
+    ("empty",), ("concat", nodes), ("union", nodes) and ("repeat", node, low,
+    high), high None for no limit."""
+    try:
+        return _PatternParser(text, definitions or {}, line).parse()
+    except RecursionError:
+        raise LexError(f"pattern {text!r} nested too deeply", line) from None
+
+
+def _masks(node, found):
+    kind = node[0]
+    if kind == "set":
+        found.add(node[1])
+    elif kind in ("concat", "union"):
+        for item in node[1]:
+            _masks(item, found)
+    elif kind == "repeat":
+        _masks(node[1], found)
+
+
+def _regex_tree(node, symbols_of):
+    # A parse_pattern() tree in the nodes thompson_fragment() builds
+    kind = node[0]
+    if kind == "set":
+        return ("set", symbols_of(node[1]))
+    if kind == "empty":
+        return node
+    if kind in ("concat", "union"):
+        return (kind, [_regex_tree(item, symbols_of) for item in node[1]])
+    _, inner, low, high = node
+    inner = _regex_tree(inner, symbols_of)
+    items = [inner] * low
+    if high is None:
+        items.append(("star", inner))
+    else:
+        items += [("union", [inner, ("empty",)])] * (high - low)
+    if not items:
+        return ("empty",)
+    return items[0] if len(items) == 1 else ("concat", items)
+
+
+class Lexer:
+    """One minimal DFA for all the rules, scanned with longest match and rule priority."""
+
+    def __init__(self, rules, definitions=None):
+        self.rules = list(rules)
+        if not self.rules:
+            raise LexError("no rules")
+        trees = [parse_pattern(rule.pattern, definitions, rule.line) for rule in self.rules]
+
+        # Byte classes: bytes in the same class are in the same sets everywhere
+        masks = set()
+        for tree in trees:
+            _masks(tree, masks)
+        class_of = [0] * 256
+        for mask in masks:
+            renumber = {}
+            for b in range(256):
+                class_of[b] = renumber.setdefault((class_of[b], mask >> b & 1), len(renumber))
+        classes = max(class_of) + 1
+        members = [[] for _ in range(classes)]
+        for b in range(256):
+            members[class_of[b]].append(b)
+        # A class is the symbol of its first byte
+        alphabet = [chr(bs[0]) for bs in members]
+
+        def symbols_of(mask):
+            return [alphabet[c] for c in range(classes) if mask >> members[c][0] & 1]
+
+        nfa = NFA(alphabet)
+        nfa.start = nfa.add_state()
+        rule_of = {}
+        for r, tree in enumerate(trees):
+            start, end = thompson_fragment(nfa, _regex_tree(tree, symbols_of))
+            nfa.add_transition(nfa.start, "", start)
+            nfa.accepting |= 1 << end
+            rule_of[end] = r
+        subsets = determinize(nfa)
+        accepting = array("i", [min((rule_of[s] for s in iter_bits(S & nfa.accepting)), default=-1) + 1
+                                for S in subsets.subsets])
+        dfa = minimize(DFA(alphabet, subsets.table, accepting))
+        self.dfa = dfa
+        self.classes = bytes(class_of)
+        self.columns = columns = classes
+
+        n = len(dfa)
+        table = dfa.table
+        self.accept = [0] * n        # rule + 1, negated when the state has no move
+        self.needles = [None] * n
+        for s in range(n):
+            row = table[s * columns:(s + 1) * columns]
+            rule = dfa.accepting[s]
+            self.accept[s] = -rule if all(t == _DEAD for t in row) else rule
+            leaving = [b for b in range(256) if row[class_of[b]] != s]
+            if 256 - len(leaving) >= 2:
+                self.needles[s] = needle(leaving)
+        interesting = [self.accept[s] != 0 or self.needles[s] is not None for s in range(n)]
+        self.table = [_DEAD if t == _DEAD else -t * columns - 2 if interesting[t] else t * columns
+                      for t in table]
+        self.start = dfa.start
+
+        # Bytes that are a whole ignored token on their own, from the start state
+        skipped = []
+        for b in range(256):
+            t = table[dfa.start * columns + class_of[b]]
+            if t != _DEAD and self.accept[t] < 0 and self.rules[-self.accept[t] - 1].ignored:
+                skipped.append(b)
+        self.skip = needle(sorted(set(range(256)) - set(skipped))) if skipped else None
+
+    def __len__(self):
+        return len(self.accept)
+
+    def tokens(self, data, ignored=False):
+        """(rule, start, end) of every token of ``data``, rule being an index in
+        ``rules`` or ERROR; tokens of ignored rules only with ``ignored``."""
+        data = as_bytes(data)
+        table, columns, classes = self.table, self.columns, self.classes
+        accept, needles = self.accept, self.needles
+        keep = [True] + [ignored or not rule.ignored for rule in self.rules]
+        skip = None if ignored else self.skip
+        start = self.start * columns
+        n = len(data)
+        base, window, w = 0, b"", 0
+        pos = 0
+        while pos < n:
+            if skip is not None:
+                found = find_next(skip, data, pos)
+                if found < 0:
+                    return
+                pos = found
+            x = start
+            rule, end = 0, pos
+            j = pos - base
+            if j < 0:
+                base, window = pos, data[pos:pos + CHUNK].translate(classes)
+                w, j = len(window), 0
+            while True:
+                if j >= w:
+                    i = base + j
+                    if i >= n:
+                        break
+                    base, window = i, data[i:i + CHUNK].translate(classes)
+                    w, j = len(window), 0
+                x = table[x + window[j]]
+                j += 1
+                if x >= 0:
+                    continue
+                if x == _DEAD:
+                    break
+                x = -x - 2
+                s = x // columns
+                r = accept[s]
+                if r:
+                    end = base + j
+                    if r < 0:
+                        rule = -r
+                        break
+                    rule = r
+                if needles[s] is not None:
+                    i = find_next(needles[s], data, base + j)
+                    if i < 0:
+                        i = n
+                    if r:
+                        end = i
+                    j = i - base
+            if rule:
+                if keep[rule]:
+                    yield rule - 1, pos, end
+                pos = end
+            else:
+                yield ERROR, pos, pos + 1
+                pos += 1
+
+    def tokens_file(self, path, ignored=False):
+        """tokens() of a file, read through mmap."""
+        with open(path, "rb") as f:
+            try:
+                view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:       # an empty file cannot be mapped
+                return
+            with view:
+                yield from self.tokens(view, ignored)
+
+
+def load_lexer(path):
+    """Lexer of a flex .l file (read as Latin-1, one character per byte)."""
+    with open(path, encoding="latin-1") as f:
+        definitions, rules = read_spec(f.read())
+    return Lexer(rules, definitions)
@@ -0,0 +1,218 @@
+# Non-recursive LL(1) predictive parser.
+#
+# The table is the one compute_parsing_table_logic() in acd7up.py fills with
+# strings: A, t -> A -> w for every t in FIRST(w), and for every t in FOLLOW(A)
+# when w can vanish; a later alternative overwrites an earlier one, as there.
+# Here it is compiled into one int array with a row of n_terminals cells per
+# nonterminal, holding production numbers (-1 for an empty cell), and every
+# right-hand side is stored reversed so an expansion is a single slice store
+# onto the symbol stack.  The driver then does O(1) work per stack operation
+# and, since each token is matched once, amortized O(1) per token.
+#
+# Panic-mode recovery is the textbook one: when the top is a nonterminal A
+# with no entry for the lookahead, skip the token unless it is in FOLLOW(A)
+# (or is the end marker), in which case pop A; when the top is a terminal
+# that does not match, pop it as if it had been inserted.  After a complete
+# sentence the first leftover token is dropped and the tokens after it are
+# parsed as another sentence.
+#
+# ll1_parsing_table() and is_ll1() are the string-level versions the GUIs show.
+
+from array import array
+
+from .firstfollow import analyze, first_follow, first_of_sequence
+from .profiling import timed
+from .transform import split_rules
+
+
+class LL1ParseError(ValueError):
+    """Syntax error at token number ``position`` (0-based).
+
+    ``symbol`` is the grammar symbol on top of the stack when ``token`` was
+    rejected; ``expected`` lists the tokens it would have accepted.
+    """
+
+    def __init__(self, position, token, symbol, expected=()):
+        self.position = position
+        self.token = token
+        self.symbol = symbol
+        self.expected = expected
+        names = ", ".join(expected) if expected else "nothing"
+        super().__init__(f"syntax error at token {position} ({token!r}); expected {names}")
+
+
+@timed("ll1_table")
+def ll1_parsing_table(grammar, first=None, follow=None):
+    """The string LL(1) table of acd7up.py for "A -> x y | z" rules.
+
+    Returns ({A: {terminal: alternative or "-"}}, terminals).  FIRST and
+    FOLLOW are computed when not given.
+    """
+    if first is None or follow is None:
+        first, follow, _ = first_follow(split_rules(grammar))
+    parsing_table = {}
+    rules = {rule.split("->")[0].strip(): rule.split("->")[1].strip().split("|") for rule in grammar}
+    terminals = set()
+
+    for productions in rules.values():
+        for prod in productions:
+            for symbol in prod.split():
+                if symbol not in rules and symbol != "ε":
+                    terminals.add(symbol)
+
+    terminals = sorted(terminals)
+    terminals.append("$")  # End of input marker
+
+    for non_terminal in rules:
+        parsing_table[non_terminal] = {t: "-" for t in terminals}  # Default empty
+
+    for A in rules:
+        for prod in rules[A]:
+            first_set = first_of_sequence(prod.split(), first)
+            for terminal in first_set - {"ε"}:
+                parsing_table[A][terminal] = prod
+            # If epsilon is in FIRST, use FOLLOW(A)
+            if "ε" in first_set:
+                for terminal in follow[A]:
+                    parsing_table[A][terminal] = "ε"
+
+    return parsing_table, terminals
+
+
+def is_ll1(grammar, first=None):
+    """The LL(1) check of acd6up/acd7up: no two alternatives share a FIRST symbol."""
+    if first is None:
+        first, _, _ = first_follow(split_rules(grammar))
+    rules = {rule.split("->")[0].strip(): rule.split("->")[1].strip().split("|") for rule in grammar}
+    for productions in rules.values():
+        first_seen = set()
+        for production in productions:
+            first_of_prod = first_of_sequence(production.split(), first)
+            if first_seen & first_of_prod:
+                return False
+            first_seen |= first_of_prod
+    return True
+
+
+class LL1Parser:
+    """Explicit-stack LL(1) parser of an interned Grammar.
+
+    ``table`` is the compiled parsing table and ``conflicts`` lists
+    (nonterminal, terminal, [productions]) for every cell more than one
+    alternative wanted, the last one being the entry kept.
+    """
+
+    def __init__(self, grammar, stack_size=256):
+        self.grammar = grammar
+        T = grammar.n_terminals
+        first, follow, nullable = analyze(grammar)
+        self.first = first
+        self.follow = follow
+        self.end = grammar.ids[grammar.end]
+
+        n_nonterminals = len(grammar.symbols) - T
+        cells = [[] for _ in range(n_nonterminals * T)]
+        for p, (A, rhs) in enumerate(grammar.productions):
+            mask = 0
+            vanishes = True
+            for X in rhs:
+                mask |= first[X]
+                if not nullable[X]:
+                    vanishes = False
+                    break
+            if vanishes:
+                mask |= follow[A]
+            row = (A - T) * T
+            t = 0
+            while mask:
+                if mask & 1:
+                    cells[row + t].append(p)
+                mask >>= 1
+                t += 1
+        self.table = array("i", (c[-1] if c else -1 for c in cells))
+        self.conflicts = [(T + i // T, i % T, c) for i, c in enumerate(cells) if len(c) > 1]
+        self.rhs_reversed = [tuple(reversed(rhs)) for _, rhs in grammar.productions]
+        self._stack = [0] * stack_size
+
+    def entry(self, nonterminal, terminal):
+        """Production number at (nonterminal, terminal), or -1."""
+        T = self.grammar.n_terminals
+        return self.table[(nonterminal - T) * T + terminal]
+
+    def __len__(self):
+        return len(self.grammar.symbols) - self.grammar.n_terminals
+
+    def _expected(self, X):
+        grammar = self.grammar
+        if X < grammar.n_terminals:
+            return [grammar.symbols[X]]
+        return [grammar.symbols[t] for t in grammar.terminals if self.entry(X, t) >= 0]
+
+    def parse(self, tokens, recover=False, on_expand=None):
+        """Parse an iterable of terminal ids.
+
+        Without ``recover`` the first syntax error raises LL1ParseError.
+        With it, errors are repaired in panic mode and returned as a list of
+        LL1ParseError objects, one per recovery (empty for a valid input).
+        ``on_expand(p)``, if given, is called for every production applied,
+        giving a leftmost derivation.
+        """
+        grammar = self.grammar
+        T = grammar.n_terminals
+        table = self.table
+        rhs_reversed = self.rhs_reversed
+        follow = self.follow
+        end = self.end
+        stack = self._stack
+        top = len(stack) - 1
+        stack[0] = end
+        stack[1] = grammar.start
+        sp = 1
+        errors = []
+        synced = True                # no error since the last matched token
+        tokens = iter(tokens)
+        t = next(tokens, end)
+        position = 0
+        while True:
+            X = stack[sp]
+            if X >= T:
+                p = table[(X - T) * T + t]
+                if p >= 0:
+                    rhs = rhs_reversed[p]
+                    n = len(rhs)
+                    if sp + n > top:
+                        stack.extend([0] * (len(stack) + n))
+                        top = len(stack) - 1
+                    stack[sp:sp + n] = rhs
+                    sp += n - 1
+                    if on_expand is not None:
+                        on_expand(p)
+                    continue
+            elif X == t:
+                if t == end:
+                    return errors
+                sp -= 1
+                t = next(tokens, end)
+                position += 1
+                synced = True
+                continue
+            if not recover:
+                raise LL1ParseError(position, grammar.symbols[t], grammar.symbols[X], self._expected(X))
+            if synced:
+                errors.append(LL1ParseError(position, grammar.symbols[t], grammar.symbols[X],
+                                            self._expected(X)))
+                synced = False
+            if X < T or t == end or follow[X] >> t & 1:
+                if X == end:
+                    # stray input after a complete sentence: drop the token
+                    # and parse what follows as a fresh sentence
+                    t = next(tokens, end)
+                    position += 1
+                    if t != end:
+                        sp = 1
+                        stack[1] = grammar.start
+                    continue
+                sp -= 1
+            else:
+                t = next(tokens, end)
+                position += 1
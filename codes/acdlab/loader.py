@@ -0,0 +1,463 @@
+# Reading grammars from text and files.
+#
+# A grammar file is read line by line and interned as it goes, so a file is
+# never held in memory as text and every symbol name is stored once.  Two
+# rule syntaxes are accepted, also mixed:
+#
+#   A -> x y | z           the lab scripts' format: a rule ends with its line
+#       | w                unless the next line starts with "|"
+#
+#   a : x y | z ;          yacc's, as in "All exps/parser.y": a rule ends at
+#                          ";" or where the next "name :" begins
+#
+# Tokens are whitespace-separated words; "->", "|" and ";" are always
+# separators, a trailing ":" is one, and quoted tokens such as '|' or '+' are
+# ordinary terminals (kept with their quotes).  ε or %empty is an empty
+# alternative.  Comments are /* ... */, // to the end of the line, and lines
+# starting with #.
+#
+# Declarations:
+#
+#   %start S                       start symbol (default: the first rule's)
+#   %token A B                     terminals; using one as a rule is an error
+#   %left / %right / %nonassoc     precedence levels, lowest first, for the
+#                                  conflict resolution of the LR tables
+#   %prec X                        inside an alternative: its precedence is X's
+#
+# As in yacc, "%%" separates declarations, rules and trailing C code; the C
+# code is not read, and neither are %{ ... %} blocks or { actions }.  Actions
+# are only recognized after a "%%", so a bare { is a terminal in the lab
+# format.  Other % directives (%union, %type, ...) are skipped with a warning.
+#
+# Every error is a GrammarError naming the file, line and column.  A
+# nonterminal with rules in several places gets all of them, in file order.
+
+import os
+import re
+from array import array
+
+from .grammar import Grammar
+from .profiling import timed
+
+GRAMMAR_SUFFIXES = (".g", ".cfg", ".grammar", ".txt", ".y")
+PRECEDENCE = ("%left", "%right", "%nonassoc", "%precedence")
+_NEWLINE = "\n"
+
+# One token after optional blanks: a word or separator, a comment start, a
+# quoted token, an unterminated quote, and in yacc sections an action's {.
+_TOKEN = r"""\s*(?:(->|[|;]|(?:(?!->|/\*|//)[^\s|;'"{braces}](?:(?!->|/\*|//)[^\s|;{braces}])*))|(/\*|//)|('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")|(['"]){action})"""
+_LAB_TOKEN = re.compile(_TOKEN.format(braces="", action=""))
+_YACC_TOKEN = re.compile(_TOKEN.format(braces="{", action=r"|(\{)"))
+# Lines without comments, quotes or braces are split by the simpler _WORD.
+_SPECIAL = re.compile(r"""/[*/]|['"{]""")
+_WORD = re.compile(r"->|[|;]|(?:(?!->)[^\s|;])+")
+
+
+class GrammarError(ValueError):
+    """A syntax or consistency error in a grammar file, with its position."""
+
+    def __init__(self, message, path="<grammar>", line=0, column=0):
+        self.message = message
+        self.path = path
+        self.line = line
+        self.column = column
+        super().__init__(f"{path}:{line}:{column}: {message}")
+
+
+def _directive(word):
+    return len(word) > 1 and word[0] == "%" and word[1].isalpha()
+
+
+def tokenize(lines, path="<grammar>"):
+    """Yield (token, line, column) for ``lines``, and a newline token at every line end.
+
+    Stops at the second "%%" of a yacc file.
+    """
+    sections = 0                     # "%%" lines seen
+    comment = None                   # (line, column) of an open /* comment
+    action = None                    # (line, column) of an open { action }
+    depth = 0
+    code = None                      # line of an open %{ block
+    lineno = 0
+    for lineno, line in enumerate(lines, 1):
+        line = line.rstrip("\r\n")
+        if code is not None:
+            if line.strip() == "%}":
+                code = None
+            continue
+        stripped = line.strip()
+        if comment is None and action is None:
+            if stripped == "%%":
+                sections += 1
+                if sections == 2:
+                    return
+                yield "%%", lineno, line.index("%") + 1
+                yield _NEWLINE, lineno, len(line) + 1
+                continue
+            if stripped == "%{":
+                code = lineno
+                continue
+            if stripped.startswith("#"):
+                yield _NEWLINE, lineno, len(line) + 1
+                continue
+        if comment is None and action is None and not _SPECIAL.search(line):
+            for m in _WORD.finditer(line):
+                word = m.group()
+                if word[-1] == ":" and len(word) > 1:
+                    yield word[:-1], lineno, m.start() + 1
+                    yield ":", lineno, m.end()
+                else:
+                    yield word, lineno, m.start() + 1
+            yield _NEWLINE, lineno, len(line) + 1
+            continue
+        token_re = _YACC_TOKEN if sections else _LAB_TOKEN
+        i, n = 0, len(line)
+        while i < n:
+            if comment is not None:
+                j = line.find("*/", i)
+                if j < 0:
+                    break
+                comment = None
+                i = j + 2
+                continue
+            if action is not None:
+                while i < n and depth:
+                    c = line[i]
+                    if c in "'\"":
+                        j = line.find(c, i + 1)
+                        while j > 0 and line[j - 1] == "\\":
+                            j = line.find(c, j + 1)
+                        i = j + 1 if j > 0 else n
+                        continue
+                    if c == "{":
+                        depth += 1
+                    elif c == "}":
+                        depth -= 1
+                    i += 1
+                if not depth:
+                    action = None
+                continue
+            m = token_re.match(line, i)
+            if m is None:
+                break                # trailing blanks
+            kind = m.lastindex
+            i = m.end()
+            if kind == 1:            # word or separator
+                word = m.group(1)
+                if len(word) > 1 and word[-1] == ":":
+                    yield word[:-1], lineno, m.start(1) + 1
+                    yield ":", lineno, i
+                else:
+                    yield word, lineno, m.start(1) + 1
+            elif kind == 2:          # comment
+                if m.group(2) == "//":
+                    break
+                comment = (lineno, m.start(2) + 1)
+            elif kind == 3:          # quoted token
+                yield m.group(3), lineno, m.start(3) + 1
+            elif kind == 4:
+                raise GrammarError(f"unterminated quote {line[m.start(4):]!r}", path, lineno, m.start(4) + 1)
+            else:                    # { of an action
+                action = (lineno, m.start(5) + 1)
+                depth = 1
+        if comment is None:
+            # a line break inside /* */ does not end a rule
+            yield _NEWLINE, lineno, len(line) + 1
+    if comment is not None:
+        raise GrammarError("unterminated comment", path, *comment)
+    if action is not None:
+        raise GrammarError("unterminated action", path, *action)
+    if code is not None:
+        raise GrammarError("unterminated %{ block", path, code, 1)
+
+
+def read_rules(lines, path="<grammar>", epsilon="ε"):
+    """Yield the declarations and alternatives of a grammar as they are read.
+
+    Events are ("rule", lhs, symbols, line, column, prec), one per
+    alternative, ("start", name, line, column), ("token", names, line),
+    (assoc, names, line) for a precedence level, and ("warning", message,
+    line, column).  ``symbols`` is a list without epsilon; ``prec`` is the
+    %prec token or None.
+    """
+    tokens = tokenize(lines, path)
+    pending = []
+
+    def next_token():
+        return pending.pop() if pending else next(tokens, None)
+
+    def rest_of_line():
+        words = []
+        while True:
+            token = next_token()
+            if token is None or token[0] == _NEWLINE:
+                return words
+            words.append(token)
+
+    special = {_NEWLINE, "|", ";", "->", ":", epsilon}
+    lhs = None                       # rule being read
+    style = None                     # "->" or ":"
+    alt, alt_start, prec = [], None, None
+    while True:
+        token = pending.pop() if pending else next(tokens, None)
+        if token is None:
+            if lhs is not None:
+                yield ("rule", lhs, alt, *alt_start, prec)
+            return
+        word, line, column = token
+
+        if lhs is not None:
+            if word not in special and word[0] != "%" and style == "->":
+                alt.append(word)
+                continue
+            # inside a rule: decide whether this token ends it
+            if word == _NEWLINE:
+                if style == ":":
+                    continue
+                following = next_token()
+                while following is not None and following[0] == _NEWLINE:
+                    following = next_token()
+                if following is not None and following[0] == "|":
+                    pending.append(following)
+                    continue
+                if following is not None:
+                    pending.append(following)
+                yield ("rule", lhs, alt, *alt_start, prec)
+                lhs = None
+                continue
+            if word == "|":
+                yield ("rule", lhs, alt, *alt_start, prec)
+                alt, alt_start, prec = [], (line, column + 1), None
+                continue
+            if word in (";", "%%"):
+                yield ("rule", lhs, alt, *alt_start, prec)
+                lhs = None
+                continue
+            if word == "%prec":
+                following = next_token()
+                if following is None or following[0] in (_NEWLINE, "|", ";"):
+                    raise GrammarError("%prec needs a token", path, line, column)
+                prec = following[0]
+                continue
+            if word == "%empty" or word == epsilon:
+                continue
+            if _directive(word):
+                raise GrammarError(f"{word} inside a rule", path, line, column)
+            if word in ("->", ":"):
+                raise GrammarError(f"unexpected {word!r}; is a '|' or ';' missing before it?",
+                                   path, line, column)
+            if style == ":" and word[0] not in "'\"":
+                following = next_token()
+                while following is not None and following[0] == _NEWLINE:
+                    following = next_token()
+                if following is not None and following[0] == ":":
+                    # "name :" starts the next rule of a yacc file without ";"
+                    yield ("rule", lhs, alt, *alt_start, prec)
+                    lhs = None
+                if following is not None:
+                    pending.append(following)
+                if lhs is None:
+                    pending.append(token)
+                    continue
+            alt.append(word)
+            continue
+
+        # between rules
+        if word in (_NEWLINE, "%%", ";"):
+            continue
+        if word == "%start":
+            names = rest_of_line()
+            if len(names) != 1:
+                raise GrammarError("%start needs exactly one name", path, line, column)
+            yield ("start", names[0][0], names[0][1], names[0][2])
+            continue
+        if word == "%token" or word in PRECEDENCE:
+            names = [w for w, _, _ in rest_of_line() if not w.startswith("<") and not w.isdigit()]
+            if not names and word == "%token":
+                raise GrammarError("%token needs at least one name", path, line, column)
+            yield ("token" if word == "%token" else word[1:], names, line)
+            continue
+        if _directive(word):
+            rest_of_line()
+            yield ("warning", f"ignored directive {word}", line, column)
+            continue
+        if word == "|":
+            raise GrammarError("'|' outside a rule", path, line, column)
+        if word in ("->", ":"):
+            raise GrammarError(f"{word!r} without a left-hand side", path, line, column)
+        arrow = next_token()
+        while arrow is not None and arrow[0] == _NEWLINE:
+            arrow = next_token()
+        if arrow is None or arrow[0] not in ("->", ":"):
+            raise GrammarError(f"expected '->' or ':' after {word!r}", path, line, column)
+        if word[0] in "'\"":
+            raise GrammarError(f"quoted token {word} cannot have rules", path, line, column)
+        lhs, style = word, arrow[0]
+        alt, alt_start, prec = [], (arrow[1], arrow[2] + len(arrow[0])), None
+
+
+class GrammarFile:
+    """A grammar as read from a file: the interned Grammar and its declarations.
+
+    ``tokens`` are the %token names, ``precedence`` lists (assoc, names) per
+    level, lowest first, ``prec`` maps production numbers to their %prec
+    token, ``lines`` gives the line of every production and ``rule_lines``
+    the first line of every nonterminal.  ``warnings`` holds formatted
+    "path:line:column: warning: ..." strings.
+    """
+
+    def __init__(self, grammar, path, tokens, precedence, prec, lines, rule_lines, warnings):
+        self.grammar = grammar
+        self.path = path
+        self.tokens = tokens
+        self.precedence = precedence
+        self.prec = prec
+        self.lines = lines
+        self.rule_lines = rule_lines
+        self.warnings = warnings
+
+    def rules(self):
+        """{A: [[x, y], ...]} with the start symbol first."""
+        rules = self.grammar.to_rules()
+        start = self.grammar.symbols[self.grammar.start]
+        ordered = {start: rules.pop(start)}
+        ordered.update(rules)
+        return ordered
+
+
+@timed("load")
+def read_grammar(lines, path="<grammar>", epsilon="ε", end="$"):
+    """GrammarFile of an iterable of lines (an open file, or text.splitlines())."""
+    ids = {}                         # name -> number, in order of appearance
+    names = []
+    rules = {}                       # nonterminal number -> [rhs tuples]
+    prec_of = {}                     # (A, alternative index) -> %prec token
+    alt_lines = {}                   # A -> array of the line of every alternative
+    rule_lines = {}
+    last_lhs = None
+    tokens, precedence, warnings = [], [], []
+    start = None
+
+    def intern(name):
+        X = ids.get(name)
+        if X is None:
+            X = ids[name] = len(names)
+            names.append(name)
+        return X
+
+    def warn(message, line, column=1):
+        warnings.append((line, column, message))
+
+    for event in read_rules(lines, path, epsilon):
+        kind = event[0]
+        if kind == "rule":
+            _, lhs, symbols, line, column, prec = event
+            A = intern(lhs)
+            rhs = []
+            for X in symbols:
+                i = ids.get(X)
+                if i is None:
+                    i = ids[X] = len(names)
+                    names.append(X)
+                rhs.append(i)
+            rhs = tuple(rhs)
+            if A not in rules:
+                rules[A] = []
+                alt_lines[A] = array("i")
+                rule_lines[lhs] = line
+            elif last_lhs != A:
+                warn(f"more rules for {lhs!r}, first defined on line {rule_lines[lhs]}; "
+                     f"both are kept", line, column)
+            if prec is not None:
+                prec_of[A, len(rules[A])] = prec
+            rules[A].append(rhs)
+            alt_lines[A].append(line)
+            last_lhs = A
+        elif kind == "start":
+            if start is not None:
+                raise GrammarError("%start given twice", path, event[2], event[3])
+            start = event[1:]
+        elif kind == "token":
+            tokens.extend(event[1])
+            for name in event[1]:
+                intern(name)
+        elif kind == "warning":
+            warn(*event[1:])
+        else:
+            precedence.append((kind, event[1]))
+            for name in event[1]:
+                intern(name)
+
+    if not rules:
+        raise GrammarError("no rules", path, 1, 1)
+    for name in tokens:
+        if name in ids and ids[name] in rules:
+            raise GrammarError(f"{name!r} is declared a %token but has rules", path, rule_lines[name], 1)
+    if start is not None:
+        name, line, column = start
+        if ids.get(name) not in rules:
+            raise GrammarError(f"start symbol {name!r} has no rules", path, line, column)
+        start = name
+    for A, alternatives in rules.items():
+        if len(alternatives) > 1 and len(set(alternatives)) < len(alternatives):
+            seen = set()
+            for i, rhs in enumerate(alternatives):
+                if rhs in seen:
+                    body = " ".join(names[X] for X in rhs) or epsilon
+                    warn(f"duplicate alternative {names[A]} -> {body}", alt_lines[A][i])
+                seen.add(rhs)
+    if tokens or precedence:
+        declared = set(tokens)
+        for _, level in precedence:
+            declared.update(level)
+        for A, alternatives in rules.items():
+            for i, rhs in enumerate(alternatives):
+                for X in rhs:
+                    name = names[X]
+                    if X not in rules and name not in declared and name[0] not in "'\"":
+                        warn(f"{name!r} is neither a declared token nor a nonterminal", alt_lines[A][i])
+                        declared.add(name)
+
+    grammar = Grammar.from_interned(names, rules, start, epsilon, end)
+    prec, lines_of = {}, array("i")
+    for A, alternatives in rules.items():
+        base = len(lines_of)
+        lines_of.extend(alt_lines[A])
+        for i in range(len(alternatives)):
+            if (A, i) in prec_of:
+                prec[base + i] = prec_of[A, i]
+    warnings = [f"{path}:{line}:{column}: warning: {message}" for line, column, message in sorted(warnings)]
+    return GrammarFile(grammar, path, tokens, precedence, prec, lines_of, rule_lines, warnings)
+
+
+def open_grammar(path, epsilon="ε", end="$"):
+    """GrammarFile of a grammar file, streamed from disk."""
+    with open(path, encoding="utf-8") as f:
+        return read_grammar(f, path, epsilon, end)
+
+
+def parse_rules(text):
+    """{A: [[x, y], [z]]} from the text of a grammar, start symbol first."""
+    return read_grammar(text.splitlines()).rules()
+
+
+def load_grammar(path):
+    """Rules dict of a grammar file."""
+    return open_grammar(path).rules()
+
+
+def grammar_files(paths):
+    """Yield the grammar files named by ``paths``, walking directories in sorted order.
+
+    Files given explicitly are always yielded; inside directories only files
+    ending in one of GRAMMAR_SUFFIXES are.
+    """
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames.sort()
+            for name in sorted(filenames):
+                if name.endswith(GRAMMAR_SUFFIXES):
+                    yield os.path.join(dirpath, name)
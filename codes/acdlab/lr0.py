@@ -0,0 +1,208 @@
+# Canonical collection of LR(0) item sets.
+#
+# An item "A -> x . y" is a single int: every production p owns the
+# len(rhs) + 1 consecutive ids starting at item_base[p], one per dot position,
+# so advancing the dot is "item + 1".  A state is identified by its kernel,
+# the sorted tuple of its kernel items, and states are indexed by kernel in a
+# dict, so finding out whether GOTO(I, X) already exists is one hash lookup.
+# The successor symbols of a state are read off the symbols after the dots of
+# its closure; the closure is only ever computed for kernels seen the first
+# time.
+#
+# Closures never rescan the item set.  The items a nonterminal B contributes
+# are the dot-0 items of every nonterminal that can start a B-derivation, and
+# that "left corner" relation is computed once per grammar (as bitmasks over
+# symbol ids, with the same SCC propagation as FIRST).  A closure is then the
+# union of the left-corner masks of the symbols after the kernel dots plus one
+# lookup: what the mask adds (items, successor groups, epsilon reductions) is
+# kept in a bounded LRU keyed by the mask, and kernels that expand the same
+# nonterminals, which is most of them in real grammars, share one entry.
+
+from collections import OrderedDict
+
+from .firstfollow import propagate
+from .grammar import iter_bits
+from .profiling import count, enabled, timed
+
+
+class LR0Automaton:
+    """LR(0) automaton of an augmented Grammar (see Grammar.augmented()).
+
+    States are numbered in creation order, state 0 being the start state.
+    ``kernels[s]`` is the kernel of state s, ``transitions[s]`` maps a symbol id
+    to the successor state and ``reductions[s]`` lists the productions whose
+    item is complete in s (including epsilon productions from the closure).
+    ``closure_cache_size`` bounds the number of expansions kept in the LRU.
+    ``collection``, a (kernels, transitions, reductions) triple saved from an
+    earlier build of the same grammar, is taken as is instead of rebuilding.
+    """
+
+    def __init__(self, grammar, closure_cache_size=4096, collection=None):
+        self.grammar = grammar
+        self.item_base = []          # production -> id of its dot-0 item
+        self.item_prod = []          # item -> production
+        self.item_next = []          # item -> symbol after the dot, -1 if complete
+        for p, (_, rhs) in enumerate(grammar.productions):
+            self.item_base.append(len(self.item_prod))
+            for dot in range(len(rhs) + 1):
+                self.item_prod.append(p)
+                self.item_next.append(rhs[dot] if dot < len(rhs) else -1)
+
+        # left_corners[B]: bitmask of the nonterminals C with B =>* C ..., B included
+        T = grammar.n_terminals
+        starts_with = [[] for _ in grammar.symbols]
+        for A, rhs in grammar.productions:
+            if rhs and rhs[0] >= T:
+                starts_with[A].append(rhs[0])
+        base = [1 << X if X >= T else 0 for X in range(len(grammar.symbols))]
+        self.left_corners = propagate(grammar.nonterminals, starts_with, base)
+        # nt_items[C]: the dot-0 items of C's productions
+        self.nt_items = [tuple(self.item_base[p] for p in grammar.by_lhs[X])
+                         for X in range(len(grammar.symbols))]
+
+        self._cache = OrderedDict()
+        self._cache_size = closure_cache_size
+        self.stats = {"closure_calls": 0, "cache_hits": 0, "cache_evictions": 0,
+                      "items_built": 0, "items_reused": 0}
+
+        if collection is not None:
+            kernels, transitions, reductions = collection
+            self.kernels = [tuple(kernel) for kernel in kernels]
+            self.transitions = list(transitions)
+            self.reductions = [list(r) for r in reductions]
+            self.index = {kernel: s for s, kernel in enumerate(self.kernels)}
+            return
+        self.kernels = []
+        self.transitions = []
+        self.reductions = []
+        self.index = {}              # kernel -> state
+        self._build()
+
+    def __len__(self):
+        return len(self.kernels)
+
+    def kernel_mask(self, kernel):
+        """Bitmask of the nonterminals a kernel's closure expands."""
+        T = self.grammar.n_terminals
+        item_next = self.item_next
+        left_corners = self.left_corners
+        mask = 0
+        for item in kernel:
+            X = item_next[item]
+            if X >= T:
+                mask |= left_corners[X]
+        return mask
+
+    def expansion(self, mask):
+        """What closure adds for the nonterminals in ``mask``.
+
+        Returns (items, successors, reductions): the dot-0 items, those items
+        advanced over their first symbol grouped by that symbol, and the
+        epsilon productions among them.  Many kernels share a mask (every
+        state expecting an expression, say), so this is what the LRU caches.
+        """
+        stats = self.stats
+        stats["closure_calls"] += 1
+        cache = self._cache
+        entry = cache.get(mask)
+        if entry is not None:
+            cache.move_to_end(mask)
+            stats["cache_hits"] += 1
+            stats["items_reused"] += len(entry[0])
+            return entry
+
+        items = []
+        nt_items = self.nt_items
+        for C in iter_bits(mask):
+            items.extend(nt_items[C])
+        successors = {}
+        reductions = []
+        item_next = self.item_next
+        for item in items:
+            X = item_next[item]
+            if X < 0:
+                reductions.append(self.item_prod[item])
+            elif X in successors:
+                successors[X].append(item + 1)
+            else:
+                successors[X] = [item + 1]
+        successors = {X: tuple(moved) for X, moved in successors.items()}
+        entry = (tuple(items), successors, tuple(reductions))
+        stats["items_built"] += len(items)
+
+        if self._cache_size:
+            cache[mask] = entry
+            if len(cache) > self._cache_size:
+                cache.popitem(last=False)
+                stats["cache_evictions"] += 1
+        return entry
+
+    def closure(self, kernel):
+        """All items of the state with the given kernel, kernel items first."""
+        return tuple(kernel) + self.expansion(self.kernel_mask(kernel))[0]
+
+    def closure_stats(self):
+        """The closure counters plus the derived hit rate."""
+        stats = dict(self.stats)
+        calls = stats["closure_calls"]
+        stats["hit_rate"] = stats["cache_hits"] / calls if calls else 0.0
+        return stats
+
+    @timed("lr0_items")
+    def _build(self):
+        grammar = self.grammar
+        start = tuple(sorted(self.item_base[p] for p in grammar.by_lhs[grammar.start]))
+        self.index[start] = 0
+        self.kernels.append(start)
+        item_next = self.item_next
+        item_prod = self.item_prod
+        index = self.index
+        state = 0
+        while state < len(self.kernels):
+            kernel = self.kernels[state]
+            _, added, added_reductions = self.expansion(self.kernel_mask(kernel))
+            moves = {}
+            reductions = list(added_reductions)
+            for item in kernel:
+                X = item_next[item]
+                if X < 0:
+                    reductions.append(item_prod[item])
+                elif X in moves:
+                    moves[X].append(item + 1)
+                else:
+                    moves[X] = [item + 1]
+            transitions = {}
+            # Groups only the expansion moves are already sorted tuples
+            for X, moved in added.items():
+                if X in moves:
+                    moved = tuple(sorted(moved + tuple(moves.pop(X))))
+                target = index.get(moved)
+                if target is None:
+                    target = index[moved] = len(self.kernels)
+                    self.kernels.append(moved)
+                transitions[X] = target
+            for X, moved in moves.items():
+                moved = tuple(sorted(moved))
+                target = index.get(moved)
+                if target is None:
+                    target = index[moved] = len(self.kernels)
+                    self.kernels.append(moved)
+                transitions[X] = target
+            self.transitions.append(transitions)
+            self.reductions.append(reductions)
+            state += 1
+        if enabled():
+            count("lr0.states", len(self.kernels))
+            count("lr0.transitions", sum(map(len, self.transitions)))
+            for name in ("closure_calls", "cache_hits", "items_built"):
+                count("lr0." + name, self.stats[name])
+
+    def item_str(self, item):
+        """ "A -> x . y" """
+        grammar = self.grammar
+        p = self.item_prod[item]
+        lhs, rhs = grammar.productions[p]
+        dot = item - self.item_base[p]
+        names = [grammar.symbols[X] for X in rhs]
+        names.insert(dot, ".")
+        return f"{grammar.symbols[lhs]} -> {' '.join(names)}"
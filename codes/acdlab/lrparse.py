@@ -0,0 +1,161 @@
+# Table-driven shift-reduce parser over PackedTable arrays.
+#
+# The driver keeps the parse state in a preallocated list of state numbers
+# (doubled when it fills up) and a stack pointer, so a step allocates nothing:
+# no tuples, no strings, no per-step frames.  The packed lookups of packed.py
+# are inlined into the loop.  Work per token is amortized O(1), memory is one
+# slot per stack level, and the token stream is consumed lazily, so inputs of
+# any length go through in constant extra memory beyond the stack.
+#
+# Semantic actions are optional.  actions[p], when present, is called as
+# actions[p](values, base) on reduction by production p, where values[base]
+# .. values[base + len(rhs) - 1] hold $1 .. $n; it returns $$.  Productions
+# without an action pass $1 through (None for empty right-hand sides).
+
+
+class ParseError(ValueError):
+    """Syntax error at token number ``position`` (0-based)."""
+
+    def __init__(self, position, token, state, expected=()):
+        self.position = position
+        self.token = token
+        self.state = state
+        self.expected = expected
+        names = ", ".join(expected) if expected else "nothing"
+        super().__init__(f"syntax error at token {position} ({token!r}); expected {names}")
+
+
+class LRParser:
+    """LR parse driver for a PackedTable (freshly packed or loaded from disk)."""
+
+    def __init__(self, tables, stack_size=256):
+        self.tables = tables
+        self.symbols = tables.symbols
+        self.ids = {name: i for i, name in enumerate(tables.symbols)}
+        self.end = tables.end
+        # Lists index faster than array/memoryview in the interpreter loop
+        self._arrays = tuple(list(getattr(tables, name)) for name in (
+            "pact", "act_table", "act_check", "defact",
+            "pgoto", "goto_table", "goto_check", "defgoto",
+            "rule_lhs", "rule_len"))
+        self._stack = [0] * stack_size
+
+    def token_ids(self, names):
+        """Map terminal names to the ids parse() expects."""
+        ids = self.ids
+        return [ids[name] for name in names]
+
+    def _expected(self, state):
+        tables = self.tables
+        return [self.symbols[t] for t in range(tables.n_terminals)
+                if tables.action(state, t) != 0]
+
+    def recognize(self, tokens):
+        """True if the terminal ids in ``tokens`` form a sentence; raises ParseError otherwise."""
+        (pact, table, check, defact,
+         pgoto, gtable, gcheck, defgoto,
+         rule_lhs, rule_len) = self._arrays
+        n_check = len(check)
+        n_gcheck = len(gcheck)
+        T = self.tables.n_terminals
+        accept = self.tables.accept_production
+        end = self.end
+        stack = self._stack
+        top = len(stack) - 1
+        sp = 0
+        stack[0] = state = 0
+        tokens = iter(tokens)
+        t = next(tokens, end)
+        position = 0
+        while True:
+            i = pact[state] + t
+            code = table[i] if 0 <= i < n_check and check[i] == t else defact[state]
+            if code > 0:
+                state = code - 1
+                sp += 1
+                if sp > top:
+                    stack.extend([0] * len(stack))
+                    top = len(stack) - 1
+                stack[sp] = state
+                t = next(tokens, end)
+                position += 1
+            elif code < 0:
+                p = -code - 1
+                if p == accept:
+                    if t == end:
+                        return True
+                    # a default reduction stood in for the error entry
+                    raise ParseError(position, self.symbols[t], state, [self.symbols[end]])
+                sp -= rule_len[p]
+                A = rule_lhs[p] - T
+                below = stack[sp]
+                j = pgoto[A] + below
+                state = gtable[j] if 0 <= j < n_gcheck and gcheck[j] == below else defgoto[A]
+                sp += 1
+                stack[sp] = state
+            else:
+                raise ParseError(position, self.symbols[t], state, self._expected(state))
+
+    def parse(self, tokens, values=None, actions=None):
+        """Parse terminal ids, running semantic ``actions``; returns the start symbol's value.
+
+        ``values`` is an optional iterable parallel to ``tokens`` giving each
+        token's semantic value; ``actions`` is a list indexed by production
+        (see the module comment).
+        """
+        if actions is None:
+            actions = ()
+        (pact, table, check, defact,
+         pgoto, gtable, gcheck, defgoto,
+         rule_lhs, rule_len) = self._arrays
+        n_check = len(check)
+        n_gcheck = len(gcheck)
+        n_actions = len(actions)
+        T = self.tables.n_terminals
+        accept = self.tables.accept_production
+        end = self.end
+        stack = self._stack
+        vstack = [None] * len(stack)
+        top = len(stack) - 1
+        sp = 0
+        stack[0] = state = 0
+        tokens = iter(tokens)
+        values = iter(values) if values is not None else None
+        t = next(tokens, end)
+        position = 0
+        while True:
+            i = pact[state] + t
+            code = table[i] if 0 <= i < n_check and check[i] == t else defact[state]
+            if code > 0:
+                state = code - 1
+                sp += 1
+                if sp > top:
+                    stack.extend([0] * len(stack))
+                    vstack.extend([None] * len(vstack))
+                    top = len(stack) - 1
+                stack[sp] = state
+                vstack[sp] = next(values, None) if values is not None else None
+                t = next(tokens, end)
+                position += 1
+            elif code < 0:
+                p = -code - 1
+                if p == accept:
+                    if t == end:
+                        return vstack[sp]
+                    raise ParseError(position, self.symbols[t], state, [self.symbols[end]])
+                n = rule_len[p]
+                sp -= n
+                action = actions[p] if p < n_actions else None
+                if action is not None:
+                    value = action(vstack, sp + 1)
+                else:
+                    value = vstack[sp + 1] if n else None
+                A = rule_lhs[p] - T
+                below = stack[sp]
+                j = pgoto[A] + below
+                state = gtable[j] if 0 <= j < n_gcheck and gcheck[j] == below else defgoto[A]
+                sp += 1
+                stack[sp] = state
+                vstack[sp] = value
+            else:
+                raise ParseError(position, self.symbols[t], state, self._expected(state))
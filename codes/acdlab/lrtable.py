@@ -0,0 +1,229 @@
+# ACTION/GOTO tables for SLR(1) and LALR(1) parsers.
+#
+# Both methods share the LR(0) automaton and differ only in the lookaheads of
+# the reductions: SLR uses FOLLOW of the left-hand side, LALR the
+# DeRemer-Pennello lookaheads of lalr.py.  Actions are ints:
+#
+#   0       error
+#   j + 1   shift and go to state j
+#   -p - 1  reduce by production p
+#
+# Reducing by the augmented start production S' -> S on the end marker means
+# accept.  Conflicts are resolved like yacc does: a shift/reduce conflict
+# between a token and a production that both have a precedence (see
+# conflicts.Precedence) goes to the higher one, or by the token's
+# associativity on a tie, and is recorded as resolved; anything else is
+# recorded as a conflict and resolved by default (shift beats reduce, the
+# earlier production wins a reduce/reduce).
+
+import time
+
+from .firstfollow import analyze
+from .grammar import iter_bits
+from .lalr import lalr_lookaheads
+from .lr0 import LR0Automaton
+from .profiling import count, timed
+
+ERROR = 0
+
+
+def encode_shift(state):
+    return state + 1
+
+
+def encode_reduce(production):
+    return -production - 1
+
+
+def decode(code):
+    """("shift", state), ("reduce", production) or ("error", None)."""
+    if code > 0:
+        return "shift", code - 1
+    if code < 0:
+        return "reduce", -code - 1
+    return "error", None
+
+
+@timed("slr_lookaheads")
+def slr_lookaheads(automaton):
+    """FOLLOW(A) for every reduction by A -> w, aligned with automaton.reductions."""
+    grammar = automaton.grammar
+    _, follow, _ = analyze(grammar)
+    productions = grammar.productions
+    return [[follow[productions[p][0]] for p in reductions]
+            for reductions in automaton.reductions]
+
+
+LOOKAHEADS = {"slr": slr_lookaheads, "lalr": lalr_lookaheads}
+
+
+class LRTable:
+    """ACTION and GOTO of an LR automaton under one lookahead method.
+
+    ``action[s]`` maps a terminal id to an action code, ``goto[s]`` a
+    nonterminal id to a state.  ``conflicts`` lists (state, terminal, codes)
+    for every cell that still had more than one candidate, ``codes[0]`` being
+    the one that was kept.  With a ``precedence``, ``resolved`` lists
+    (state, terminal, shift, reduce, decision) for every shift/reduce pair it
+    settled, decision being "shift", "reduce" or "error" (%nonassoc).
+
+    An automaton of a grammar that is not augmented is rebuilt from
+    ``grammar.augmented()``; ``automaton`` and ``grammar`` are the ones used.
+    """
+
+    @timed("lr_table")
+    def __init__(self, automaton, method="lalr", precedence=None):
+        if method not in LOOKAHEADS:
+            raise ValueError(f"unknown LR method {method!r}; expected one of "
+                             + ", ".join(sorted(LOOKAHEADS)))
+        grammar = automaton.grammar
+        augmented = grammar.augmented()
+        if augmented is not grammar:
+            automaton = LR0Automaton(augmented)
+        self.automaton = automaton
+        self.grammar = grammar = automaton.grammar
+        self.method = method
+        self.accept_production = grammar.by_lhs[grammar.start][0]
+        lookaheads = LOOKAHEADS[method](automaton)
+        self.resolved = []
+        if precedence is not None:
+            token_level, production_level, assoc = precedence.compile(grammar)
+
+        T = grammar.n_terminals
+        end = grammar.ids[grammar.end]
+        self.action = []
+        self.goto = []
+        self.conflicts = []
+        for state, out in enumerate(automaton.transitions):
+            action = {}
+            goto = {}
+            for X, target in out.items():
+                if X < T:
+                    action[X] = encode_shift(target)
+                else:
+                    goto[X] = target
+            cells = {}               # terminal -> reductions wanting it
+            for prod, mask in zip(automaton.reductions[state], lookaheads[state]):
+                if prod == self.accept_production:
+                    mask = 1 << end
+                code = encode_reduce(prod)
+                for t in iter_bits(mask):
+                    if t in cells:
+                        cells[t].append(code)
+                    else:
+                        cells[t] = [code]
+            for t, codes in cells.items():
+                if t in action:
+                    shift = action[t]
+                    if precedence is not None and token_level[t]:
+                        codes, shift = self._resolve(state, t, shift, codes, token_level[t],
+                                                     production_level, assoc)
+                        if not codes and shift is None:
+                            action[t] = ERROR
+                            continue
+                    if shift is not None:
+                        codes = [shift] + codes
+                if len(codes) > 1:
+                    codes.sort(key=self._preference)
+                    self.conflicts.append((state, t, codes))
+                action[t] = codes[0]
+            self.action.append(action)
+            self.goto.append(goto)
+        count("lr_table.conflicts", len(self.conflicts))
+
+    def _resolve(self, state, t, shift, reductions, level, production_level, assoc):
+        """(reductions left, shift or None) after applying precedence to one cell."""
+        left = []
+        original = shift
+        for code in reductions:
+            p = -code - 1
+            if not production_level[p]:
+                left.append(code)
+                continue
+            if production_level[p] > level:
+                decision = "reduce"
+            elif production_level[p] < level:
+                decision = "shift"
+            else:
+                decision = {"left": "reduce", "right": "shift"}.get(assoc[level], "error")
+            self.resolved.append((state, t, original, code, decision))
+            if decision == "reduce":
+                left.append(code)
+            if decision != "shift":
+                shift = None
+        return left, shift
+
+    @staticmethod
+    def _preference(code):
+        # shifts first, then reductions by earlier productions
+        return (0, code) if code > 0 else (1, -code)
+
+    def __len__(self):
+        return len(self.action)
+
+    def describe(self, code):
+        """Human-readable action, in the style slrtableshort.py prints."""
+        kind, arg = decode(code)
+        if kind == "reduce":
+            if arg == self.accept_production:
+                return ("accept",)
+            return ("reduce", self.grammar.production_str(arg))
+        return (kind, arg) if kind == "shift" else ("error",)
+
+
+def named_tables(table, sep=" "):
+    """ACTION and GOTO as dicts keyed by (state, symbol name), as slrtableshort.py prints them.
+
+    Actions are ("shift", j), ("reduce", "A -> x y"), ("accept",); ``sep``
+    joins the right-hand side symbols of a reduction.
+    """
+    grammar = table.grammar
+    symbols = grammar.symbols
+    action = {}
+    goto_table = {}
+    for s in range(len(table)):
+        for t, code in table.action[s].items():
+            kind, arg = decode(code)
+            if kind == "error":
+                continue
+            if kind == "shift":
+                action[(s, symbols[t])] = ("shift", arg)
+            elif arg == table.accept_production:
+                action[(s, symbols[t])] = ("accept",)
+            else:
+                lhs, rhs = grammar.productions[arg]
+                action[(s, symbols[t])] = ("reduce", f"{symbols[lhs]} -> {sep.join(symbols[X] for X in rhs)}")
+        for A, j in table.goto[s].items():
+            goto_table[(s, symbols[A])] = j
+    return action, goto_table
+
+
+def build_table(grammar, method="lalr", automaton=None, precedence=None):
+    """LRTable of ``grammar`` (augmented first if needed)."""
+    if automaton is None:
+        automaton = LR0Automaton(grammar.augmented())
+    return LRTable(automaton, method, precedence)
+
+
+def compare_methods(grammar, methods=("slr", "lalr")):
+    """State count, conflict count and build time of each method on one grammar.
+
+    The LR(0) automaton is built once and its time reported separately, since
+    every method shares it.
+    """
+    t0 = time.perf_counter()
+    automaton = LR0Automaton(grammar.augmented())
+    lr0_seconds = time.perf_counter() - t0
+    report = []
+    for method in methods:
+        t0 = time.perf_counter()
+        table = LRTable(automaton, method)
+        seconds = time.perf_counter() - t0
+        report.append({
+            "method": method,
+            "states": len(table),
+            "conflicts": len(table.conflicts),
+            "lr0_seconds": lr0_seconds,
+            "table_seconds": seconds,
+        })
+    return report
@@ -0,0 +1,229 @@
+# Matching bytes against a minimal DFA, for inputs and files of any size.
+#
+# Matcher lays the minimal DFA out densely.  Every symbol of the alphabet is
+# one byte; a bytes.translate() table maps each byte to its column (bytes
+# outside the alphabet share one more column), and row s of one flat list
+# holds the successors of state s, already multiplied by the number of
+# columns, so the inner loop is an addition and an index per byte.  A dead
+# state is added back for the missing transitions.
+#
+# Two kinds of state take the scan out of the byte loop:
+#
+#   stop          the answer cannot change any more: the dead state, a final
+#                 state every byte keeps in place (membership), and every
+#                 final state when searching, where reaching one is a match
+#   accelerated   the state stays put on most bytes, so the next byte that
+#                 leaves it is looked for with bytes.find() (one such byte) or
+#                 a compiled character class (several), both in C, and the
+#                 bytes in between are never seen by the loop
+#
+# Table entries leading into such a state are stored as ~target, so the loop
+# notices them with the one comparison it makes anyway.
+#
+# Searching runs the minimal DFA of Sigma* L, any bytes allowed in front, and
+# the final states it passes through are the ends of the matches.
+#
+# match_file() and search_file() map the file with mmap, so a file of any
+# size is read by the OS page by page; the byte loop translates a window of
+# at most CHUNK bytes at a time, and memory stays at that whatever the size.
+
+import mmap
+import re
+from operator import length_hint
+
+from .automata import NFA, determinize, minimize
+
+CHUNK = 1 << 16
+OTHER = "<other>"                    # stands for every byte outside the alphabet
+WINDOW = 64                          # first window after the loop was left
+
+
+def symbol_byte(a):
+    """The byte a symbol stands for: a one-character str (Latin-1), a one-byte bytes or an int."""
+    if isinstance(a, str) and len(a) == 1 and ord(a) < 256:
+        return ord(a)
+    if isinstance(a, bytes) and len(a) == 1:
+        return a[0]
+    if isinstance(a, int) and 0 <= a < 256:
+        return a
+    raise ValueError(f"symbol {a!r} is not a single byte")
+
+
+def search_automaton(dfa):
+    """Minimal DFA of Sigma* L: the strings with a suffix in the language of ``dfa``.
+
+    Sigma is every byte: the alphabet gets the extra symbol OTHER for the rest.
+    """
+    nfa = NFA(list(dfa.alphabet) + [OTHER])
+    for s in range(len(dfa)):
+        nfa.add_state(accepting=dfa.accepting[s])
+    for s, a, t in dfa.transitions():
+        nfa.add_transition(s, a, t)
+    nfa.start = nfa.add_state()
+    for a in nfa.alphabet:
+        nfa.add_transition(nfa.start, a, nfa.start)
+    nfa.add_transition(nfa.start, "", dfa.start)
+    return minimize(determinize(nfa))
+
+
+class Matcher:
+    """Dense byte matcher for a DFA, minimized first.
+
+    With ``search`` the matcher finds the language inside the input
+    (search(), ends(), count()), otherwise it tells whether the whole input
+    belongs to it (match()).
+    """
+
+    def __init__(self, dfa, search=False):
+        self.searching = search
+        dfa = search_automaton(dfa) if search else minimize(dfa)
+        self.dfa = dfa
+        k = len(dfa.alphabet)
+        columns = k + 1
+        other = dfa.symbol_ids.get(OTHER, k)
+        classes = [other] * 256
+        for i, a in enumerate(dfa.alphabet):
+            if a != OTHER:
+                classes[symbol_byte(a)] = i
+        self.classes = bytes(classes)
+        self.columns = columns
+
+        n = len(dfa)
+        dead = n
+        rows = [[t if t >= 0 else dead for t in dfa.table[s * k:(s + 1) * k]] + [dead]
+                for s in range(n)]
+        rows.append([dead] * columns)
+        self.accepting = bytearray(dfa.accepting) + b"\0"
+        self.dead = dead
+        self.start = dfa.start
+
+        self.stops = bytearray(n + 1)
+        self.needles = [None] * (n + 1)
+        for s, row in enumerate(rows):
+            leaving = [b for b in range(256) if row[classes[b]] != s]
+            if s == dead or search and self.accepting[s] or self.accepting[s] and not leaving:
+                self.stops[s] = 1
+            elif 256 - len(leaving) >= 2:
+                self.needles[s] = needle(leaving)
+        interesting = [self.stops[s] or self.needles[s] is not None for s in range(n + 1)]
+        self.table = [~(t * columns) if interesting[t] else t * columns
+                      for row in rows for t in row]
+
+    def __len__(self):
+        return len(self.stops)
+
+    def _scan(self, data, state, pos):
+        # Run from ``state`` at ``pos`` until a stop state is entered or the
+        # data ends; returns (state, position after the last byte read)
+        table, classes, columns = self.table, self.classes, self.columns
+        stops, needles = self.stops, self.needles
+        n = len(data)
+        window = WINDOW
+        while pos < n:
+            if needles[state] is not None:
+                pos = find_next(needles[state], data, pos)
+                if pos < 0:
+                    return state, n
+            chunk = data[pos:pos + window].translate(classes)
+            x = state * columns
+            bytes_left = iter(chunk)
+            for c in bytes_left:
+                x = table[x + c]
+                if x < 0:
+                    break
+            else:
+                state = x // columns
+                pos += len(chunk)
+                window = min(2 * window, CHUNK)
+                continue
+            state = ~x // columns
+            pos += len(chunk) - length_hint(bytes_left)
+            window = WINDOW
+            if stops[state]:
+                return state, pos
+        return state, pos
+
+    def match(self, data):
+        """True if all of ``data`` (bytes-like, or str as Latin-1) is in the language."""
+        if self.searching:
+            raise ValueError("a search matcher finds matches inside the input; use search()")
+        data = as_bytes(data)
+        state = self.start
+        if not self.stops[state]:
+            state, _ = self._scan(data, state, 0)
+        return bool(self.accepting[state])
+
+    def ends(self, data):
+        """Offsets just past every match, in increasing order (a match may be empty)."""
+        if not self.searching:
+            raise ValueError("a membership matcher reads the whole input; use match()")
+        data = as_bytes(data)
+        state, pos = self.start, 0
+        if self.accepting[state]:
+            yield 0
+        n = len(data)
+        while pos < n:
+            state, pos = self._scan(data, state, pos)
+            if self.accepting[state]:
+                yield pos
+
+    def search(self, data):
+        """Offset just past the first match, or -1."""
+        return next(self.ends(data), -1)
+
+    def count(self, data):
+        """Number of offsets where a match ends."""
+        return sum(1 for _ in self.ends(data))
+
+    def match_file(self, path):
+        """match() over the contents of a file, read through mmap."""
+        return map_file(path, self.match)
+
+    def search_file(self, path):
+        """search() over the contents of a file, read through mmap."""
+        return map_file(path, self.search)
+
+    def count_file(self, path):
+        """count() over the contents of a file, read through mmap."""
+        return map_file(path, self.count)
+
+
+def needle(leaving):
+    """What find_next() looks for: ``leaving`` bytes as a bytes of one, or a compiled class."""
+    if not leaving:
+        return re.compile(b"(?!)")   # never found
+    if len(leaving) == 1:
+        return bytes(leaving)
+    if len(leaving) <= 128:
+        return re.compile(b"[" + b"".join(re.escape(bytes([b])) for b in leaving) + b"]")
+    staying = sorted(set(range(256)) - set(leaving))
+    return re.compile(b"[^" + b"".join(re.escape(bytes([b])) for b in staying) + b"]")
+
+
+def find_next(needle, data, pos):
+    """Offset of the first byte of ``needle`` in data[pos:], or -1; in C either way."""
+    if isinstance(needle, bytes):
+        return data.find(needle, pos)
+    found = needle.search(data, pos)
+    return found.start() if found else -1
+
+
+def as_bytes(data):
+    return data.encode("latin-1") if isinstance(data, str) else data
+
+
+def map_file(path, fn):
+    """fn(contents of the file at ``path``): an mmap, or b\"\" for an empty file."""
+    with open(path, "rb") as f:
+        try:
+            view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:           # an empty file cannot be mapped
+            return fn(b"")
+        with view:
+            return fn(view)
+
+
+def compile_matcher(automaton, search=False):
+    """Matcher for an NFA or DFA: determinized if needed, minimized, laid out densely."""
+    dfa = determinize(automaton) if isinstance(automaton, NFA) else automaton
+    return Matcher(dfa, search)
@@ -0,0 +1,227 @@
+# Compressed ACTION/GOTO tables in flat int arrays, bison style.
+#
+# ACTION, per state s:
+#   defact[s]       the most common reduction of s (0 if s has none); it
+#                   replaces every error entry of the row, as bison's yydefact
+#   pact[s]         displacement of the row's remaining entries, or NO_ROW
+#   act_table[pact[s] + t], guarded by act_check[pact[s] + t] == t
+#
+# GOTO is packed by columns, per nonterminal A (indexed A - n_terminals):
+#   defgoto[A]      the most common target of A
+#   pgoto[A]        displacement, or NO_ROW
+#   goto_table[pgoto[A] + s], guarded by goto_check[pgoto[A] + s] == s
+#
+# Rows are placed with first-fit row displacement ("comb" packing), largest
+# first, and identical rows share one displacement.  Action codes are the
+# ones of lrtable.py: j + 1 shifts to j, -p - 1 reduces by p, 0 is an error.
+#
+# save() writes a small JSON header followed by the raw (native-endian)
+# arrays; load() maps the file and hands out memoryview casts over it, so a
+# parser process gets its tables without rebuilding or even copying them.
+
+import json
+import mmap
+import sys
+from array import array
+from collections import Counter
+
+MAGIC = b"ACDT"
+VERSION = 2
+NO_ROW = -(1 << 30)
+ARRAYS = ("defact", "pact", "act_table", "act_check",
+          "defgoto", "pgoto", "goto_table", "goto_check",
+          "rule_lhs", "rule_len")
+
+
+def _pack_rows(rows, max_probes=256):
+    """First-fit displacement of sparse rows {column: value}.
+
+    Returns (displacements, table, check); rows that are empty get NO_ROW.
+    Candidate positions are the free slots found with bytearray.find(); a row
+    that has not fitted after ``max_probes`` candidates goes to the end of the
+    table, which keeps packing near-linear on big, dense tables.
+    """
+    displacement = [NO_ROW] * len(rows)
+    table = array("i")
+    check = array("i")
+    free = bytearray()               # 1 where the slot is still free
+    used_bases = set()
+    shared = {}
+    order = sorted((r for r in range(len(rows)) if rows[r]), key=lambda r: -len(rows[r]))
+    for r in order:
+        entries = sorted(rows[r].items())
+        key = tuple(entries)
+        if key in shared:
+            displacement[r] = shared[key]
+            continue
+        first = entries[0][0]
+        offsets = [c - first for c, _ in entries[1:]]
+        size = len(free)
+        # pos is where the row's first entry lands
+        pos = free.find(1)
+        for _ in range(max_probes):
+            if pos < 0:
+                break
+            if pos - first not in used_bases:
+                for offset in offsets:
+                    if pos + offset < size and not free[pos + offset]:
+                        break
+                else:
+                    break
+            pos = free.find(1, pos + 1)
+        else:
+            pos = -1
+        if pos < 0:
+            pos = size
+            while pos - first in used_bases:
+                pos += 1
+        base = pos - first
+        need = base + entries[-1][0] + 1
+        if need > size:
+            table.extend([0] * (need - size))
+            check.extend([-1] * (need - size))
+            free.extend(b"\x01" * (need - size))
+        for c, value in entries:
+            table[base + c] = value
+            check[base + c] = c
+            free[base + c] = 0
+        used_bases.add(base)
+        shared[key] = displacement[r] = base
+    return displacement, table, check
+
+
+class PackedTable:
+    """An LRTable packed into int arrays (see the module comment).
+
+    Build one with ``PackedTable.from_table(table)`` or ``PackedTable.load(path)``.
+    The arrays are ``array('i')`` objects after packing and read-only
+    memoryviews into the mapped file after loading; both index the same way.
+    """
+
+    def __init__(self, header, arrays, buffer=None):
+        self.symbols = header["symbols"]
+        self.n_terminals = header["n_terminals"]
+        self.n_states = header["n_states"]
+        self.accept_production = header["accept_production"]
+        self.start = header["start"]
+        self.end = header["end"]             # id of the end-of-input marker
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+        self._buffer = buffer        # keeps the mapping alive
+
+    @classmethod
+    def from_table(cls, table):
+        grammar = table.grammar
+        T = grammar.n_terminals
+
+        defact = array("i", [0] * len(table))
+        rows = []
+        for s, row in enumerate(table.action):
+            reductions = Counter(code for code in row.values() if code < 0)
+            if reductions:
+                defact[s] = reductions.most_common(1)[0][0]
+            rows.append({t: code for t, code in row.items() if code != defact[s]})
+        pact, act_table, act_check = _pack_rows(rows)
+
+        n_nonterminals = len(grammar.symbols) - T
+        columns = [{} for _ in range(n_nonterminals)]
+        for s, row in enumerate(table.goto):
+            for A, target in row.items():
+                columns[A - T][s] = target
+        defgoto = array("i", [0] * n_nonterminals)
+        for i, column in enumerate(columns):
+            if column:
+                defgoto[i] = Counter(column.values()).most_common(1)[0][0]
+                columns[i] = {s: target for s, target in column.items() if target != defgoto[i]}
+        pgoto, goto_table, goto_check = _pack_rows(columns)
+
+        header = {
+            "symbols": grammar.symbols,
+            "n_terminals": T,
+            "n_states": len(table),
+            "accept_production": table.accept_production,
+            "start": grammar.start,
+            "end": grammar.ids[grammar.end],
+        }
+        arrays = {
+            "defact": defact, "pact": array("i", pact),
+            "act_table": act_table, "act_check": act_check,
+            "defgoto": defgoto, "pgoto": array("i", pgoto),
+            "goto_table": goto_table, "goto_check": goto_check,
+            "rule_lhs": array("i", (lhs for lhs, _ in grammar.productions)),
+            "rule_len": array("i", (len(rhs) for _, rhs in grammar.productions)),
+        }
+        return cls(header, arrays)
+
+    def action(self, state, terminal):
+        i = self.pact[state] + terminal
+        if 0 <= i < len(self.act_check) and self.act_check[i] == terminal:
+            return self.act_table[i]
+        return self.defact[state]
+
+    def goto(self, state, nonterminal):
+        A = nonterminal - self.n_terminals
+        i = self.pgoto[A] + state
+        if 0 <= i < len(self.goto_check) and self.goto_check[i] == state:
+            return self.goto_table[i]
+        return self.defgoto[A]
+
+    def nbytes(self):
+        """Bytes taken by the packed arrays."""
+        return sum(len(getattr(self, name)) * 4 for name in ARRAYS)
+
+    def save(self, path):
+        header = {
+            "version": VERSION,
+            "byteorder": sys.byteorder,
+            "symbols": self.symbols,
+            "n_terminals": self.n_terminals,
+            "n_states": self.n_states,
+            "accept_production": self.accept_production,
+            "start": self.start,
+            "end": self.end,
+            "arrays": {},
+        }
+        offset = 0
+        for name in ARRAYS:
+            n = len(getattr(self, name))
+            header["arrays"][name] = [offset, n]
+            offset += n * 4
+        blob = json.dumps(header).encode()
+        # Pad so the arrays start 8-byte aligned
+        start = len(MAGIC) + 4 + len(blob)
+        blob += b" " * (-start % 8)
+        with open(path, "wb") as f:
+            f.write(MAGIC)
+            f.write(len(blob).to_bytes(4, "little"))
+            f.write(blob)
+            for name in ARRAYS:
+                values = getattr(self, name)
+                f.write(values.tobytes() if isinstance(values, array) else bytes(values))
+
+    @classmethod
+    def load(cls, path):
+        """Map a file written by save(); the arrays are views, nothing is copied."""
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if buffer[:4] != MAGIC:
+            buffer.close()
+            raise ValueError(f"{path}: not a packed parse table")
+        size = int.from_bytes(buffer[4:8], "little")
+        try:
+            header = json.loads(bytes(buffer[8:8 + size]))
+        except ValueError:
+            buffer.close()
+            raise ValueError(f"{path}: corrupt table header") from None
+        if header.get("version") != VERSION or header.get("byteorder") != sys.byteorder:
+            buffer.close()
+            raise ValueError(f"{path}: table written by an incompatible version or machine")
+        data = 8 + size
+        if any(data + offset + n * 4 > len(buffer) for offset, n in header["arrays"].values()):
+            buffer.close()
+            raise ValueError(f"{path}: truncated table")
+        view = memoryview(buffer)
+        arrays = {}
+        for name, (offset, n) in header["arrays"].items():
+            arrays[name] = view[data + offset:data + offset + n * 4].cast("i")
+        return cls(header, arrays, buffer)
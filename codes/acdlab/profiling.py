@@ -0,0 +1,195 @@
+# Where the time and memory of a grammar build go, stage by stage.
+#
+# The pipeline functions mark their stages with stage() or @timed and report
+# counts (closure calls, states created, SCC components propagated...) with
+# count().  Nothing is recorded unless a Profile is active: with profiling()
+# off, each of those is one test of a module global, and counters are added
+# once per call, never inside the loops they count, so the instrumentation
+# costs nothing measurable on a normal run.
+#
+# Inside ``with profiling() as profile:`` every stage records its wall time
+# and, with ``memory``, its peak of traced Python allocations above what was
+# allocated when it started (tracemalloc, which slows allocation-heavy code
+# down, so compare times of runs made with the same setting).  Stages nest;
+# the peak of an outer stage includes those of its inner ones.  The result is
+# written as a JSON summary or in Chrome's trace event format, which
+# chrome://tracing and Perfetto open as a timeline.
+
+import functools
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+_active = None                       # the Profile being recorded, if any
+
+
+class _Off:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_OFF = _Off()
+
+
+class _Stage:
+
+    def __init__(self, profile, name, detail):
+        self.profile = profile
+        self.name = name
+        self.detail = detail
+
+    def __enter__(self):
+        profile = self.profile
+        self.depth = len(profile._open)
+        if profile.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if profile._open:
+                outer = profile._open[-1]
+                outer.peak = max(outer.peak, peak)
+            tracemalloc.reset_peak()
+            self.base = self.peak = current
+        profile._open.append(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        profile = self.profile
+        peak_bytes = None
+        if profile.memory:
+            self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            peak_bytes = self.peak - self.base
+        profile._open.pop()
+        if profile._open and profile.memory:
+            outer = profile._open[-1]
+            outer.peak = max(outer.peak, self.peak)
+        profile.spans.append((self.name, self.detail, self.depth, self.start - profile.origin,
+                              end - self.start, peak_bytes))
+        return False
+
+
+class Profile:
+    """Stages and counters of one profiled run.
+
+    ``spans`` holds (name, detail, depth, start_ns, duration_ns, peak_bytes)
+    tuples in the order the stages ended; ``counters`` maps a name to a
+    total.  ``peak_bytes`` is None without ``memory``.
+    """
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.spans = []
+        self.counters = {}
+        self.origin = time.perf_counter_ns()
+        self._open = []
+
+    def stage(self, name, detail=None):
+        return _Stage(self, name, detail)
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def totals(self):
+        """{stage name: {"calls", "seconds", "peak_bytes"}}, the peak being the largest."""
+        totals = {}
+        for name, _, _, _, duration, peak in self.spans:
+            total = totals.setdefault(name, {"calls": 0, "seconds": 0.0, "peak_bytes": peak})
+            total["calls"] += 1
+            total["seconds"] += duration / 1e9
+            if peak is not None and peak > total["peak_bytes"]:
+                total["peak_bytes"] = peak
+        return totals
+
+    def summary(self):
+        """The JSON form: totals per stage, counters and every span in start order."""
+        spans = sorted(self.spans, key=lambda span: span[3])
+        return {
+            "memory": self.memory,
+            "totals": self.totals(),
+            "counters": dict(sorted(self.counters.items())),
+            "spans": [{"name": name, "detail": detail, "depth": depth, "start": start / 1e9,
+                       "seconds": duration / 1e9, "peak_bytes": peak}
+                      for name, detail, depth, start, duration, peak in spans],
+        }
+
+    def chrome_trace(self):
+        """The trace event format: one complete ("X") event per span, counters at the end."""
+        pid = os.getpid()
+        events = []
+        end = 0
+        for name, detail, depth, start, duration, peak in self.spans:
+            args = {}
+            if detail is not None:
+                args["detail"] = detail
+            if peak is not None:
+                args["peak_bytes"] = peak
+            events.append({"name": name, "cat": "acdlab", "ph": "X", "pid": pid, "tid": 0,
+                           "ts": start / 1000, "dur": duration / 1000, "args": args})
+            end = max(end, start + duration)
+        if self.counters:
+            events.append({"name": "counters", "ph": "C", "pid": pid, "tid": 0, "ts": end / 1000,
+                           "args": dict(sorted(self.counters.items()))})
+        events.sort(key=lambda event: event["ts"])
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, path, format="json"):
+        """Save summary() ("json") or chrome_trace() ("chrome") to ``path``."""
+        if format not in ("json", "chrome"):
+            raise ValueError(f"unknown profile format {format!r}")
+        data = self.chrome_trace() if format == "chrome" else self.summary()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+            f.write("\n")
+
+
+@contextmanager
+def profiling(memory=True):
+    """Record the stages and counters of everything run inside the block.
+
+    Yields the Profile.  Blocks do not nest: an inner one records on its
+    own Profile and the outer one misses what happens inside.
+    """
+    global _active
+    started = memory and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    outer, _active = _active, Profile(memory)
+    try:
+        yield _active
+    finally:
+        _active = outer
+        if started:
+            tracemalloc.stop()
+
+
+def enabled():
+    return _active is not None
+
+
+def stage(name, detail=None):
+    """Context manager timing a stage of the active Profile; a no-op without one."""
+    return _OFF if _active is None else _active.stage(name, detail)
+
+
+def timed(name):
+    """Decorator: every call of the function is a stage called ``name``."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def timed_call(*args, **kwargs):
+            if _active is None:
+                return fn(*args, **kwargs)
+            with _active.stage(name):
+                return fn(*args, **kwargs)
+        return timed_call
+    return decorate
+
+
+def count(name, n=1):
+    """Add ``n`` to a counter of the active Profile, if any."""
+    if _active is not None:
+        _active.count(name, n)
@@ -0,0 +1,339 @@
+# Regular expressions in JFLAP's syntax, as in "exp 03 re to epslon nfa.jff":
+#
+#   r + s    union                 r*     Kleene star
+#   rs       concatenation         (r)    grouping
+#   !        the empty string      any other character stands for itself
+#
+# with * binding tighter than concatenation and concatenation tighter than +.
+# parse_regex() gives a tree, thompson() the epsilon-NFA JFLAP's "convert to
+# NFA" builds by hand: two states per symbol, union and star wrapped in two
+# new states joined by epsilon moves, so the NFA is linear in the expression.
+#
+# LazyDFA simulates that NFA through a DFA built only as far as the input
+# needs it.  A DFA state is a set of NFA states (an int bitset, as in
+# automata.py); its successor on a byte is computed the first time the byte
+# is read in that state and remembered in a flat table like the one of
+# matcher.py.  Only the NFA states with a move on a symbol and the final
+# state are kept in the sets, which cuts them to a third for a Thompson NFA.
+# The cache holds at most ``max_states`` DFA states: when it is full it is
+# emptied and refilled from the current state, so an expression whose DFA is
+# exponential, such as (a+b)*a(a+b)(a+b)...(a+b), still runs in bounded
+# memory and in time linear in the input, with a subset step per byte at
+# worst instead of a table lookup.
+
+import re
+from operator import length_hint
+
+from .automata import NFA, closed_steps
+from .grammar import iter_bits
+from .matcher import CHUNK, WINDOW, as_bytes, map_file, symbol_byte
+
+_SPECIAL = "+*()!"
+_UNKNOWN = -1
+
+
+class RegexError(ValueError):
+    """An expression that does not parse; ``column`` counts from 1."""
+
+    def __init__(self, message, column):
+        super().__init__(f"column {column}: {message}")
+        self.message = message
+        self.column = column
+
+
+class _Parser:
+
+    def __init__(self, text):
+        self.text = text
+        self.pos = 0
+
+    def peek(self):
+        return self.text[self.pos] if self.pos < len(self.text) else None
+
+    def fail(self, expected):
+        found = self.peek()
+        where = f"found {found!r}" if found is not None else "at the end"
+        raise RegexError(f"expected {expected}, {where}", self.pos + 1)
+
+    def union(self):
+        items = [self.concatenation()]
+        while self.peek() == "+":
+            self.pos += 1
+            items.append(self.concatenation())
+        return items[0] if len(items) == 1 else ("union", items)
+
+    def concatenation(self):
+        items = []
+        while self.peek() is not None and self.peek() not in "+)":
+            items.append(self.star())
+        if not items:
+            self.fail("an expression")
+        return items[0] if len(items) == 1 else ("concat", items)
+
+    def star(self):
+        node = self.atom()
+        while self.peek() == "*":
+            self.pos += 1
+            if node[0] != "star":
+                node = ("star", node)
+        return node
+
+    def atom(self):
+        char = self.peek()
+        if char == "(":
+            self.pos += 1
+            node = self.union()
+            if self.peek() != ")":
+                self.fail("')'")
+            self.pos += 1
+            return node
+        if char == "!":
+            self.pos += 1
+            return ("empty",)
+        if char is None or char in _SPECIAL:
+            self.fail("a symbol, '(' or '!'")
+        self.pos += 1
+        return ("symbol", char)
+
+
+def parse_regex(text):
+    """Tree of a JFLAP expression.
+
+    Nodes are ("symbol", c), ("empty",), ("star", node), and ("concat", nodes)
+    or ("union", nodes) with two or more nodes.
+    """
+    parser = _Parser(text)
+    try:
+        tree = parser.union()
+    except RecursionError:
+        raise RegexError("expression nested too deeply", 1) from None
+    if parser.pos < len(text):
+        parser.fail("an operator")
+    return tree
+
+
+def thompson_fragment(nfa, node):
+    """Add Thompson's construction of ``node`` to ``nfa``; returns its (start, end) states.
+
+    Besides the nodes of parse_regex(), ("set", symbols) is any one of the
+    symbols, as lexgen.py builds for a character class.
+    """
+    kind = node[0]
+    if kind in ("symbol", "empty", "set"):
+        start, end = nfa.add_state(), nfa.add_state()
+        if kind == "set":
+            for a in node[1]:
+                nfa.add_transition(start, a, end)
+        else:
+            nfa.add_transition(start, node[1] if kind == "symbol" else "", end)
+        return start, end
+    if kind == "concat":
+        start, end = thompson_fragment(nfa, node[1][0])
+        for item in node[1][1:]:
+            first, last = thompson_fragment(nfa, item)
+            nfa.add_transition(end, "", first)
+            end = last
+        return start, end
+    start = nfa.add_state()
+    inner = [thompson_fragment(nfa, item) for item in node[1]] if kind == "union" \
+        else [thompson_fragment(nfa, node[1])]
+    end = nfa.add_state()
+    for first, last in inner:
+        nfa.add_transition(start, "", first)
+        nfa.add_transition(last, "", end)
+    if kind == "star":
+        nfa.add_transition(start, "", end)
+        nfa.add_transition(inner[0][1], "", inner[0][0])
+    return start, end
+
+
+def thompson(tree):
+    """Thompson's epsilon-NFA of a parse_regex() tree, with one final state."""
+    nfa = NFA()
+    try:
+        nfa.start, end = thompson_fragment(nfa, tree)
+    except RecursionError:
+        raise RegexError("expression nested too deeply", 1) from None
+    nfa.accepting = 1 << end
+    return nfa
+
+
+def compile_regex(text):
+    """thompson(parse_regex(text))."""
+    return thompson(parse_regex(text))
+
+
+def python_pattern(tree):
+    """The same language as a pattern for Python's re module."""
+    kind = tree[0]
+    if kind == "symbol":
+        return re.escape(tree[1])
+    if kind == "empty":
+        return "(?:)"
+    if kind == "set":
+        return "[" + "".join(re.escape(a) for a in tree[1]) + "]"
+    if kind == "star":
+        return f"(?:{python_pattern(tree[1])})*"
+    separator = "" if kind == "concat" else "|"
+    return "(?:" + separator.join(python_pattern(item) for item in tree[1]) + ")"
+
+
+class LazyDFA:
+    """Bytes matcher for an NFA whose DFA states are built on demand.
+
+    Same interface as matcher.Matcher: match() for the whole input, or with
+    ``search`` ends(), search() and count() for matches inside it.  At most
+    ``max_states`` DFA states are kept; ``flushes`` counts how often the
+    cache was emptied.
+    """
+
+    def __init__(self, nfa, search=False, max_states=4096):
+        if max_states < 2:
+            raise ValueError("max_states must be at least 2")
+        self.searching = search
+        self.max_states = max_states
+        k = len(nfa.alphabet)
+        self.columns = k + 1             # the last column: bytes outside the alphabet
+        classes = [k] * 256
+        for i, a in enumerate(nfa.alphabet):
+            classes[symbol_byte(a)] = i
+        self.classes = bytes(classes)
+        # DFA states keep only the NFA states with a move on a symbol and the
+        # final ones, renumbered 0, 1, ...: sets that agree on those behave alike
+        closures = nfa.closures()
+        important = [s for s in range(len(nfa)) if nfa.moves[s] or nfa.accepting >> s & 1]
+        bit = [0] * len(nfa)
+        for i, s in enumerate(important):
+            bit[s] = 1 << i
+
+        def compact(S):
+            T = 0
+            for s in iter_bits(S):
+                T |= bit[s]
+            return T
+
+        # One row per column, the last (no NFA move) all empty
+        self.steps = [[compact(row[s]) for s in important] for row in closed_steps(nfa, closures)]
+        self.steps.append([0] * len(important))
+        self.initial = compact(closures[nfa.start])
+        self.final = compact(nfa.accepting)
+        self.flushes = 0
+        self._flush()
+
+    def _flush(self):
+        self.sets = []
+        self.index = {}
+        self.table = []
+        self.accepting = bytearray()
+
+    def __len__(self):
+        return len(self.sets)
+
+    def _stop(self, S):
+        # Search stops at every final state; a membership scan only at the dead one
+        return bool(S & self.final) if self.searching else not S
+
+    def _entry(self, S):
+        # Table entry leading to DFA state S (t * columns, or -t * columns - 2 to stop)
+        t = self.index.get(S)
+        if t is None:
+            if len(self.sets) == self.max_states:
+                self.flushes += 1
+                self._flush()
+            t = self.index[S] = len(self.sets)
+            self.sets.append(S)
+            self.table.extend([_UNKNOWN] * self.columns)
+            self.accepting.append(1 if S & self.final else 0)
+        x = t * self.columns
+        return -x - 2 if self._stop(S) else x
+
+    def _successor(self, x, c):
+        S = self.sets[x // self.columns]
+        row = self.steps[c]
+        T = self.initial if self.searching else 0
+        while S:
+            low = S & -S
+            T |= row[low.bit_length() - 1]
+            S ^= low
+        flushes = self.flushes
+        entry = self._entry(T)
+        if self.flushes == flushes:      # otherwise the row of x is gone
+            self.table[x + c] = entry
+        return entry
+
+    def _scan(self, data, x, pos):
+        # Run from scaled state x at pos until a stop state is entered or
+        # the data ends; returns (entry of the state, position after the last byte read)
+        classes = self.classes
+        n = len(data)
+        window = WINDOW
+        while pos < n:
+            table = self.table
+            chunk = data[pos:pos + window].translate(classes)
+            bytes_left = iter(chunk)
+            for c in bytes_left:
+                t = table[x + c]
+                if t < 0:
+                    break
+                x = t
+            else:
+                pos += len(chunk)
+                window = min(2 * window, CHUNK)
+                continue
+            pos += len(chunk) - length_hint(bytes_left)
+            window = WINDOW
+            if t == _UNKNOWN:
+                t = self._successor(x, c)
+            if t < 0:
+                return t, pos
+            x = t
+        return x, pos
+
+    def _state_accepts(self, entry):
+        x = entry if entry >= 0 else -entry - 2
+        return bool(self.accepting[x // self.columns])
+
+    def match(self, data):
+        """True if all of ``data`` (bytes-like, or str as Latin-1) is in the language."""
+        if self.searching:
+            raise ValueError("a search matcher finds matches inside the input; use search()")
+        data = as_bytes(data)
+        entry = self._entry(self.initial)
+        if entry >= 0:
+            entry, _ = self._scan(data, entry, 0)
+        return self._state_accepts(entry)
+
+    def ends(self, data):
+        """Offsets just past every match, in increasing order (a match may be empty)."""
+        if not self.searching:
+            raise ValueError("a membership matcher reads the whole input; use match()")
+        data = as_bytes(data)
+        entry = self._entry(self.initial)
+        if entry < 0:
+            yield 0
+        pos, n = 0, len(data)
+        while pos < n:
+            x = entry if entry >= 0 else -entry - 2
+            entry, pos = self._scan(data, x, pos)
+            if entry < 0:
+                yield pos
+
+    def search(self, data):
+        """Offset just past the first match, or -1."""
+        return next(self.ends(data), -1)
+
+    def count(self, data):
+        """Number of offsets where a match ends."""
+        return sum(1 for _ in self.ends(data))
+
+    def match_file(self, path):
+        """match() over the contents of a file, read through mmap."""
+        return map_file(path, self.match)
+
+    def search_file(self, path):
+        """search() over the contents of a file, read through mmap."""
+        return map_file(path, self.search)
+
+    def count_file(self, path):
+        """count() over the contents of a file, read through mmap."""
+        return map_file(path, self.count)
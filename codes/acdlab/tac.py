@@ -0,0 +1,29 @@
+# Assembly-like three address code for "x = y op z" statements, as
+# Genrationoftargetcode.py produces it, without the input() prompts.
+# Statements may be any expression (see frontend.py); they are flattened to
+# "x = y op z" first, with _t1, _t2, ... for the intermediate results.
+
+from .frontend import translate_lines
+
+
+def generate_tac(statements, errors=None):
+    """LOAD/op/STORE instructions for a list of "var = expression" statements.
+
+    Every operation of the flattened statements becomes LOAD R1 / op / STORE,
+    a plain copy LOAD R1 / STORE.  Statements that do not parse, or use an
+    operator other than + - * /, produce no code; a message for each goes to
+    ``errors`` if it is a list, otherwise it is printed like the script does.
+    """
+    opcodes = {"+": "ADD", "-": "SUB", "*": "MUL", "/": "DIV"}
+    tac = []
+    for op, var1, var2, var3 in translate_lines(statements, errors):
+        tac.append(f"LOAD R1, {var2}")
+        if op in opcodes:
+            tac.append(f"{opcodes[op]} R1, {var3}")
+        tac.append(f"STORE {var1}, R1")
+    return tac
+
+
+def target_code(tac):
+    """Target code listing of a TAC list."""
+    return [f"Target: {code}" for code in tac]
@@ -0,0 +1,260 @@
+# Grammar transformations of the lab scripts, without the GUI around them.
+#
+# The algorithms work on token lists, {A: [[x, y], [z]]} with [] for an
+# epsilon alternative, so that a nonterminal E is never confused with EXP:
+#
+#   remove_left_recursion  the ordered-nonterminal algorithm (Aho et al.
+#                          4.19), run only inside the strongly connected
+#                          components of the left-corner graph: substitution
+#                          is what makes the grammar grow, and it is only
+#                          needed between nonterminals that can reach each
+#                          other through leading symbols.
+#   factor_prefixes        longest-common-prefix factoring with one trie per
+#                          rule; every trie node is visited once, so the cost
+#                          is linear in the size of the grammar.
+#
+# Left recursion hidden behind a nullable leading symbol (A -> B A a with B
+# nullable) is not looked for, as in the textbook algorithm.
+#
+# eliminate_left_recursion, left_factor and compute_cfg keep the scripts' own
+# format, a list of "A -> x y | z" strings; acd6up.py and acd7up.py call them
+# from their button handlers.
+
+from .profiling import count, timed
+
+
+def split_rules(grammar):
+    """Split "A -> x y | z" strings into {A: [[x, y], [z]]}.
+
+    Strings with the same left-hand side add to its alternatives.
+    """
+    rules = {}
+    for rule in grammar:
+        lhs, rhs = rule.split("->", 1)
+        rules.setdefault(lhs.strip(), []).extend(alt.split() for alt in rhs.split("|"))
+    return rules
+
+
+def join_rules(rules, epsilon="ε"):
+    """{A: [[x, y], [z]]} back to "A -> x y | z" strings.
+
+    A nonterminal without alternatives has no string form ("A ->" would read
+    back as A -> epsilon) and is left out.
+    """
+    return [f"{A} -> " + " | ".join(" ".join(alt) or epsilon for alt in alts)
+            for A, alts in rules.items() if alts]
+
+
+def _fresh(name, used):
+    name += "'"
+    while name in used:
+        name += "'"
+    used.add(name)
+    return name
+
+
+def _strip(rules, epsilon):
+    return {A: [[X for X in alt if X != epsilon] for alt in alts] for A, alts in rules.items()}
+
+
+def grammar_size(rules, epsilon="ε"):
+    """(rules, alternatives, right-hand-side symbols) of a rules dict."""
+    alternatives = sum(len(alts) for alts in rules.values())
+    symbols = sum(1 for alts in rules.values() for alt in alts for X in alt if X != epsilon)
+    return len(rules), alternatives, symbols
+
+
+def left_corner_components(rules):
+    """Left-recursive groups of nonterminals, each in rule order.
+
+    A group is a strongly connected component of A -> B for every alternative
+    of A starting with B; single nonterminals count only with an A -> A edge.
+    """
+    edges = {A: {alt[0] for alt in alts if alt and alt[0] in rules} for A, alts in rules.items()}
+    order = {A: i for i, A in enumerate(rules)}
+    index, low, on_stack, stack, groups = {}, {}, set(), [], []
+    for root in rules:
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(edges[root]))]
+        while work:
+            A, children = work[-1]
+            for B in children:
+                if B not in index:
+                    index[B] = low[B] = len(index)
+                    stack.append(B)
+                    on_stack.add(B)
+                    work.append((B, iter(edges[B])))
+                    break
+                if B in on_stack:
+                    low[A] = min(low[A], index[B])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[A])
+                if low[A] == index[A]:
+                    group = []
+                    while True:
+                        B = stack.pop()
+                        on_stack.discard(B)
+                        group.append(B)
+                        if B == A:
+                            break
+                    if len(group) > 1 or A in edges[A]:
+                        groups.append(sorted(group, key=order.__getitem__))
+    groups.sort(key=lambda group: order[group[0]])
+    return groups
+
+
+def _drop_empty(rules):
+    """Delete, until none is left, every alternative that mentions a rule without alternatives."""
+    empty = {A for A, alts in rules.items() if not alts}
+    while empty:
+        found = set()
+        for A, alts in rules.items():
+            if alts:
+                kept = [alt for alt in alts if empty.isdisjoint(alt)]
+                if len(kept) < len(alts):
+                    rules[A] = kept
+                    if not kept:
+                        found.add(A)
+        empty = found
+
+
+@timed("remove_left_recursion")
+def remove_left_recursion(rules, epsilon="ε", stats=None):
+    """Rules dict without direct or indirect left recursion.
+
+    A -> A a | b becomes A -> b A', A' -> a A' | [].  Inside a left-recursive
+    group A1..An, an alternative Ai -> Aj g with j < i is first replaced by
+    Aj's alternatives followed by g.  A rule whose alternatives are all
+    left-recursive derives nothing: it is left without alternatives, and so
+    is every alternative that mentions such a rule, transitively.  ``stats``
+    (a dict) receives the number of "substitutions" made and the
+    "new_nonterminals" introduced.
+    """
+    rules = _strip(rules, epsilon)
+    used = set(rules)
+    for alts in rules.values():
+        for alt in alts:
+            used.update(alt)
+    substitutions = 0
+    new_nonterminals = []
+    for group in left_corner_components(rules):
+        rank = {A: i for i, A in enumerate(group)}
+        for i, A in enumerate(group):
+            work = list(reversed(rules[A]))
+            alts = []
+            while work:
+                alt = work.pop()
+                j = rank.get(alt[0]) if alt else None
+                if j is not None and j < i:
+                    # Aj is already free of left recursion, so its alternatives
+                    # start with a later group member at worst
+                    substitutions += 1
+                    tail = alt[1:]
+                    work.extend(reversed([beta + tail for beta in rules[alt[0]]]))
+                else:
+                    alts.append(alt)
+            recursive = [alt[1:] for alt in alts if alt and alt[0] == A and len(alt) > 1]
+            if not recursive:
+                rules[A] = [alt for alt in alts if alt != [A]]
+                continue
+            if all(alt and alt[0] == A for alt in alts):
+                # every alternative is A -> A a: A derives nothing, and A -> A'
+                # would make it derive a*
+                rules[A] = []
+                continue
+            tail = _fresh(A, used)
+            new_nonterminals.append(tail)
+            rules[A] = [alt + [tail] for alt in alts if not alt or alt[0] != A]
+            rules[tail] = [alt + [tail] for alt in recursive] + [[]]
+    _drop_empty(rules)
+    count("transform.substitutions", substitutions)
+    count("transform.new_nonterminals", len(new_nonterminals))
+    if stats is not None:
+        stats["substitutions"] = stats.get("substitutions", 0) + substitutions
+        stats.setdefault("new_nonterminals", []).extend(new_nonterminals)
+    return rules
+
+
+@timed("factor_prefixes")
+def factor_prefixes(rules, epsilon="ε", stats=None):
+    """Rules dict in which no two alternatives of a rule share a first symbol.
+
+    Alternatives with a common prefix p are replaced by p A' with A' deriving
+    what follows p; the longest such prefix is taken, and A' is factored the
+    same way.  Duplicate alternatives are merged.
+    """
+    rules = _strip(rules, epsilon)
+    used = set(rules)
+    for alts in rules.values():
+        for alt in alts:
+            used.update(alt)
+    end = object()                   # marks the end of an alternative in a trie
+    new_nonterminals = []
+    result = {}
+    for A, alts in rules.items():
+        root = {}
+        for alt in alts:
+            node = root
+            for X in alt:
+                node = node.setdefault(X, {})
+            node[end] = None
+        pending = [(A, root)]
+        while pending:
+            lhs, node = pending.pop()
+            out = result[lhs] = []
+            for X, child in node.items():
+                if X is end:
+                    out.append([])
+                    continue
+                prefix = [X]
+                while len(child) == 1 and end not in child:
+                    (Y, child), = child.items()
+                    prefix.append(Y)
+                if list(child) == [end]:
+                    out.append(prefix)
+                    continue
+                suffix = _fresh(lhs, used)
+                new_nonterminals.append(suffix)
+                out.append(prefix + [suffix])
+                pending.append((suffix, child))
+    count("transform.new_nonterminals", len(new_nonterminals))
+    if stats is not None:
+        stats.setdefault("new_nonterminals", []).extend(new_nonterminals)
+    return result
+
+
+def transform_rules(rules, epsilon="ε"):
+    """Remove left recursion, then factor prefixes; return (rules, report).
+
+    The report gives the "before" and "after" grammar_size() triples, their
+    "growth" in symbols, the "substitutions" made and the
+    "new_nonterminals".
+    """
+    stats = {"substitutions": 0, "new_nonterminals": []}
+    before = grammar_size(rules, epsilon)
+    rules = factor_prefixes(remove_left_recursion(rules, epsilon, stats), epsilon, stats)
+    after = grammar_size(rules, epsilon)
+    stats.update(before=before, after=after, growth=after[2] / max(before[2], 1))
+    return rules, stats
+
+
+def eliminate_left_recursion(grammar):
+    """remove_left_recursion() on a list of "A -> x y | z" strings."""
+    return join_rules(remove_left_recursion(split_rules(grammar)))
+
+
+def left_factor(grammar):
+    """factor_prefixes() on a list of "A -> x y | z" strings."""
+    return join_rules(factor_prefixes(split_rules(grammar)))
+
+
+def compute_cfg(grammar):
+    """Eliminate left recursion, then left factor."""
+    return join_rules(transform_rules(split_rules(grammar))[0])
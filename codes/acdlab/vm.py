@@ -0,0 +1,165 @@
+# Interpreter for the target code of tac.py and backend.py.
+#
+# Program() decodes the text once.  Every instruction becomes three ints in
+# parallel lists: an opcode and the cells of its two operands.  Registers,
+# variables and constants share one list of cells (registers first, then one
+# slot per variable in order of first appearance, then one per distinct
+# constant), so LOAD and STORE are the same MOVE and an operand is always a
+# list index: the loop never looks up a name or parses an operand.
+#
+# Costs follow a simple in-order machine: every instruction takes CYCLES of
+# its opcode and a memory access (LOAD or ALU operand from a variable, STORE)
+# adds ``latency`` cycles.  The instruction set has no jumps, so a program
+# runs each instruction exactly once and its counts are known as soon as it
+# is decoded; stats() reports them.
+
+from array import array
+
+from .backend import REGISTER, number
+
+MOVE, ADD, SUB, MUL, DIV = range(5)
+OPCODES = {"LOAD": MOVE, "STORE": MOVE, "ADD": ADD, "SUB": SUB, "MUL": MUL, "DIV": DIV}
+CYCLES = {"LOAD": 1, "STORE": 1, "ADD": 1, "SUB": 1, "MUL": 3, "DIV": 8}
+MEMORY_LATENCY = 4
+
+
+class MachineError(ValueError):
+    """An instruction that cannot be decoded or executed; ``index`` counts from 0."""
+
+    def __init__(self, index, instruction, message):
+        self.index = index
+        self.instruction = instruction
+        super().__init__(f"instruction {index + 1} ({instruction}): {message}")
+
+
+class Program:
+    """Decoded target code, ready to run any number of times.
+
+    ``code`` is a list of instructions as generate_tac() or
+    allocate_registers() produce them; a "Target: " prefix as added by
+    target_code() is ignored.
+    """
+
+    def __init__(self, code, latency=MEMORY_LATENCY):
+        self.code = [line[8:] if line.startswith("Target: ") else line for line in code]
+        self.variables = []          # variable names, by slot
+        self.constants = []
+        self.registers = 0
+        self._slots = {}
+        self._constant_slots = {}
+        seen = {}                    # instruction text -> decoded, most lines repeat
+        decoded = []
+        memory = 0
+        cycles = 0
+        for index, instruction in enumerate(self.code):
+            entry = seen.get(instruction)
+            if entry is None:
+                entry = seen[instruction] = self._decode(index, instruction)
+            decoded.append(entry)
+            memory += entry[3]
+            cycles += CYCLES[entry[4]] + latency * entry[3]
+
+        # Cells: registers, then variables, then constants
+        R = self.registers
+        base = (0, R, R + len(self.variables))
+        self.opcodes = array("b", [entry[0] for entry in decoded])
+        self.targets = array("i", [base[kind] + i for kind, i in (entry[1] for entry in decoded)])
+        self.sources = array("i", [base[kind] + i for kind, i in (entry[2] for entry in decoded)])
+        self.memory_accesses = memory
+        self.cycles = cycles
+
+    def _decode(self, index, instruction):
+        # (opcode, (kind, index) of both operands, memory accesses, opcode name);
+        # kind is 0 for a register, 1 for a variable and 2 for a constant
+        opcode, _, operands = instruction.strip().partition(" ")
+        target, comma, source = operands.partition(",")
+        if not comma:
+            raise MachineError(index, instruction, "expected OPCODE operand, operand")
+        if opcode not in OPCODES:
+            raise MachineError(index, instruction, f"unknown opcode {opcode}")
+        cells = []
+        for operand in (target.strip(), source.strip()):
+            if REGISTER.match(operand):
+                self.registers = max(self.registers, int(operand[1:]))
+                cells.append((0, int(operand[1:]) - 1))
+            elif number(operand) is not None:
+                if operand not in self._constant_slots:
+                    self._constant_slots[operand] = len(self.constants)
+                    self.constants.append(number(operand))
+                cells.append((2, self._constant_slots[operand]))
+            elif operand.isidentifier():
+                if operand not in self._slots:
+                    self._slots[operand] = len(self.variables)
+                    self.variables.append(operand)
+                cells.append((1, self._slots[operand]))
+            else:
+                raise MachineError(index, instruction, f"bad operand {operand!r}")
+        store = opcode == "STORE"
+        if cells[0][0] != (1 if store else 0):
+            raise MachineError(index, instruction,
+                               "STORE needs a variable first" if store else "needs a register first")
+        if store and cells[1][0] != 0:
+            raise MachineError(index, instruction, "STORE needs a register second")
+        accesses = 1 if store or cells[1][0] == 1 else 0
+        return OPCODES[opcode], cells[0], cells[1], accesses, opcode
+
+    def __len__(self):
+        return len(self.opcodes)
+
+    def stats(self):
+        """{"instructions", "memory", "cycles"} of one run."""
+        return {"instructions": len(self.opcodes), "memory": self.memory_accesses, "cycles": self.cycles}
+
+    def run(self, memory=None):
+        """Run once on ``memory`` ({variable: value}, missing ones 0) and return the variables after it.
+
+        Raises MachineError on a division by zero.
+        """
+        memory = memory or {}
+        R = self.registers
+        cells = [0] * R + [memory.get(name, 0) for name in self.variables] + self.constants
+        # Lists index faster than arrays in the interpreter loop
+        opcodes, targets, sources = list(self.opcodes), list(self.targets), list(self.sources)
+        try:
+            for op, d, s in zip(opcodes, targets, sources):
+                if op == MOVE:
+                    cells[d] = cells[s]
+                elif op == ADD:
+                    cells[d] += cells[s]
+                elif op == SUB:
+                    cells[d] -= cells[s]
+                elif op == MUL:
+                    cells[d] *= cells[s]
+                else:
+                    cells[d] /= cells[s]
+        except ZeroDivisionError:
+            index = self._failed(memory)
+            raise MachineError(index, self.code[index], "division by zero") from None
+        return dict(zip(self.variables, cells[R:R + len(self.variables)]))
+
+    def _failed(self, memory):
+        # Run again one instruction at a time to find the one that divided by 0
+        R = self.registers
+        cells = [0] * R + [memory.get(name, 0) for name in self.variables] + self.constants
+        for index, (op, d, s) in enumerate(zip(self.opcodes, self.targets, self.sources)):
+            if op == DIV and cells[s] == 0:
+                return index
+            cells[d] = _apply(op, cells[d], cells[s])
+        return len(self.opcodes) - 1
+
+
+def _apply(op, a, b):
+    if op == MOVE:
+        return b
+    if op == ADD:
+        return a + b
+    if op == SUB:
+        return a - b
+    if op == MUL:
+        return a * b
+    return a / b
+
+
+def run_code(code, memory=None):
+    """Program(code).run(memory)."""
+    return Program(code).run(memory)
@@ -0,0 +1,30 @@
+import os
+import sys
+
+from acdlab.lexgen import load_lexer
+
+# The keyword counter of "All exps/lexer.l", without flex: run it where
+# input.txt is (or give another file) and it prints what lexer.exe prints.
+LEXER_L = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "All exps", "lexer.l")
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else "input.txt"
+    lexer = load_lexer(LEXER_L)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        print(f"Error: Unable to open file {path}")
+        return 1
+
+    k = 0
+    for rule, start, end in lexer.tokens(data):
+        if rule == 0:        # int|float|char
+            k += 1
+            print("Keyword found: " + data[start:end].decode("latin-1"))
+
+    print(f"Total keywords found: {k}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,10 @@
-from collections import defaultdict, deque
+import sys
+
+from acdlab import Grammar
+from acdlab.lr0 import LR0Automaton
+from acdlab.conflicts import format_conflict, lr_conflicts
+from acdlab.lrtable import LRTable, compare_methods, named_tables
+from acdlab.profiling import profiling
 
 # Grammar definition
 grammar = {
@@ -7,131 +13,54 @@ grammar = {
     "C": ["cC", "d"]
 }
 
-terminals = {'c', 'd', '$'}
-non_terminals = set(grammar.keys())
-
-# Compute FIRST sets
-def compute_first():
-    first = defaultdict(set)
-    changed = True
-    while changed:
-        changed = False
-        for head in grammar:
-            for prod in grammar[head]:
-                for symbol in prod:
-                    before = len(first[head])
-                    first[head] |= first[symbol] if symbol in non_terminals else {symbol}
-                    if before != len(first[head]):
-                        changed = True
-                    if symbol not in non_terminals or '' not in first[symbol]:
-                        break
-    return first
-
-# Compute FOLLOW sets
-def compute_follow(first):
-    follow = defaultdict(set)
-    follow["S'"].add('$')
-    changed = True
-    while changed:
-        changed = False
-        for head in grammar:
-            for prod in grammar[head]:
-                trailer = follow[head].copy()
-                for symbol in reversed(prod):
-                    if symbol in non_terminals:
-                        before = len(follow[symbol])
-                        follow[symbol] |= trailer
-                        if before != len(follow[symbol]):
-                            changed = True
-                        if '' in first[symbol]:
-                            trailer |= first[symbol] - {''}
-                        else:
-                            trailer = first[symbol]
-                    else:
-                        trailer = {symbol}
-    return follow
-
-# Closure function
-def closure(items):
-    closure_set = set(items)
-    added = True
-    while added:
-        added = False
-        new_items = set()
-        for lhs, rhs, dot_pos in closure_set:
-            if dot_pos < len(rhs) and rhs[dot_pos] in non_terminals:
-                B = rhs[dot_pos]
-                for prod in grammar[B]:
-                    item = (B, prod, 0)
-                    if item not in closure_set:
-                        new_items.add(item)
-                        added = True
-        closure_set |= new_items
-    return frozenset(closure_set)
-
-# GOTO function
-def goto(items, symbol):
-    moved = {(lhs, rhs, dot+1) for (lhs, rhs, dot) in items if dot < len(rhs) and rhs[dot] == symbol}
-    return closure(moved) if moved else frozenset()
-
 # Build canonical collection of LR(0) items
 def items():
-    C = []
-    init = closure([("S'", grammar["S'"][0], 0)])
-    C.append(init)
-    queue = deque([init])
-    transitions = {}
-
-    while queue:
-        I = queue.popleft()
-        for X in terminals | non_terminals:
-            goto_I = goto(I, X)
-            if goto_I and goto_I not in C:
-                C.append(goto_I)
-                queue.append(goto_I)
-            if goto_I:
-                transitions[(I, X)] = goto_I
-    return C, transitions
-
-# Build SLR parsing table
-def build_slr_table(C, transitions, follow):
-    action = {}
-    goto_table = {}
+    return LR0Automaton(Grammar(grammar, "S'", epsilon=''))
 
-    state_map = {state: i for i, state in enumerate(C)}
+# Build SLR / LALR parsing table
+def build_lr_table(automaton, method):
+    table = LRTable(automaton, method)
+    action, goto_table = named_tables(table, sep="")
+    conflicts, _ = lr_conflicts(table)
+    return action, goto_table, conflicts
 
-    for i, I in enumerate(C):
-        for item in I:
-            lhs, rhs, dot = item
-            if dot < len(rhs):
-                a = rhs[dot]
-                if a in terminals:
-                    j = state_map[transitions[(I, a)]]
-                    action[(i, a)] = ("shift", j)
-            else:
-                if lhs != "S'":
-                    for a in follow[lhs]:
-                        action[(i, a)] = ("reduce", f"{lhs} -> {rhs}")
-                else:
-                    action[(i, '$')] = ("accept",)
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    # --profile FILE: time, peak memory and counts (closure calls, states)
+    # of building the items and the table, as JSON
+    profile_path = None
+    if "--profile" in argv:
+        i = argv.index("--profile")
+        profile_path = argv[i + 1]
+        argv = argv[:i] + argv[i + 2:]
+    # Lookahead method: "slr" (FOLLOW sets) or "lalr" (LALR(1) lookaheads)
+    method = argv[0] if argv else "slr"
 
-        for A in non_terminals:
-            if (I, A) in transitions:
-                j = state_map[transitions[(I, A)]]
-                goto_table[(i, A)] = j
+    if profile_path:
+        with profiling() as profile:
+            automaton = items()
+            action, goto_table, conflicts = build_lr_table(automaton, method)
+        profile.write(profile_path)
+    else:
+        automaton = items()
+        action, goto_table, conflicts = build_lr_table(automaton, method)
 
-    return action, goto_table
+    # Display
+    print(f"{method.upper()} ACTION TABLE:")
+    for k, v in sorted(action.items()):
+        print(f"{k}: {v}")
+    print("\nGOTO TABLE:")
+    for k, v in sorted(goto_table.items()):
+        print(f"{k}: {v}")
+    if conflicts:
+        print("\nCONFLICTS:")
+        for conflict in conflicts:
+            print(format_conflict(conflict))
 
-# Run it
-first = compute_first()
-follow = compute_follow(first)
-C, transitions = items()
-action, goto_table = build_slr_table(C, transitions, follow)
+    print(f"\n{'method':>6} {'states':>7} {'conflicts':>9} {'build time':>11}")
+    for row in compare_methods(automaton.grammar):
+        seconds = row["lr0_seconds"] + row["table_seconds"]
+        print(f"{row['method']:>6} {row['states']:>7} {row['conflicts']:>9} {seconds * 1000:>9.3f}ms")
 
-# Display
-print("ACTION TABLE:")
-for k, v in sorted(action.items()):
-    print(f"{k}: {v}")
-print("\nGOTO TABLE:")
-for k, v in sorted(goto_table.items()):
-    print(f"{k}: {v}")
+if __name__ == "__main__":
+    main()
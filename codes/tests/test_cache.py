@@ -0,0 +1,60 @@
+from acdlab import Grammar
+from acdlab.cache import GrammarCache, NullCache, canonical_grammar
+from acdlab.lrtable import build_table
+from acdlab.packed import PackedTable
+
+
+def cells(packed):
+    return [[packed.action(s, t) for t in range(packed.n_terminals)]
+            for s in range(packed.n_states)]
+
+
+def renumbered_pair():
+    first = Grammar({"S'": [["P"]], "P": [["s", ";", "P"], ["s"]]}, "S'")
+    second = Grammar({"P": [["s", ";", "P"], ["s"]], "S'": [["P"]]}, "S'")
+    return first, second
+
+
+def test_renumbered_grammars_do_not_share_entries(tmp_path):
+    g1, g2 = renumbered_pair()
+    assert canonical_grammar(g1.augmented()) != canonical_grammar(g2.augmented())
+
+    cache = GrammarCache(str(tmp_path))
+    cache.automaton(g1)
+    cache.table(g1, "lalr")
+    for grammar in (g1, g2):
+        fresh = build_table(grammar, "lalr")
+        assert build_table(grammar, "lalr", cache.automaton(grammar)).action == fresh.action
+        assert cells(cache.table(grammar, "lalr")) == cells(PackedTable.from_table(fresh))
+
+
+def test_unwritable_cache_computes_without_storing(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    cache = GrammarCache(str(tmp_path))
+    cache.directory = str(blocker)          # every makedirs below it fails
+    g1, _ = renumbered_pair()
+    assert cache.table(g1, "lalr").n_states
+    assert cache.transformed(["E -> E + T | T"])
+    assert cache.stats["errors"] == 3 and cache.stats["writes"] == 0
+
+    null = NullCache()
+    assert null.table(g1, "lalr").n_states
+    assert null.first_follow({"S": [["a"]]})[0] == {"S": {"a"}}
+
+
+def test_corrupt_entries_are_recomputed(tmp_path):
+    cache = GrammarCache(str(tmp_path))
+    g1, _ = renumbered_pair()
+    rules = {"S": [["a", "S"], ["b"]]}
+    expected = cache.first_follow(rules)
+    packed = cache.table(g1, "lalr")
+    for entry in list(cache._entries()):
+        with open(entry.path, "r+b") as f:
+            f.truncate(entry.stat().st_size // 2)
+
+    fresh = GrammarCache(str(tmp_path))
+    assert fresh.first_follow(rules) == expected
+    assert cells(fresh.table(g1, "lalr")) == cells(packed)
+    assert fresh.stats["errors"] == 3 and fresh.stats["hits"] == 0
+    assert cells(GrammarCache(str(tmp_path)).table(g1, "lalr")) == cells(packed)
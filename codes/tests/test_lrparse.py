@@ -0,0 +1,27 @@
+import pytest
+
+from acdlab import Grammar, LRParser, LRTable, PackedTable, ParseError, build_table
+from acdlab.lr0 import LR0Automaton
+
+
+def test_end_marker_comes_from_the_table(tmp_path):
+    grammar = Grammar({"S": [["S", "$", "a"], ["a"]]}, end="#")
+    path = str(tmp_path / "table")
+    PackedTable.from_table(build_table(grammar)).save(path)
+    parser = LRParser(PackedTable.load(path))
+    assert parser.symbols[parser.end] == "#"
+    assert parser.recognize(parser.token_ids(["a", "$", "a"]))
+    with pytest.raises(ParseError):
+        parser.recognize(parser.token_ids(["a", "$"]))
+
+
+def test_table_augments_its_grammar():
+    grammar = Grammar({"S": [["S", "a"], ["a"]]})
+    table = LRTable(LR0Automaton(grammar))
+    assert table.grammar.symbols[table.grammar.start] == "S'"
+    assert not table.conflicts
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError, match="lalr, slr"):
+        build_table(Grammar({"S": [["a"]]}), "lr1")
@@ -0,0 +1,16 @@
+from acdlab.transform import compute_cfg, remove_left_recursion
+
+
+def test_rule_with_only_left_recursive_alternatives_stays_unproductive():
+    assert remove_left_recursion({"S": [["A", "b"], ["c"]], "A": [["A", "a"]]}) == \
+        {"S": [["c"]], "A": []}
+
+
+def test_unproductive_rules_leave_no_references_in_the_strings():
+    assert compute_cfg(["S -> A b | c", "A -> A a"]) == ["S -> c"]
+    assert compute_cfg(["S -> B b | c", "B -> A d", "A -> A"]) == ["S -> c"]
+
+
+def test_left_recursion_keeps_base_alternatives():
+    assert remove_left_recursion({"E": [["E", "+", "T"], ["T"]]}) == \
+        {"E": [["T", "E'"]], "E'": [["+", "T", "E'"], []]}